@@ -2,12 +2,14 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import jwt, JWTError
 from config import settings
+from token_cache import TokenCache
 from typing import Optional
 import logging
 
 logger = logging.getLogger(__name__)
 
 security = HTTPBearer(auto_error=False)
+token_cache = TokenCache(settings.JWT_CACHE_SIZE, settings.JWT_CACHE_MAX_TTL)
 
 
 async def get_current_user(
@@ -25,11 +27,14 @@ async def get_current_user(
     token = credentials.credentials
 
     try:
-        payload = jwt.decode(
-            token,
-            settings.JWT_ACCESS_SECRET,
-            algorithms=["HS256"]
-        )
+        payload = token_cache.get(token)
+        if payload is None:
+            payload = jwt.decode(
+                token,
+                settings.JWT_ACCESS_SECRET,
+                algorithms=["HS256"]
+            )
+            token_cache.put(token, payload)
 
         # Support both 'sub' (standard) and 'userId' (custom) claims
         user_id: str = payload.get("sub") or payload.get("userId")
@@ -12,6 +12,9 @@ class Settings(BaseSettings):
 
     # JWT Configuration
     JWT_ACCESS_SECRET: str
+    # Verified token cache (entries also expire at the token's exp)
+    JWT_CACHE_SIZE: int = 10000
+    JWT_CACHE_MAX_TTL: int = 900
 
     # Services URLs
     USERS_SERVICE_URL: str
@@ -2,12 +2,46 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import jwt, JWTError
 from config import settings
+from token_cache import TokenCache
 from typing import Optional
 import logging
 
 logger = logging.getLogger(__name__)
 
 security = HTTPBearer(auto_error=False)
+token_cache = TokenCache(settings.JWT_CACHE_SIZE, settings.JWT_CACHE_MAX_TTL)
+
+
+def decode_token(token: str) -> dict:
+    """
+    Verify an access token and return its claims
+
+    Claims are cached until the token expires, so a client repeating the
+    same token is verified once. Raises JWTError if the token is invalid.
+    """
+    payload = token_cache.get(token)
+    if payload is None:
+        payload = jwt.decode(
+            token,
+            settings.JWT_ACCESS_SECRET,
+            algorithms=["HS256"]
+        )
+        token_cache.put(token, payload)
+    return payload
+
+
+def user_id_from_token(token: str) -> Optional[str]:
+    """
+    User id of a valid access token, or None
+
+    Never raises; used where an invalid token should be treated as
+    anonymous (e.g. rate limiting) rather than rejected.
+    """
+    try:
+        payload = decode_token(token)
+    except JWTError:
+        return None
+    return payload.get("sub") or payload.get("userId")
 
 
 async def get_current_user(
@@ -25,11 +59,7 @@ async def get_current_user(
     token = credentials.credentials
 
     try:
-        payload = jwt.decode(
-            token,
-            settings.JWT_ACCESS_SECRET,
-            algorithms=["HS256"]
-        )
+        payload = decode_token(token)
 
         # Support both 'sub' (standard JWT claim) and 'userId' (custom claim)
         user_id: str = payload.get("sub") or payload.get("userId")
@@ -1,6 +1,6 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
-from typing import List
+from typing import Dict, List
 
 
 class Settings(BaseSettings):
@@ -10,6 +10,9 @@ class Settings(BaseSettings):
 
     # JWT Configuration
     JWT_ACCESS_SECRET: str
+    # Verified token cache (entries also expire at the token's exp)
+    JWT_CACHE_SIZE: int = 10000
+    JWT_CACHE_MAX_TTL: int = 900
 
     # Services URLs
     USERS_SERVICE_URL: str
@@ -22,6 +25,58 @@ class Settings(BaseSettings):
     ENABLE_RATE_LIMIT: bool = True
     RATE_LIMIT_WINDOW_MS: int = 60000
     RATE_LIMIT_MAX_REQUESTS: int = 100
+    # Per-window budgets of the generation endpoints (POST)
+    RATE_LIMIT_CHAT_MAX_REQUESTS: int = 30
+    RATE_LIMIT_IMAGE_MAX_REQUESTS: int = 10
+    # Counted in items: each batch costs one token per image it generates
+    RATE_LIMIT_IMAGE_BATCH_MAX_ITEMS: int = 100
+    RATE_LIMIT_SPEECH_MAX_REQUESTS: int = 20
+    # "memory" (per worker) or "redis" (shared by all workers)
+    RATE_LIMIT_BACKEND: str = "memory"
+    REDIS_URL: str = "redis://localhost:6379/0"
+
+    # Background health probes of the services (seconds)
+    HEALTH_CHECK_INTERVAL: float = 10.0
+    HEALTH_CHECK_TIMEOUT: float = 2.0
+
+    # Circuit breaker per backend replica (over the last WINDOW calls)
+    CIRCUIT_BREAKER_WINDOW: int = 20
+    CIRCUIT_BREAKER_MIN_CALLS: int = 10
+    CIRCUIT_BREAKER_FAILURE_RATE: float = 0.5
+    CIRCUIT_BREAKER_SLOW_CALL_MS: int = 30000
+    CIRCUIT_BREAKER_SLOW_CALL_RATE: float = 0.8
+    CIRCUIT_BREAKER_OPEN_SECONDS: float = 30.0
+    CIRCUIT_BREAKER_HALF_OPEN_CALLS: int = 3
+
+    # Adaptive (AIMD) limit on in-flight requests per backend
+    CONCURRENCY_LIMIT_INITIAL: int = 50
+    CONCURRENCY_LIMIT_MIN: int = 4
+    CONCURRENCY_LIMIT_MAX: int = 500
+
+    # Response cache of slow-changing GETs (see response_cache.py)
+    ENABLE_RESPONSE_CACHE: bool = True
+    RESPONSE_CACHE_MAX_ENTRIES: int = 10000
+    RESPONSE_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    RESPONSE_CACHE_MODELS_TTL: int = 300
+    RESPONSE_CACHE_ANALYTICS_TTL: int = 30
+
+    # Per-section timeouts of GET /api/dashboard (seconds)
+    DASHBOARD_SECTION_TIMEOUT: float = 3.0
+    DASHBOARD_ANALYTICS_TIMEOUT: float = 5.0
+
+    # POST /api/batch
+    BATCH_MAX_REQUESTS: int = 200
+    BATCH_CONCURRENCY: int = 10
+    BATCH_MAX_CONCURRENCY: int = 50
+
+    # Idempotency-Key on generation endpoints (see idempotency.py)
+    ENABLE_IDEMPOTENCY: bool = True
+    IDEMPOTENCY_TTL: int = 86400
+    IDEMPOTENCY_MAX_ENTRIES: int = 10000
+    # "memory", or "redis" to add a persistent tier shared by all workers
+    IDEMPOTENCY_BACKEND: str = "memory"
+    IDEMPOTENCY_LOCK_SECONDS: float = 120.0
+    IDEMPOTENCY_POLL_INTERVAL: float = 0.2
 
     # CORS Configuration
     CORS_ORIGINS: str = "*"
@@ -43,6 +98,17 @@ class Settings(BaseSettings):
             return ["*"]
         return [origin.strip() for origin in self.CORS_ORIGINS.split(",")]
 
+    @property
+    def rate_limits(self) -> Dict[str, int]:
+        """Requests allowed per window, by route class"""
+        return {
+            "default": self.RATE_LIMIT_MAX_REQUESTS,
+            "chat": self.RATE_LIMIT_CHAT_MAX_REQUESTS,
+            "image": self.RATE_LIMIT_IMAGE_MAX_REQUESTS,
+            "image_batch": self.RATE_LIMIT_IMAGE_BATCH_MAX_ITEMS,
+            "speech": self.RATE_LIMIT_SPEECH_MAX_REQUESTS
+        }
+
 
 @lru_cache()
 def get_settings() -> Settings:
@@ -0,0 +1,164 @@
+"""Background health probing of the backend services"""
+import asyncio
+from datetime import datetime
+import httpx
+import logging
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from config import settings
+from service_client import (
+    Replica,
+    ServiceClient,
+    users_client,
+    llm_client,
+    image_client,
+    speech_client,
+    analytics_client
+)
+
+logger = logging.getLogger(__name__)
+
+# Service name -> (client, health endpoint)
+SERVICE_PROBES: Dict[str, Tuple[ServiceClient, str]] = {
+    "users": (users_client, "/"),
+    "llm_chat": (llm_client, "/health"),
+    "image": (image_client, "/healthz"),
+    "speech": (speech_client, "/healthz"),
+    "analytics": (analytics_client, "/health")
+}
+
+
+class HealthProber:
+    """
+    Probes every backend concurrently and keeps the latest results
+
+    Each probe has its own short timeout, so a slow backend delays neither
+    the others nor the callers: /health reads the cached snapshot. Every
+    replica of a service is probed; failing replicas are ejected from load
+    balancing and readmitted once they pass again. Status changes are
+    logged as they happen.
+    """
+
+    def __init__(
+        self,
+        interval: float = settings.HEALTH_CHECK_INTERVAL,
+        timeout: float = settings.HEALTH_CHECK_TIMEOUT
+    ):
+        self.interval = interval
+        self.timeout = timeout
+        self._results: Dict[str, Dict[str, Any]] = {}
+        self._checked_at: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.probe_all()
+            except Exception as e:
+                logger.error(f"Health probing failed: {str(e)}")
+            await asyncio.sleep(self.interval)
+
+    async def probe_all(self) -> Dict[str, Dict[str, Any]]:
+        names = list(SERVICE_PROBES)
+        results = await asyncio.gather(
+            *(self._probe_service(*SERVICE_PROBES[name]) for name in names))
+
+        for name, result in zip(names, results):
+            self._log_change(name, result)
+            self._results[name] = result
+        self._checked_at = datetime.utcnow()
+        return self._results
+
+    async def _probe_service(self, client: ServiceClient, endpoint: str) -> Dict[str, Any]:
+        """Probe every replica of a service, ejecting the failing ones"""
+        replicas = await asyncio.gather(
+            *(self._probe(client, replica, endpoint) for replica in client.replicas))
+        for replica, result in zip(client.replicas, replicas):
+            client.set_replica_health(replica, result["status"] == "healthy")
+
+        statuses = {result["status"] for result in replicas}
+        if statuses == {"healthy"}:
+            status = "healthy"
+        elif "healthy" in statuses:
+            status = "degraded"
+        else:
+            status = "unavailable" if "unavailable" in statuses else "unhealthy"
+
+        return {
+            "status": status,
+            "latency_ms": min(result["latency_ms"] for result in replicas),
+            "detail": "; ".join(
+                f"{replica.url}: {result['detail']}"
+                for replica, result in zip(client.replicas, replicas)
+                if result["status"] != "healthy"),
+            "replicas": {
+                replica.url: result["status"]
+                for replica, result in zip(client.replicas, replicas)
+            }
+        }
+
+    async def _probe(self, client: ServiceClient, replica: Replica, endpoint: str) -> Dict[str, Any]:
+        started = time.monotonic()
+        try:
+            response = await client.probe(replica, endpoint, self.timeout)
+            status = "healthy" if response.status_code == 200 else "unhealthy"
+            detail = f"HTTP {response.status_code}"
+        except httpx.TimeoutException:
+            status, detail = "unavailable", f"timeout after {self.timeout}s"
+        except Exception as e:
+            status, detail = "unavailable", str(e) or type(e).__name__
+
+        return {
+            "status": status,
+            "latency_ms": round((time.monotonic() - started) * 1000, 1),
+            "detail": detail
+        }
+
+    def _log_change(self, name: str, result: Dict[str, Any]):
+        previous = self._results.get(name)
+        if previous is not None and previous["status"] == result["status"]:
+            return
+        if result["status"] == "healthy":
+            logger.info(f"✓ {name} service is healthy")
+        elif result["status"] == "degraded":
+            logger.warning(f"⚠ {name} service degraded: {result['detail']}")
+        elif result["status"] == "unhealthy":
+            logger.warning(f"⚠ {name} service returned {result['detail']}")
+        else:
+            logger.error(f"✗ {name} service unavailable: {result['detail']}")
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Latest results, without probing"""
+        if self._checked_at is None:
+            status = "starting"
+        elif all(r["status"] == "healthy" for r in self._results.values()):
+            status = "healthy"
+        else:
+            status = "degraded"
+
+        return {
+            "status": status,
+            "checked_at": self._checked_at.isoformat() if self._checked_at else None,
+            "services": {name: r["status"] for name, r in self._results.items()},
+            "latency_ms": {name: r["latency_ms"] for name, r in self._results.items()},
+            "replicas": {name: r["replicas"] for name, r in self._results.items()}
+        }
+
+
+# Global instance
+health_prober = HealthProber()
@@ -0,0 +1,371 @@
+"""
+Idempotency keys for generation endpoints
+
+A client that sends `Idempotency-Key` on a generation request can retry it
+safely: the first request runs, its successful (2xx) response is stored
+for IDEMPOTENCY_TTL seconds, and later requests with the same key get that
+response replayed instead of starting another generation. Requests that
+arrive while the first one is still running wait for it. Keys are scoped
+per client (JWT user id, or IP) and to the path and query string, and
+reusing a key with a different body is rejected with 422.
+"""
+import asyncio
+import base64
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+import hashlib
+import json
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+import uuid
+
+from config import settings
+from rate_limit import buffer_body, client_key
+
+logger = logging.getLogger(__name__)
+
+# (method, path) of the requests that honour Idempotency-Key
+IDEMPOTENT_ROUTES = {
+    ("POST", "/api/chat"),
+    ("POST", "/api/chat/"),
+    ("POST", "/api/image/generate"),
+    ("POST", "/api/speech/generate"),
+}
+
+MAX_KEY_LENGTH = 255
+
+# Delete the in-flight lock only if it still holds our token: once it has
+# expired (LOCK_SECONDS) another worker may have taken it
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+@dataclass
+class StoredResponse:
+    status: int
+    headers: List[Tuple[bytes, bytes]]
+    body: bytes
+    fingerprint: str  # SHA-256 of the request body
+    expires_at: float  # time.time(), shared with the persistent tier
+
+    def to_json(self) -> str:
+        return json.dumps({
+            "status": self.status,
+            "headers": [[name.decode("latin-1"), value.decode("latin-1")]
+                        for name, value in self.headers],
+            "body": base64.b64encode(self.body).decode(),
+            "fingerprint": self.fingerprint,
+            "expires_at": self.expires_at
+        })
+
+    @classmethod
+    def from_json(cls, raw: str) -> "StoredResponse":
+        data = json.loads(raw)
+        return cls(
+            status=data["status"],
+            headers=[(name.encode("latin-1"), value.encode("latin-1"))
+                     for name, value in data["headers"]],
+            body=base64.b64decode(data["body"]),
+            fingerprint=data["fingerprint"],
+            expires_at=data["expires_at"]
+        )
+
+
+class MemoryIdempotencyStore:
+    """
+    Stored responses in process memory
+
+    Entries are kept in insertion order, which is also expiry order since
+    they all share one TTL, so expired ones are dropped from the front.
+    Past max_entries the oldest entry is evicted early.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, StoredResponse]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[StoredResponse]:
+        self._expire()
+        response = self._entries.get(key)
+        # Entries copied from the persistent tier may expire out of order
+        if response is not None and response.expires_at <= time.time():
+            del self._entries[key]
+            return None
+        return response
+
+    def put(self, key: str, response: StoredResponse):
+        self._entries.pop(key, None)
+        self._entries[key] = response
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _expire(self):
+        now = time.time()
+        while self._entries:
+            key, response = next(iter(self._entries.items()))
+            if response.expires_at > now:
+                break
+            del self._entries[key]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RedisIdempotencyStore:
+    """
+    Stored responses and in-flight locks shared through Redis
+
+    Lets a retry that lands on another gateway worker replay the response,
+    or wait for the worker still running the original request.
+    """
+
+    def __init__(self, url: str, lock_seconds: float, prefix: str = "idempotency:"):
+        # Optional dependency, only needed with IDEMPOTENCY_BACKEND=redis
+        import redis.asyncio as redis
+
+        self.lock_ms = int(lock_seconds * 1000)
+        self.prefix = prefix
+        self._redis = redis.from_url(url)
+        self._release_lock = self._redis.register_script(RELEASE_LOCK_SCRIPT)
+
+    async def get(self, key: str) -> Optional[StoredResponse]:
+        raw = await self._redis.get(self.prefix + key)
+        return StoredResponse.from_json(raw) if raw else None
+
+    async def put(self, key: str, response: StoredResponse):
+        ttl_ms = int((response.expires_at - time.time()) * 1000)
+        if ttl_ms > 0:
+            await self._redis.set(self.prefix + key, response.to_json(), px=ttl_ms)
+
+    async def claim(self, key: str) -> Optional[str]:
+        """
+        Take the in-flight lock of a key and return its token, or None if
+        another worker holds it
+        """
+        token = uuid.uuid4().hex
+        if await self._redis.set(
+                f"{self.prefix}lock:{key}", token, nx=True, px=self.lock_ms):
+            return token
+        return None
+
+    async def release(self, key: str, token: str):
+        await self._release_lock(keys=[f"{self.prefix}lock:{key}"], args=[token])
+
+
+class IdempotencyStore:
+    """
+    In-memory tier in front of an optional persistent (Redis) tier
+
+    Persistent tier errors are logged and ignored: the request then runs
+    as if it had no Idempotency-Key rather than failing.
+    """
+
+    def __init__(
+        self,
+        ttl: int = settings.IDEMPOTENCY_TTL,
+        max_entries: int = settings.IDEMPOTENCY_MAX_ENTRIES,
+        persistent: Optional[RedisIdempotencyStore] = None
+    ):
+        self.ttl = ttl
+        self.memory = MemoryIdempotencyStore(max_entries)
+        self.persistent = persistent
+        # Key -> future resolved when the request running it finishes
+        self.inflight: Dict[str, asyncio.Future] = {}
+        self.counts = {"replayed": 0, "waited": 0, "conflicts": 0}
+
+    async def get(self, key: str) -> Optional[StoredResponse]:
+        response = self.memory.get(key)
+        if response is not None or self.persistent is None:
+            return response
+
+        try:
+            response = await self.persistent.get(key)
+        except Exception as e:
+            logger.error(f"Idempotency store error: {str(e)}")
+            return None
+        if response is not None and response.expires_at > time.time():
+            self.memory.put(key, response)
+            return response
+        return None
+
+    async def put(self, key: str, response: StoredResponse):
+        self.memory.put(key, response)
+        if self.persistent is not None:
+            try:
+                await self.persistent.put(key, response)
+            except Exception as e:
+                logger.error(f"Idempotency store error: {str(e)}")
+
+    async def claim(self, key: str) -> Tuple[bool, Optional[str]]:
+        """(claimed, token of the persistent lock or None if there is none)"""
+        if self.persistent is None:
+            return True, None
+        try:
+            token = await self.persistent.claim(key)
+            return token is not None, token
+        except Exception as e:
+            logger.error(f"Idempotency store error: {str(e)}")
+            return True, None
+
+    async def release(self, key: str, token: Optional[str]):
+        if self.persistent is not None and token is not None:
+            try:
+                await self.persistent.release(key, token)
+            except Exception as e:
+                logger.error(f"Idempotency store error: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": settings.ENABLE_IDEMPOTENCY,
+            "backend": "redis" if self.persistent is not None else "memory",
+            "ttl": self.ttl,
+            "entries": len(self.memory),
+            "inflight": len(self.inflight),
+            **self.counts
+        }
+
+
+def create_store() -> IdempotencyStore:
+    persistent = None
+    if settings.IDEMPOTENCY_BACKEND == "redis":
+        persistent = RedisIdempotencyStore(
+            settings.REDIS_URL, settings.IDEMPOTENCY_LOCK_SECONDS)
+    return IdempotencyStore(persistent=persistent)
+
+
+class IdempotencyMiddleware:
+    """
+    ASGI middleware applying Idempotency-Key to IDEMPOTENT_ROUTES
+
+    The request body is read up front to fingerprint it and then handed
+    to the route unchanged. Only the request that runs is passed on to the
+    rest of the stack; replays and waits never reach the rate limiter or
+    the backends.
+    """
+
+    def __init__(self, app, store: Optional[IdempotencyStore] = None):
+        self.app = app
+        self.store = store or idempotency_store
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or \
+                (scope["method"], scope["path"]) not in IDEMPOTENT_ROUTES:
+            await self.app(scope, receive, send)
+            return
+
+        idempotency_key = None
+        for name, value in scope["headers"]:
+            if name == b"idempotency-key":
+                idempotency_key = value.decode("latin-1").strip()
+                break
+        if not idempotency_key:
+            await self.app(scope, receive, send)
+            return
+        if len(idempotency_key) > MAX_KEY_LENGTH:
+            await self._error(send, 400,
+                              f"Idempotency-Key longer than {MAX_KEY_LENGTH} characters")
+            return
+
+        body, receive = await buffer_body(receive)
+        fingerprint = hashlib.sha256(body).hexdigest()
+        # The query string selects the behaviour (e.g. ?async=true), so a
+        # key reused with another one is a different request
+        target = scope["path"]
+        if scope.get("query_string"):
+            target += "?" + scope["query_string"].decode("latin-1")
+        key = f"{client_key(scope)}:{target}:{idempotency_key}"
+
+        while True:
+            stored = await self.store.get(key)
+            if stored is not None:
+                await self._replay(send, stored, fingerprint)
+                return
+
+            running = self.store.inflight.get(key)
+            if running is not None:
+                # Same process: wait for it, then replay (or run if it failed)
+                self.store.counts["waited"] += 1
+                await asyncio.shield(running)
+                continue
+
+            claimed, token = await self.store.claim(key)
+            if claimed:
+                break
+            # Another worker is running it
+            self.store.counts["waited"] += 1
+            await asyncio.sleep(settings.IDEMPOTENCY_POLL_INTERVAL)
+
+        running = asyncio.get_running_loop().create_future()
+        self.store.inflight[key] = running
+        try:
+            await self._run(scope, receive, send, key, fingerprint)
+        finally:
+            del self.store.inflight[key]
+            running.set_result(None)
+            await self.store.release(key, token)
+
+    async def _run(self, scope, receive, send, key: str, fingerprint: str):
+        """Run the request, storing a 2xx response as it is sent"""
+        start: Optional[dict] = None
+        chunks: List[bytes] = []
+
+        async def capture(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+            elif message["type"] == "http.response.body" and \
+                    200 <= start["status"] < 300:
+                chunks.append(message.get("body", b""))
+                if not message.get("more_body", False):
+                    await self.store.put(key, StoredResponse(
+                        status=start["status"],
+                        headers=list(start.get("headers", [])),
+                        body=b"".join(chunks),
+                        fingerprint=fingerprint,
+                        expires_at=time.time() + self.store.ttl
+                    ))
+            await send(message)
+
+        await self.app(scope, receive, capture)
+
+    async def _replay(self, send, stored: StoredResponse, fingerprint: str):
+        if stored.fingerprint != fingerprint:
+            self.store.counts["conflicts"] += 1
+            await self._error(
+                send, 422, "Idempotency-Key already used with a different request body")
+            return
+
+        self.store.counts["replayed"] += 1
+        await send({
+            "type": "http.response.start",
+            "status": stored.status,
+            "headers": stored.headers + [(b"idempotent-replayed", b"true")]
+        })
+        await send({"type": "http.response.body", "body": stored.body})
+
+    @staticmethod
+    async def _error(send, status_code: int, message: str):
+        body = json.dumps({
+            "error": "Idempotency Error",
+            "message": message,
+            "timestamp": datetime.utcnow().isoformat()
+        }).encode()
+        await send({
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+            ]
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+# Global instance
+idempotency_store = create_store()
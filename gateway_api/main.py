@@ -9,13 +9,11 @@ import httpx
 from datetime import datetime
 
 from config import settings
-from service_client import (
-    users_client,
-    llm_client,
-    image_client,
-    speech_client,
-    analytics_client
-)
+from health import SERVICE_PROBES, health_prober
+from idempotency import IdempotencyMiddleware, idempotency_store
+from rate_limit import RateLimitMiddleware, rate_limiter
+from response_cache import ResponseCacheMiddleware, response_cache
+from auth import token_cache
 
 # Import routers
 from routes_auth import router as auth_router
@@ -23,6 +21,8 @@ from routes_chat import router as chat_router
 from routes_image import router as image_router
 from routes_speech import router as speech_router
 from routes_analytics import router as analytics_router
+from routes_dashboard import router as dashboard_router
+from routes_batch import router as batch_router
 
 # Configure logging
 logging.basicConfig(
@@ -44,37 +44,20 @@ async def lifespan(app: FastAPI):
     logger.info(f"Environment: {settings.NODE_ENV}")
     logger.info(f"Port: {settings.PORT}")
     logger.info(f"Analytics Enabled: {settings.ENABLE_ANALYTICS}")
+    logger.info(
+        f"Rate Limit Enabled: {settings.ENABLE_RATE_LIMIT} "
+        f"({settings.RATE_LIMIT_BACKEND}, {settings.rate_limits} per {settings.RATE_LIMIT_WINDOW_MS}ms)")
 
-    # Check service health
-    await check_services_health()
+    # Probe services in the background; startup does not wait for them
+    health_prober.start()
 
     yield
 
     # Shutdown
     logger.info("Shutting down API Gateway...")
+    await health_prober.stop()
 
 
-async def check_services_health():
-    """Check health of all microservices"""
-    services = {
-        "Users": (users_client, "/"),
-        "LLM Chat": (llm_client, "/health"),
-        "Image": (image_client, "/healthz"),
-        "Speech": (speech_client, "/healthz"),
-        "Analytics": (analytics_client, "/health")
-    }
-
-    for name, (client, endpoint) in services.items():
-        try:
-            response = await client.request("GET", endpoint)
-            if response.status_code == 200:
-                logger.info(f"✓ {name} service is healthy")
-            else:
-                logger.warning(
-                    f"⚠ {name} service returned {response.status_code}")
-        except Exception as e:
-            logger.error(f"✗ {name} service unavailable: {str(e)}")
-
 # Create FastAPI app
 app = FastAPI(
     title="LLM Platform API Gateway",
@@ -85,6 +68,21 @@ app = FastAPI(
     redoc_url="/redoc"
 )
 
+# Middlewares added later wrap earlier ones:
+# CORS -> idempotency -> rate limit -> cache
+
+# Response cache
+if settings.ENABLE_RESPONSE_CACHE:
+    app.add_middleware(ResponseCacheMiddleware, cache=response_cache)
+
+# Rate limiting (added before CORS so 429 responses still get CORS headers)
+if settings.ENABLE_RATE_LIMIT:
+    app.add_middleware(RateLimitMiddleware, limiter=rate_limiter)
+
+# Idempotency keys (outside rate limiting: replayed retries cost no tokens)
+if settings.ENABLE_IDEMPOTENCY:
+    app.add_middleware(IdempotencyMiddleware, store=idempotency_store)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -130,6 +128,8 @@ app.include_router(chat_router)
 app.include_router(image_router)
 app.include_router(speech_router)
 app.include_router(analytics_router)
+app.include_router(dashboard_router)
+app.include_router(batch_router)
 
 # Root endpoint
 
@@ -163,10 +163,15 @@ async def root():
             ],
             "text_to_image": [
                 "POST /api/image/generate",
+                "POST /api/image/generate/batch",
+                "GET /api/image/{image_id}",
+                "GET /api/image/{image_id}/content",
                 "GET /api/image/models"
             ],
             "text_to_speech": [
                 "POST /api/speech/generate",
+                "POST /api/speech/stream",
+                "GET /api/speech/{request_id}/content",
                 "GET /api/speech/voices"
             ],
             "analytics": [
@@ -174,6 +179,12 @@ async def root():
                 "GET /api/analytics/service/{service_type}",
                 "GET /api/analytics/system",
                 "GET /api/analytics/usage"
+            ],
+            "dashboard": [
+                "GET /api/dashboard"
+            ],
+            "batch": [
+                "POST /api/batch"
             ]
         },
         "documentation": {
@@ -187,37 +198,31 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    """Gateway health check"""
-    services_status = {}
-
-    # Check all services
-    services = {
-        "users": (users_client, "/"),
-        "llm_chat": (llm_client, "/health"),
-        "image": (image_client, "/healthz"),
-        "speech": (speech_client, "/healthz"),
-        "analytics": (analytics_client, "/health")
-    }
-
-    all_healthy = True
-
-    for name, (client, endpoint) in services.items():
-        try:
-            response = await client.request("GET", endpoint)
-            is_healthy = response.status_code == 200
-            services_status[name] = "healthy" if is_healthy else "unhealthy"
-            if not is_healthy:
-                all_healthy = False
-        except Exception as e:
-            services_status[name] = "unavailable"
-            all_healthy = False
-
+    """Gateway health check (latest background probe results)"""
+    snapshot = health_prober.snapshot()
     return {
-        "status": "healthy" if all_healthy else "degraded",
+        "status": snapshot["status"],
         "service": "api-gateway",
         "version": "1.0.0",
         "timestamp": datetime.utcnow().isoformat(),
-        "services": services_status
+        "checked_at": snapshot["checked_at"],
+        "services": snapshot["services"],
+        "latency_ms": snapshot["latency_ms"],
+        "replicas": snapshot["replicas"]
+    }
+
+
+@app.get("/metrics")
+async def metrics():
+    """Rate limiter, caches and per-service breaker/limit metrics"""
+    return {
+        "rate_limit": rate_limiter.stats(),
+        "token_cache": token_cache.stats(),
+        "response_cache": response_cache.stats(),
+        "idempotency": idempotency_store.stats(),
+        "services": {
+            name: client.stats() for name, (client, _) in SERVICE_PROBES.items()
+        }
     }
 
 if __name__ == "__main__":
@@ -71,6 +71,19 @@ class ImageGenerationResponse(BaseModel):
     # Contains 'provider', 'model', 'size', 'latencyMs', 'contentType'
     meta: Dict[str, Any]
 
+
+class ImageBatchRequest(BaseModel):
+    """Batch image generation request"""
+    items: List[ImageGenerationRequest] = Field(..., min_length=1)
+    concurrency: Optional[int] = Field(None, ge=1)
+
+
+class ImageJobResponse(BaseModel):
+    """Async image job accepted response"""
+    id: str
+    status: str  # queued, running, completed, failed
+    statusUrl: str
+
 # ============= Text-to-Speech Models =============
 
 
@@ -81,6 +94,7 @@ class SpeechGenerationRequest(BaseModel):
     voice: Optional[str] = "en"
     language: Optional[str] = "en"  # Deprecated, kept for compatibility
     model: Optional[str] = "gtts"  # gtts or gtts-slow
+    format: Optional[str] = "mp3"  # mp3, opus or ogg
 
 
 class SpeechGenerationResponse(BaseModel):
@@ -144,6 +158,20 @@ class GatewayInfoResponse(BaseModel):
     endpoints: Dict[str, List[str]]
 
 
+class BatchSubRequest(BaseModel):
+    """One call inside a batch, addressed like a regular gateway request"""
+    id: Optional[str] = None  # Defaults to the position in the batch
+    method: str = Field("GET", pattern="^(GET|POST|PUT|PATCH|DELETE)$")
+    path: str  # e.g. /api/image/{id} or /api/analytics/usage?time_range=day
+    body: Optional[Dict[str, Any]] = None
+
+
+class BatchRequest(BaseModel):
+    """Batch of gateway calls run concurrently"""
+    requests: List[BatchSubRequest] = Field(..., min_length=1)
+    concurrency: Optional[int] = Field(None, ge=1)
+
+
 class ErrorResponse(BaseModel):
     """Standard error response"""
     error: str
@@ -0,0 +1,349 @@
+"""
+Per-client rate limiting with token buckets
+
+Every client gets one bucket per route class. A bucket holds up to
+`limit` tokens and refills continuously at limit / window; each request
+takes one token (batch routes, one per item) and is rejected with 429 +
+Retry-After when there are not enough left.
+Clients are identified by the user id in their JWT, or by IP address for
+anonymous and invalid tokens.
+"""
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+import json
+import logging
+import math
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from auth import user_id_from_token
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# (route class, method, path prefix); the first match wins. Generation
+# endpoints get their own, smaller budgets because each request costs far
+# more upstream than a read.
+ROUTE_CLASSES: List[Tuple[str, str, str]] = [
+    ("chat", "POST", "/api/chat"),
+    ("image_batch", "POST", "/api/image/generate/batch"),
+    ("image", "POST", "/api/image/"),
+    ("speech", "POST", "/api/speech/"),
+]
+
+
+def _batch_items(body: bytes) -> int:
+    """Generations requested by a batch body; 1 if it cannot be read"""
+    try:
+        items = json.loads(body).get("items")
+    except (ValueError, AttributeError):
+        return 1
+    return len(items) if isinstance(items, list) and items else 1
+
+
+# Route classes whose requests cost more than one token, from the body
+ROUTE_COSTS: Dict[str, Callable[[bytes], int]] = {
+    "image_batch": _batch_items,
+}
+
+# Never limited (health checks and documentation)
+EXEMPT_PATHS = {"/", "/health", "/docs", "/redoc", "/openapi.json"}
+
+
+def route_class(method: str, path: str) -> Optional[str]:
+    """Rate limit class of a request, or None when it is not limited"""
+    if path in EXEMPT_PATHS or not path.startswith("/api/"):
+        return None
+    for name, class_method, prefix in ROUTE_CLASSES:
+        if method == class_method and path.startswith(prefix):
+            return name
+    return "default"
+
+
+def client_key(scope) -> str:
+    """User id from the bearer token, or client IP when it has none"""
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() == "bearer":
+                user_id = user_id_from_token(token.strip())
+                if user_id:
+                    return f"user:{user_id}"
+            break
+
+    client = scope.get("client")
+    return f"ip:{client[0] if client else 'unknown'}"
+
+
+async def buffer_body(receive) -> Tuple[bytes, Any]:
+    """
+    Read the whole request body, returning it with a receive callable
+    that hands it to the app unchanged
+    """
+    chunks = []
+    while True:
+        message = await receive()
+        if message["type"] != "http.request":
+            break
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            break
+    body = b"".join(chunks)
+
+    replayed = False
+
+    async def replay_receive():
+        nonlocal replayed
+        if not replayed:
+            replayed = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return await receive()
+
+    return body, replay_receive
+
+
+@dataclass
+class RateLimitDecision:
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: float  # seconds until a token is available (0 if allowed)
+
+
+class MemoryRateLimitBackend:
+    """
+    Token buckets in process memory
+
+    Buckets are kept in an OrderedDict ordered by last use. A bucket idle
+    for a whole window is full again, so it can be forgotten; those are
+    dropped from the front on each call, keeping memory bounded by the
+    clients seen in the last window and every operation O(1) amortized.
+    Nothing awaits between reading and writing a bucket, so no lock is
+    needed on the event loop.
+    """
+
+    def __init__(self, window_seconds: float):
+        self.window = window_seconds
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    async def take(self, key: str, limit: int, cost: int = 1) -> RateLimitDecision:
+        now = time.monotonic()
+        self._expire(now)
+
+        rate = limit / self.window
+        tokens, updated_at = self._buckets.pop(key, (float(limit), now))
+        tokens = min(float(limit), tokens + (now - updated_at) * rate)
+
+        allowed = tokens >= cost
+        if allowed:
+            tokens -= cost
+        self._buckets[key] = (tokens, now)
+
+        return RateLimitDecision(
+            allowed=allowed,
+            limit=limit,
+            remaining=int(tokens),
+            retry_after=0.0 if allowed else (cost - tokens) / rate
+        )
+
+    def _expire(self, now: float):
+        while self._buckets:
+            key, (_, updated_at) = next(iter(self._buckets.items()))
+            if now - updated_at < self.window:
+                break
+            del self._buckets[key]
+
+    def stats(self) -> Dict[str, object]:
+        return {"backend": "memory", "buckets": len(self._buckets)}
+
+
+# Same algorithm as MemoryRateLimitBackend, run atomically in Redis. Time
+# comes from the Redis server so gateway replicas need not agree on clocks.
+_TOKEN_BUCKET_SCRIPT = """
+local limit = tonumber(ARGV[1])
+local window_ms = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) * 1000 + tonumber(clock[2]) / 1000
+local rate = limit / window_ms
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or limit
+local updated_at = tonumber(state[2]) or now
+tokens = math.min(limit, tokens + math.max(0, now - updated_at) * rate)
+
+local allowed = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], window_ms)
+return {allowed, tostring(tokens)}
+"""
+
+
+class RedisRateLimitBackend:
+    """
+    Token buckets shared by all gateway workers through Redis
+
+    Buckets expire after a window of inactivity (PEXPIRE), when they would
+    be full again anyway.
+    """
+
+    def __init__(self, url: str, window_seconds: float, prefix: str = "ratelimit:"):
+        # Optional dependency, only needed with RATE_LIMIT_BACKEND=redis
+        import redis.asyncio as redis
+
+        self.window = window_seconds
+        self.prefix = prefix
+        self._redis = redis.from_url(url)
+        self._script = self._redis.register_script(_TOKEN_BUCKET_SCRIPT)
+
+    async def take(self, key: str, limit: int, cost: int = 1) -> RateLimitDecision:
+        window_ms = int(self.window * 1000)
+        allowed, tokens = await self._script(
+            keys=[self.prefix + key], args=[limit, window_ms, cost])
+        tokens = float(tokens)
+        allowed = bool(allowed)
+        rate = limit / self.window
+
+        return RateLimitDecision(
+            allowed=allowed,
+            limit=limit,
+            remaining=int(tokens),
+            retry_after=0.0 if allowed else (cost - tokens) / rate
+        )
+
+    def stats(self) -> Dict[str, object]:
+        return {"backend": "redis"}
+
+
+def create_backend():
+    window = settings.RATE_LIMIT_WINDOW_MS / 1000
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        return RedisRateLimitBackend(settings.REDIS_URL, window)
+    return MemoryRateLimitBackend(window)
+
+
+class RateLimiter:
+    """Per-route-class limits applied on a bucket backend"""
+
+    def __init__(self, limits: Dict[str, int], backend=None):
+        self.limits = limits
+        self.backend = backend or create_backend()
+        self._rejected: Dict[str, int] = {name: 0 for name in limits}
+
+    async def take(self, name: str, client_key: str, cost: int = 1) -> RateLimitDecision:
+        decision = await self.backend.take(
+            f"{name}:{client_key}", self.limits[name], cost)
+        if not decision.allowed:
+            self._rejected[name] += 1
+        return decision
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "enabled": settings.ENABLE_RATE_LIMIT,
+            "window_ms": settings.RATE_LIMIT_WINDOW_MS,
+            "limits": self.limits,
+            "rejected": dict(self._rejected),
+            **self.backend.stats()
+        }
+
+
+class RateLimitMiddleware:
+    """
+    ASGI middleware enforcing per-client, per-route-class limits
+
+    Written as plain ASGI (not BaseHTTPMiddleware) so streamed responses
+    pass through untouched. Backend errors fail open: an unreachable Redis
+    must not take the gateway down with it.
+    """
+
+    def __init__(self, app, limiter: Optional[RateLimiter] = None):
+        self.app = app
+        self.limiter = limiter or rate_limiter
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        name = route_class(scope["method"], scope["path"])
+        if name is None:
+            await self.app(scope, receive, send)
+            return
+
+        cost = 1
+        if name in ROUTE_COSTS:
+            body, receive = await buffer_body(receive)
+            cost = ROUTE_COSTS[name](body)
+            if cost > self.limiter.limits[name]:
+                # Could never be admitted, however long the client waits
+                await self._send_error(
+                    send, 413, "Payload Too Large",
+                    f"Request costs {cost} tokens, more than the limit of "
+                    f"{self.limiter.limits[name]} per window")
+                return
+
+        try:
+            decision = await self.limiter.take(name, client_key(scope), cost)
+        except Exception as e:
+            logger.error(f"Rate limit backend error: {str(e)}")
+            await self.app(scope, receive, send)
+            return
+
+        if not decision.allowed:
+            await self._reject(send, decision)
+            return
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + \
+                    self._limit_headers(decision)
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+    @staticmethod
+    def _limit_headers(decision: RateLimitDecision) -> List[Tuple[bytes, bytes]]:
+        return [
+            (b"x-ratelimit-limit", str(decision.limit).encode()),
+            (b"x-ratelimit-remaining", str(decision.remaining).encode()),
+        ]
+
+    async def _reject(self, send, decision: RateLimitDecision):
+        retry_after = max(1, math.ceil(decision.retry_after))
+        await self._send_error(
+            send, 429, "Too Many Requests",
+            f"Rate limit exceeded, retry in {retry_after}s",
+            [(b"retry-after", str(retry_after).encode())] + self._limit_headers(decision))
+
+    @staticmethod
+    async def _send_error(
+        send,
+        status_code: int,
+        error: str,
+        message: str,
+        headers: Optional[List[Tuple[bytes, bytes]]] = None
+    ):
+        body = json.dumps({
+            "error": error,
+            "message": message,
+            "timestamp": datetime.utcnow().isoformat()
+        }).encode()
+
+        await send({
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+            ] + (headers or [])
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+# Global instance
+rate_limiter = RateLimiter(settings.rate_limits)
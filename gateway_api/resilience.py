@@ -0,0 +1,262 @@
+"""
+Circuit breaker and adaptive concurrency limit for backend services
+
+Each ServiceClient owns a BackendGuard, and each of its replicas a
+CircuitBreaker. Calls are admitted only while fewer than `limit` calls
+are in flight and some replica's circuit is not open; anything else
+fails fast with 503 + Retry-After instead of waiting on a backend that
+is already struggling.
+"""
+from collections import deque
+import logging
+import math
+import time
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from fastapi import HTTPException, status
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ServiceUnavailableError(HTTPException):
+    """Call rejected by the gateway before reaching the backend"""
+
+    def __init__(self, service_name: str, reason: str, retry_after: float):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"{service_name} service unavailable ({reason})",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+        )
+
+
+class CircuitBreaker:
+    """
+    Closed / open / half-open breaker over the last `window` calls
+
+    - closed: calls pass; once at least `min_calls` are recorded, the
+      circuit opens if the share of failed calls reaches `failure_rate` or
+      the share of calls slower than `slow_call_seconds` reaches
+      `slow_call_rate`
+    - open: calls are rejected for `open_seconds`
+    - half-open: up to `half_open_calls` trial calls pass; all of them
+      succeeding closes the circuit, any failed or slow one reopens it
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        window: int = settings.CIRCUIT_BREAKER_WINDOW,
+        min_calls: int = settings.CIRCUIT_BREAKER_MIN_CALLS,
+        failure_rate: float = settings.CIRCUIT_BREAKER_FAILURE_RATE,
+        slow_call_seconds: float = settings.CIRCUIT_BREAKER_SLOW_CALL_MS / 1000,
+        slow_call_rate: float = settings.CIRCUIT_BREAKER_SLOW_CALL_RATE,
+        open_seconds: float = settings.CIRCUIT_BREAKER_OPEN_SECONDS,
+        half_open_calls: int = settings.CIRCUIT_BREAKER_HALF_OPEN_CALLS
+    ):
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate = slow_call_rate
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+
+        self.state = self.CLOSED
+        # (failed, slow) per call; the counters avoid rescanning the window
+        self._outcomes: Deque[Tuple[bool, bool]] = deque(maxlen=window)
+        self._failures = 0
+        self._slow = 0
+        self._opened_at = 0.0
+        self._trials = 0
+        self._trial_successes = 0
+        self._times_opened = 0
+
+    def is_slow(self, latency: float) -> bool:
+        return latency >= self.slow_call_seconds
+
+    def retry_after(self) -> Optional[float]:
+        """Like allow(), without taking a half-open trial slot"""
+        if self.state == self.OPEN:
+            remaining = self._opened_at + self.open_seconds - time.monotonic()
+            return remaining if remaining > 0 else None
+        if self.state == self.HALF_OPEN and self._trials >= self.half_open_calls:
+            return 1.0
+        return None
+
+    def allow(self) -> Optional[float]:
+        """None if a call may proceed, else seconds until it may be retried"""
+        retry_after = self.retry_after()
+        if retry_after is not None:
+            return retry_after
+
+        if self.state == self.OPEN:
+            self.state = self.HALF_OPEN
+            self._trials = 0
+            self._trial_successes = 0
+        if self.state == self.HALF_OPEN:
+            self._trials += 1
+        return None
+
+    def record(self, latency: float, failed: Optional[bool]):
+        """Outcome of an admitted call (failed=None: cancelled, no verdict)"""
+        if self.state == self.HALF_OPEN:
+            if failed is None:
+                self._trials = max(0, self._trials - 1)
+            elif failed or self.is_slow(latency):
+                self._open()
+            else:
+                self._trial_successes += 1
+                if self._trial_successes >= self.half_open_calls:
+                    self._close()
+            return
+
+        if self.state == self.OPEN or failed is None:
+            # Late results of calls started before the circuit opened
+            return
+
+        if len(self._outcomes) == self._outcomes.maxlen:
+            old_failed, old_slow = self._outcomes[0]
+            self._failures -= old_failed
+            self._slow -= old_slow
+        slow = self.is_slow(latency)
+        self._outcomes.append((failed, slow))
+        self._failures += failed
+        self._slow += slow
+
+        calls = len(self._outcomes)
+        if calls >= self.min_calls and (
+                self._failures / calls >= self.failure_rate
+                or self._slow / calls >= self.slow_call_rate):
+            self._open()
+
+    def _open(self):
+        self.state = self.OPEN
+        self._opened_at = time.monotonic()
+        self._times_opened += 1
+
+    def _close(self):
+        self.state = self.CLOSED
+        self._outcomes.clear()
+        self._failures = 0
+        self._slow = 0
+
+    def stats(self) -> Dict[str, Any]:
+        calls = len(self._outcomes)
+        return {
+            "state": self.state,
+            "window_calls": calls,
+            "failure_rate": round(self._failures / calls, 3) if calls else 0.0,
+            "slow_call_rate": round(self._slow / calls, 3) if calls else 0.0,
+            "times_opened": self._times_opened
+        }
+
+
+class AdaptiveLimiter:
+    """
+    AIMD limit on concurrent calls
+
+    Every fast, successful call raises the limit by 1/limit (about +1 per
+    round of `limit` calls) while the limit is actually being used; a
+    failed or slow call multiplies it by `backoff`. The limit follows the
+    concurrency the backend can sustain instead of a fixed guess.
+    """
+
+    def __init__(
+        self,
+        initial: int = settings.CONCURRENCY_LIMIT_INITIAL,
+        min_limit: int = settings.CONCURRENCY_LIMIT_MIN,
+        max_limit: int = settings.CONCURRENCY_LIMIT_MAX,
+        backoff: float = 0.9
+    ):
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.inflight = 0
+
+    def try_acquire(self) -> bool:
+        if self.inflight >= int(self.limit):
+            return False
+        self.inflight += 1
+        return True
+
+    def release(self, failed: Optional[bool], slow: bool):
+        inflight = self.inflight
+        self.inflight -= 1
+        if failed is None:
+            return
+        if failed or slow:
+            self.limit = max(self.min_limit, self.limit * self.backoff)
+        elif inflight * 2 >= self.limit:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": int(self.limit),
+            "inflight": self.inflight
+        }
+
+
+class BackendGuard:
+    """
+    Concurrency limit in front of one backend, plus the circuit breakers
+    of its replicas
+
+    The caller picks a replica among those whose circuit admits calls
+    (see ServiceClient), so a failing replica only opens its own circuit
+    and the others keep serving.
+    """
+
+    def __init__(self, service_name: str):
+        self.service_name = service_name
+        self.limiter = AdaptiveLimiter()
+        self._rejected_open = 0
+        self._rejected_limit = 0
+
+    def admit(self):
+        """Reserve a slot for a call or raise ServiceUnavailableError"""
+        if not self.limiter.try_acquire():
+            self._rejected_limit += 1
+            raise ServiceUnavailableError(
+                self.service_name, "concurrency limit reached", 1)
+
+    def reject_open(self, retry_after: float):
+        """Give back the slot of a call no replica's circuit admits, and raise"""
+        self.limiter.release(None, False)
+        self._rejected_open += 1
+        raise ServiceUnavailableError(
+            self.service_name, "circuit open", retry_after)
+
+    def release(
+        self,
+        breaker: CircuitBreaker,
+        latency: float,
+        failed: Optional[bool],
+        label: str = ""
+    ):
+        """
+        Record the outcome of an admitted call on the replica's breaker
+
+        failed is None when the call was cancelled, which says nothing
+        about the backend's health.
+        """
+        previous = breaker.state
+        breaker.record(latency, failed)
+        self.limiter.release(failed, breaker.is_slow(latency))
+
+        if breaker.state != previous:
+            logger.warning(
+                f"[{self.service_name}] Circuit {label} {previous} -> {breaker.state}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "concurrency": self.limiter.stats(),
+            "rejected": {
+                "circuit_open": self._rejected_open,
+                "concurrency_limit": self._rejected_limit
+            }
+        }
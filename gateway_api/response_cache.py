@@ -0,0 +1,285 @@
+"""
+Response cache for slow-changing GET endpoints
+
+Successful (200) responses of the routes in CACHE_POLICIES are kept in
+memory and served without calling the backend until they expire. Every
+200 response on those routes carries a strong ETag (SHA-256 of the body),
+and a matching If-None-Match is answered with 304 and no body.
+"""
+from collections import OrderedDict
+from dataclasses import dataclass
+import hashlib
+import json
+import logging
+import re
+import time
+from typing import Any, Callable, Dict, List, Optional, Pattern, Tuple
+
+from auth import user_id_from_token
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+IMMUTABLE_MAX_AGE = 31536000
+
+
+def _is_completed(body: bytes) -> bool:
+    """Image records are final only once the job has completed"""
+    try:
+        return json.loads(body).get("status") == "completed"
+    except (ValueError, AttributeError):
+        return False
+
+
+@dataclass
+class CachePolicy:
+    # Seconds a response stays fresh (ignored when immutable)
+    ttl: int = 0
+    # Never expires; only LRU eviction removes it
+    immutable: bool = False
+    # Cache separately per user (key includes the JWT user id)
+    vary_user: bool = False
+    # Whether a given body may be stored (e.g. only finished records)
+    storable: Optional[Callable[[bytes], bool]] = None
+
+    def cache_control(self) -> str:
+        scope = "private" if self.vary_user else "public"
+        if self.immutable:
+            return f"{scope}, max-age={IMMUTABLE_MAX_AGE}, immutable"
+        return f"{scope}, max-age={self.ttl}"
+
+
+CACHE_POLICIES: List[Tuple[Pattern, CachePolicy]] = [
+    # Catalogs change on deploys; the record patterns below must not
+    # take their names for request ids
+    (re.compile(r"^/api/(chat/models|image/models|speech/voices)$"),
+     CachePolicy(ttl=settings.RESPONSE_CACHE_MODELS_TTL, vary_user=True)),
+    (re.compile(r"^/api/image/(?!models$)[^/]+$"),
+     CachePolicy(immutable=True, storable=_is_completed)),
+    (re.compile(r"^/api/speech/(?!voices$)[^/]+$"),
+     CachePolicy(immutable=True)),
+    (re.compile(r"^/api/analytics/(user/me|usage)$"),
+     CachePolicy(ttl=settings.RESPONSE_CACHE_ANALYTICS_TTL, vary_user=True)),
+    (re.compile(r"^/api/analytics/(service/[^/]+|system)$"),
+     CachePolicy(ttl=settings.RESPONSE_CACHE_ANALYTICS_TTL)),
+]
+
+# Response headers that are not stored with a cached body
+_UNCACHED_HEADERS = {b"content-length", b"etag", b"cache-control", b"date", b"server"}
+
+
+def cache_policy(method: str, path: str) -> Optional[CachePolicy]:
+    if method != "GET":
+        return None
+    for pattern, policy in CACHE_POLICIES:
+        if pattern.match(path):
+            return policy
+    return None
+
+
+@dataclass
+class CachedResponse:
+    body: bytes
+    headers: List[Tuple[bytes, bytes]]
+    etag: str
+    cache_control: str
+    expires_at: Optional[float]
+
+
+def make_etag(body: bytes) -> str:
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(
+        tag.strip().removeprefix("W/") == etag
+        for tag in if_none_match.split(",")
+    )
+
+
+class ResponseCache:
+    """LRU of cached responses bounded by entry count and total bytes"""
+
+    def __init__(
+        self,
+        max_entries: int = settings.RESPONSE_CACHE_MAX_ENTRIES,
+        max_bytes: int = settings.RESPONSE_CACHE_MAX_BYTES
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._not_modified = 0
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at is not None \
+                and time.monotonic() >= entry.expires_at:
+            self._remove(key)
+            entry = None
+
+        if entry is None:
+            self._misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self._hits += 1
+        return entry
+
+    def put(self, key: str, entry: CachedResponse):
+        if len(entry.body) > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = entry
+        self._bytes += len(entry.body)
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self._evictions += 1
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key)
+        self._bytes -= len(entry.body)
+
+    def record_not_modified(self):
+        self._not_modified += 1
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self._hits + self._misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": round(self._hits / lookups, 3) if lookups else 0.0,
+            "evictions": self._evictions,
+            "not_modified": self._not_modified
+        }
+
+
+class ResponseCacheMiddleware:
+    """
+    ASGI middleware serving CACHE_POLICIES routes from a ResponseCache
+
+    Misses run the route, buffer its body (only for 200 responses; other
+    statuses stream through untouched) and store it when the policy
+    allows. Requests with a token that does not verify bypass per-user
+    caching so the route can reject them.
+    """
+
+    def __init__(self, app, cache: Optional[ResponseCache] = None):
+        self.app = app
+        self.cache = cache or response_cache
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        policy = cache_policy(scope["method"], scope["path"])
+        key = self._key(scope, policy) if policy else None
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+
+        if_none_match = self._header(scope, b"if-none-match")
+        entry = self.cache.get(key)
+        if entry is not None:
+            await self._send(send, entry, if_none_match, hit=True)
+            return
+
+        start: Optional[dict] = None
+        chunks: List[bytes] = []
+
+        async def capture(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                if message["status"] != 200:
+                    await send(message)
+                    return
+                start = message
+                return
+
+            if start is None:
+                # Not a 200: relayed as is
+                await send(message)
+                return
+
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+
+            body = b"".join(chunks)
+            entry = CachedResponse(
+                body=body,
+                headers=[(name, value) for name, value in start.get("headers", [])
+                         if name.lower() not in _UNCACHED_HEADERS],
+                etag=make_etag(body),
+                cache_control=policy.cache_control(),
+                expires_at=None if policy.immutable else time.monotonic() + policy.ttl
+            )
+            if policy.storable is None or policy.storable(body):
+                self.cache.put(key, entry)
+            else:
+                # Still unfinished: validators only, no client caching
+                entry.cache_control = "no-cache"
+            await self._send(send, entry, if_none_match, hit=False)
+
+        await self.app(scope, receive, capture)
+
+    def _key(self, scope, policy: CachePolicy) -> Optional[str]:
+        query = scope.get("query_string", b"").decode("latin-1")
+        key = f"{scope['path']}?{query}"
+        if not policy.vary_user:
+            return key
+
+        authorization = self._header(scope, b"authorization")
+        if not authorization:
+            return f"{key}|anonymous"
+        scheme, _, token = authorization.partition(" ")
+        user_id = user_id_from_token(token.strip()) \
+            if scheme.lower() == "bearer" else None
+        if user_id is None:
+            return None
+        return f"{key}|user:{user_id}"
+
+    @staticmethod
+    def _header(scope, name: bytes) -> Optional[str]:
+        for header, value in scope["headers"]:
+            if header == name:
+                return value.decode("latin-1")
+        return None
+
+    async def _send(self, send, entry: CachedResponse, if_none_match: Optional[str], hit: bool):
+        validators = [
+            (b"etag", entry.etag.encode()),
+            (b"cache-control", entry.cache_control.encode()),
+            (b"x-cache", b"HIT" if hit else b"MISS"),
+        ]
+
+        if etag_matches(if_none_match, entry.etag):
+            self.cache.record_not_modified()
+            await send({"type": "http.response.start", "status": 304,
+                        "headers": validators})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": entry.headers + validators + [
+                (b"content-length", str(len(entry.body)).encode())]
+        })
+        await send({"type": "http.response.body", "body": entry.body})
+
+
+# Global instance
+response_cache = ResponseCache()
@@ -26,20 +26,14 @@ async def get_my_analytics(
     try:
         headers = get_auth_header(credentials)
 
-        response = await analytics_client.request(
+        response = await analytics_client.stream(
             method="GET",
             endpoint="/analytics/user/me",
             headers=headers,
             params={"time_range": time_range}
         )
 
-        if response.status_code == 200:
-            return response.json()
-        else:
-            raise HTTPException(
-                status_code=response.status_code,
-                detail=response.json().get("detail", "Failed to get analytics")
-            )
+        return await response.relay("Failed to get analytics")
 
     except HTTPException:
         raise
@@ -65,19 +59,13 @@ async def get_service_analytics(
     Proxies to Analytics Service
     """
     try:
-        response = await analytics_client.request(
+        response = await analytics_client.stream(
             method="GET",
             endpoint=f"/analytics/service/{service_type}",
             params={"time_range": time_range}
         )
 
-        if response.status_code == 200:
-            return response.json()
-        else:
-            raise HTTPException(
-                status_code=response.status_code,
-                detail=response.json().get("detail", "Failed to get service analytics")
-            )
+        return await response.relay("Failed to get service analytics")
 
     except HTTPException:
         raise
@@ -102,7 +90,7 @@ async def get_system_analytics(
     Proxies to Analytics Service
     """
     try:
-        response = await analytics_client.request(
+        response = await analytics_client.stream(
             method="GET",
             endpoint="/analytics/system",
             params={
@@ -111,13 +99,7 @@ async def get_system_analytics(
             }
         )
 
-        if response.status_code == 200:
-            return response.json()
-        else:
-            raise HTTPException(
-                status_code=response.status_code,
-                detail=response.json().get("detail", "Failed to get system analytics")
-            )
+        return await response.relay("Failed to get system analytics")
 
     except HTTPException:
         raise
@@ -144,20 +126,14 @@ async def get_usage_stats(
     try:
         headers = get_auth_header(credentials)
 
-        response = await analytics_client.request(
+        response = await analytics_client.stream(
             method="GET",
             endpoint="/analytics/usage",
             headers=headers,
             params={"time_range": time_range}
         )
 
-        if response.status_code == 200:
-            return response.json()
-        else:
-            raise HTTPException(
-                status_code=response.status_code,
-                detail=response.json().get("detail", "Failed to get usage stats")
-            )
+        return await response.relay("Failed to get usage stats")
 
     except HTTPException:
         raise
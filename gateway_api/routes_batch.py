@@ -0,0 +1,130 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.security import HTTPAuthorizationCredentials
+from fastapi.responses import StreamingResponse
+from typing import Any, Dict, Optional
+import asyncio
+import httpx
+import json
+import logging
+import re
+
+from config import settings
+from models import BatchRequest, BatchSubRequest
+from auth import security, require_auth, get_auth_header
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/batch", tags=["Batch"])
+
+# Sub-requests whose responses are binary or already streamed; they would
+# have to be buffered whole to fit in one NDJSON line
+EXCLUDED_PATHS = [
+    re.compile(r"^/api/batch"),
+    re.compile(r"^/api/speech/stream$"),
+    re.compile(r"^/api/image/generate/batch$"),
+    re.compile(r"/content$"),
+]
+
+
+def sub_request_error(sub_request: BatchSubRequest) -> Optional[str]:
+    """Why a sub-request cannot run in a batch, or None"""
+    path = sub_request.path.split("?", 1)[0]
+    if not path.startswith("/api/"):
+        return "Only /api/ paths can be batched"
+    if any(pattern.search(path) for pattern in EXCLUDED_PATHS):
+        return f"{path} cannot be batched"
+    return None
+
+
+async def run_sub_request(
+    client: httpx.AsyncClient,
+    request_id: str,
+    sub_request: BatchSubRequest
+) -> Dict[str, Any]:
+    """Run one sub-request through the gateway's own routes, never raising"""
+    error = sub_request_error(sub_request)
+    if error:
+        return {"id": request_id, "status": 400, "body": None, "error": error}
+
+    try:
+        response = await client.request(
+            sub_request.method,
+            sub_request.path,
+            json=sub_request.body
+        )
+    except Exception as e:
+        logger.error(f"Batch sub-request {request_id} error: {str(e)}")
+        return {"id": request_id, "status": 500, "body": None,
+                "error": str(e) or type(e).__name__}
+
+    result: Dict[str, Any] = {"id": request_id, "status": response.status_code}
+    if "json" in response.headers.get("content-type", ""):
+        result["body"] = response.json()
+    else:
+        result["body"] = None
+        result["error"] = f"Non-JSON response ({response.headers.get('content-type')}) omitted"
+    return result
+
+
+@router.post("")
+async def run_batch(
+    batch: BatchRequest,
+    request: Request,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
+    current_user: dict = Depends(require_auth)
+):
+    """
+    Run several gateway calls in one request
+
+    - POST /api/batch { requests: [{ id?, method, path, body? }], concurrency? }
+    - → application/x-ndjson, one line per sub-request in completion order:
+      { id, status, body } (plus error when there is no body)
+
+    The token is verified once here; sub-requests carry it through the
+    regular routes, where it is a token cache hit. Each sub-request still
+    goes through rate limiting, the response cache and the per-service
+    circuit breakers, as if it had been sent on its own.
+    """
+    if len(batch.requests) > settings.BATCH_MAX_REQUESTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Batch too large: max {settings.BATCH_MAX_REQUESTS} requests"
+        )
+
+    concurrency = min(
+        batch.concurrency or settings.BATCH_CONCURRENCY,
+        settings.BATCH_MAX_CONCURRENCY
+    )
+    semaphore = asyncio.Semaphore(concurrency)
+    logger.info(
+        f"Batch of {len(batch.requests)} requests from user "
+        f"{current_user.get('userId')}, concurrency {concurrency}")
+
+    # Sub-requests are dispatched in-process to this same app
+    client = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=request.app, raise_app_exceptions=False),
+        base_url="http://gateway",
+        headers=get_auth_header(credentials),
+        timeout=None
+    )
+
+    async def run_item(index: int, sub_request: BatchSubRequest) -> Dict[str, Any]:
+        async with semaphore:
+            return await run_sub_request(
+                client, sub_request.id or str(index), sub_request)
+
+    async def stream_results():
+        tasks = [
+            asyncio.create_task(run_item(index, sub_request))
+            for index, sub_request in enumerate(batch.requests)
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield json.dumps(await next_done) + "\n"
+        finally:
+            # Client gone: cancel whatever is still pending
+            for task in tasks:
+                task.cancel()
+            await client.aclose()
+
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
@@ -135,19 +135,13 @@ async def get_sessions(
     try:
         headers = get_auth_header(credentials)
 
-        response = await llm_client.request(
+        response = await llm_client.stream(
             method="GET",
             endpoint="/chat/sessions",
             headers=headers
         )
 
-        if response.status_code == 200:
-            return response.json()
-        else:
-            raise HTTPException(
-                status_code=response.status_code,
-                detail=response.json().get("detail", "Failed to get sessions")
-            )
+        return await response.relay("Failed to get sessions")
 
     except HTTPException:
         raise
@@ -173,19 +167,13 @@ async def get_session(
     try:
         headers = get_auth_header(credentials)
 
-        response = await llm_client.request(
+        response = await llm_client.stream(
             method="GET",
             endpoint=f"/chat/session/{session_id}",
             headers=headers
         )
 
-        if response.status_code == 200:
-            return response.json()
-        else:
-            raise HTTPException(
-                status_code=response.status_code,
-                detail=response.json().get("detail", "Failed to get session")
-            )
+        return await response.relay("Failed to get session")
 
     except HTTPException:
         raise
@@ -209,19 +197,13 @@ async def get_models(
     try:
         headers = get_auth_header(credentials)
 
-        response = await llm_client.request(
+        response = await llm_client.stream(
             method="GET",
             endpoint="/chat/models",
             headers=headers
         )
 
-        if response.status_code == 200:
-            return response.json()
-        else:
-            raise HTTPException(
-                status_code=response.status_code,
-                detail="Failed to get models"
-            )
+        return await response.relay("Failed to get models")
 
     except HTTPException:
         raise
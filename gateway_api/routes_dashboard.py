@@ -0,0 +1,116 @@
+from fastapi import APIRouter, Depends, Query
+from fastapi.security import HTTPAuthorizationCredentials
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+import asyncio
+import logging
+import time
+
+from config import settings
+from service_client import (
+    ServiceClient,
+    llm_client,
+    image_client,
+    speech_client,
+    analytics_client
+)
+from auth import security, require_auth, get_auth_header
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/dashboard", tags=["Dashboard"])
+
+
+@dataclass
+class DashboardSection:
+    name: str
+    client: ServiceClient
+    endpoint: str
+    timeout: float
+    params: Dict[str, Any] = field(default_factory=dict)
+
+
+def dashboard_sections(time_range: str, limit: int) -> List[DashboardSection]:
+    return [
+        DashboardSection("analytics", analytics_client, "/analytics/user/me",
+                         settings.DASHBOARD_ANALYTICS_TIMEOUT, {"time_range": time_range}),
+        DashboardSection("usage", analytics_client, "/analytics/usage",
+                         settings.DASHBOARD_ANALYTICS_TIMEOUT, {"time_range": time_range}),
+        DashboardSection("chat_sessions", llm_client, "/chat/sessions",
+                         settings.DASHBOARD_SECTION_TIMEOUT),
+        DashboardSection("images", image_client, "/admin/images",
+                         settings.DASHBOARD_SECTION_TIMEOUT, {"limit": limit}),
+        DashboardSection("speech", speech_client, "/tts/admin/audios",
+                         settings.DASHBOARD_SECTION_TIMEOUT, {"limit": limit}),
+    ]
+
+
+async def fetch_section(section: DashboardSection, headers: dict) -> Dict[str, Any]:
+    """
+    Fetch one dashboard section, never raising
+
+    The section's timeout cancels the backend call; the section is then
+    reported as "timeout" and the rest of the dashboard is unaffected.
+    """
+    started = time.monotonic()
+    result: Dict[str, Any] = {"status": "ok", "data": None}
+
+    try:
+        response = await asyncio.wait_for(
+            section.client.request(
+                method="GET",
+                endpoint=section.endpoint,
+                headers=headers,
+                params=section.params or None
+            ),
+            timeout=section.timeout
+        )
+        if response.status_code == 200:
+            result["data"] = response.json()
+        else:
+            result["status"] = "error"
+            result["error"] = f"HTTP {response.status_code}"
+
+    except asyncio.TimeoutError:
+        result["status"] = "timeout"
+        result["error"] = f"No response after {section.timeout}s"
+    except Exception as e:
+        logger.error(f"Dashboard section {section.name} error: {str(e)}")
+        result["status"] = "unavailable"
+        result["error"] = getattr(e, "detail", None) or str(e) or type(e).__name__
+
+    result["latency_ms"] = round((time.monotonic() - started) * 1000, 1)
+    return result
+
+
+@router.get("")
+async def get_dashboard(
+    time_range: str = Query(
+        "week", description="Time range: hour, day, week, month, year, all"),
+    limit: int = Query(10, ge=1, le=100,
+                       description="Items per image/speech listing"),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
+    current_user: dict = Depends(require_auth)
+):
+    """
+    Get everything the dashboard shows in one call
+
+    Fans out concurrently to Analytics, LLM Chat, Text-to-Image and
+    Text-to-Speech. Each section carries its own status ("ok", "error",
+    "timeout", "unavailable"); failed sections have data null and the
+    overall status is "partial".
+    """
+    headers = get_auth_header(credentials)
+    sections = dashboard_sections(time_range, limit)
+
+    results = await asyncio.gather(
+        *(fetch_section(section, headers) for section in sections))
+
+    return {
+        "status": "complete" if all(r["status"] == "ok" for r in results) else "partial",
+        "sections": {
+            section.name: result for section, result in zip(sections, results)
+        },
+        "timestamp": datetime.utcnow().isoformat()
+    }
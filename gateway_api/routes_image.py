@@ -1,11 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from fastapi.security import HTTPAuthorizationCredentials
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.background import BackgroundTask
 from typing import Optional
+import json
 import logging
 import time
 
-from models import ImageGenerationRequest, ImageGenerationResponse
-from service_client import image_client
+from models import (
+    ImageGenerationRequest,
+    ImageGenerationResponse,
+    ImageJobResponse,
+    ImageBatchRequest
+)
+from service_client import image_client, MEDIA_RESPONSE_HEADERS
 from auth import security, get_current_user, get_auth_header
 from analytics import AnalyticsMiddleware
 
@@ -15,16 +23,25 @@ router = APIRouter(prefix="/api/image", tags=["Text-to-Image"])
 analytics = AnalyticsMiddleware("text_to_image")
 
 
-@router.post("/generate", response_model=ImageGenerationResponse)
+@router.post(
+    "/generate",
+    response_model=ImageGenerationResponse,
+    responses={202: {"model": ImageJobResponse,
+                     "description": "Job queued (async mode)"}}
+)
 async def generate_image(
     request: ImageGenerationRequest,
+    async_mode: bool = Query(
+        False, alias="async", description="Queue the job and return 202 immediately"),
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
     current_user: Optional[dict] = Depends(get_current_user)
 ):
     """
     Generate image from text prompt
 
-    Proxies to Text-to-Image Service and tracks analytics
+    Proxies to Text-to-Image Service and tracks analytics.
+    With ?async=true the job is queued and its status is polled
+    through GET /api/image/{id}.
     """
     start_time = time.time()
     user_id = current_user.get("userId") if current_user else None
@@ -32,18 +49,30 @@ async def generate_image(
     try:
         headers = get_auth_header(credentials)
 
-        response = await image_client.request(
+        response = await image_client.stream(
             method="POST",
             endpoint="/image/generate",
             headers=headers,
-            json=request.model_dump()
+            json=request.model_dump(),
+            params={"async": "true"} if async_mode else None
         )
 
         response_time_ms = (time.time() - start_time) * 1000
 
-        if response.status_code == 200:
-            data = response.json()
+        if response.status_code == 202:
+            # The only case where the gateway edits the body
+            try:
+                data = json.loads(await response.aread())
+            finally:
+                await response.aclose()
+            data["statusUrl"] = f"/api/image/{data['id']}"
+            return JSONResponse(
+                status_code=status.HTTP_202_ACCEPTED,
+                content=data,
+                headers={"Location": data["statusUrl"]}
+            )
 
+        if response.status_code == 200:
             # Track analytics
             await analytics.track_request(
                 user_id=user_id,
@@ -55,8 +84,6 @@ async def generate_image(
                     "response_time_ms": response_time_ms
                 }
             )
-
-            return data
         else:
             # Track error
             await analytics.track_request(
@@ -65,10 +92,7 @@ async def generate_image(
                 metadata={"response_time_ms": response_time_ms}
             )
 
-            raise HTTPException(
-                status_code=response.status_code,
-                detail=response.json().get("detail", "Image generation failed")
-            )
+        return await response.relay("Image generation failed")
 
     except HTTPException:
         raise
@@ -88,6 +112,65 @@ async def generate_image(
         )
 
 
+@router.post("/generate/batch")
+async def generate_image_batch(
+    request: ImageBatchRequest,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
+    current_user: Optional[dict] = Depends(get_current_user)
+):
+    """
+    Generate several images with bounded concurrency
+
+    Streams the Text-to-Image Service NDJSON results (one line per item,
+    in completion order) without buffering them in the gateway.
+    """
+    user_id = current_user.get("userId") if current_user else None
+
+    try:
+        headers = get_auth_header(credentials)
+
+        response = await image_client.stream(
+            method="POST",
+            endpoint="/image/generate/batch",
+            headers=headers,
+            json=request.model_dump()
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Image batch error: {str(e)}")
+        await analytics.track_request(
+            user_id=user_id,
+            success=False,
+            metadata={"error": str(e), "batch_size": len(request.items)}
+        )
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Text-to-Image service unavailable"
+        )
+
+    if response.status_code != 200:
+        detail = await response.error_detail("Image batch failed")
+        await analytics.track_request(
+            user_id=user_id,
+            success=False,
+            metadata={"batch_size": len(request.items)}
+        )
+        raise HTTPException(status_code=response.status_code, detail=detail)
+
+    await analytics.track_request(
+        user_id=user_id,
+        success=True,
+        metadata={"batch_size": len(request.items)}
+    )
+
+    return StreamingResponse(
+        response.aiter_raw(),
+        media_type="application/x-ndjson",
+        background=BackgroundTask(response.aclose)
+    )
+
+
 @router.get("/{image_id}")
 async def get_image_info(
     image_id: str,
@@ -96,24 +179,19 @@ async def get_image_info(
     """
     Get information about a generated image
 
+    Also reports queued/running/failed status for async jobs.
     Proxies to Text-to-Image Service
     """
     try:
         headers = get_auth_header(credentials)
 
-        response = await image_client.request(
+        response = await image_client.stream(
             method="GET",
             endpoint=f"/image/{image_id}",
             headers=headers
         )
 
-        if response.status_code == 200:
-            return response.json()
-        else:
-            raise HTTPException(
-                status_code=response.status_code,
-                detail=response.json().get("detail", "Image not found")
-            )
+        return await response.relay("Image not found")
 
     except HTTPException:
         raise
@@ -138,19 +216,13 @@ async def get_image_download(
     try:
         headers = get_auth_header(credentials)
 
-        response = await image_client.request(
+        response = await image_client.stream(
             method="GET",
             endpoint=f"/image/{image_id}/download",
             headers=headers
         )
 
-        if response.status_code == 200:
-            return response.json()
-        else:
-            raise HTTPException(
-                status_code=response.status_code,
-                detail=response.json().get("detail", "Image not found")
-            )
+        return await response.relay("Image not found")
 
     except HTTPException:
         raise
@@ -160,3 +232,38 @@ async def get_image_download(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="Text-to-Image service unavailable"
         )
+
+
+@router.get("/{image_id}/content")
+async def get_image_content(
+    image_id: str,
+    request: Request,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security)
+):
+    """
+    Stream the generated image in a single round trip
+
+    Relays Range / If-None-Match to the backend and streams the body
+    back (200, 206 or 304) without buffering it in the gateway
+    """
+    headers = get_auth_header(credentials)
+    for name in ("range", "if-none-match"):
+        if name in request.headers:
+            headers[name] = request.headers[name]
+
+    try:
+        response = await image_client.stream(
+            method="GET",
+            endpoint=f"/image/{image_id}/content",
+            headers=headers
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Get image content error: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Text-to-Image service unavailable"
+        )
+
+    return await response.relay("Image not found", MEDIA_RESPONSE_HEADERS)
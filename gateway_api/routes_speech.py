@@ -1,11 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import HTTPAuthorizationCredentials
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 from typing import Optional
 import logging
 import time
 
 from models import SpeechGenerationRequest, SpeechGenerationResponse
-from service_client import speech_client
+from service_client import speech_client, MEDIA_RESPONSE_HEADERS
 from auth import security, get_current_user, get_auth_header
 from analytics import AnalyticsMiddleware
 
@@ -24,7 +26,8 @@ async def generate_speech(
     """
     Generate speech from text
 
-    Proxies to Text-to-Speech Service and tracks analytics
+    Proxies to Text-to-Speech Service and tracks analytics; the
+    response body is relayed without being decoded
     """
     start_time = time.time()
     user_id = current_user.get("userId") if current_user else None
@@ -32,7 +35,7 @@ async def generate_speech(
     try:
         headers = get_auth_header(credentials)
 
-        response = await speech_client.request(
+        response = await speech_client.stream(
             method="POST",
             endpoint="/tts/generate",
             headers=headers,
@@ -41,10 +44,8 @@ async def generate_speech(
 
         response_time_ms = (time.time() - start_time) * 1000
 
+        # Analytics only needs the request, so the body is relayed as is
         if response.status_code in [200, 201]:
-            data = response.json()
-
-            # Track analytics
             await analytics.track_request(
                 user_id=user_id,
                 success=True,
@@ -52,11 +53,10 @@ async def generate_speech(
                     "text_length": len(request.prompt),
                     "voice": request.voice,
                     "language": request.language,
+                    "format": request.format,
                     "response_time_ms": response_time_ms
                 }
             )
-
-            return data
         else:
             # Track error
             await analytics.track_request(
@@ -65,10 +65,8 @@ async def generate_speech(
                 metadata={"response_time_ms": response_time_ms}
             )
 
-            raise HTTPException(
-                status_code=response.status_code,
-                detail=response.json().get("detail", "Speech generation failed")
-            )
+        # The TTS service answers 201; this route has always answered 200
+        return await response.relay("Speech generation failed", status_code=200)
 
     except HTTPException:
         raise
@@ -88,6 +86,75 @@ async def generate_speech(
         )
 
 
+@router.post("/stream")
+async def stream_speech(
+    request: SpeechGenerationRequest,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
+    current_user: Optional[dict] = Depends(get_current_user)
+):
+    """
+    Generate speech and stream audio/mpeg as it is synthesized
+
+    Relays the backend stream chunk by chunk without buffering it; the
+    request id is returned in the X-Request-Id header
+    """
+    start_time = time.time()
+    user_id = current_user.get("userId") if current_user else None
+    headers = get_auth_header(credentials)
+
+    try:
+        response = await speech_client.stream(
+            method="POST",
+            endpoint="/tts/stream",
+            headers=headers,
+            json=request.model_dump()
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Speech stream error: {str(e)}")
+        await analytics.track_request(
+            user_id=user_id,
+            success=False,
+            metadata={"error": str(e)}
+        )
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Text-to-Speech service unavailable"
+        )
+
+    if response.status_code >= 400:
+        detail = await response.error_detail("Speech generation failed")
+        await analytics.track_request(
+            user_id=user_id,
+            success=False,
+            metadata={"response_time_ms": (time.time() - start_time) * 1000}
+        )
+        raise HTTPException(status_code=response.status_code, detail=detail)
+
+    async def finish():
+        await response.aclose()
+        await analytics.track_request(
+            user_id=user_id,
+            success=True,
+            metadata={
+                "text_length": len(request.prompt),
+                "voice": request.voice,
+                "language": request.language,
+                "streamed": True,
+                "response_time_ms": (time.time() - start_time) * 1000
+            }
+        )
+
+    return StreamingResponse(
+        response.aiter_raw(),
+        status_code=response.status_code,
+        headers=response.passthrough_headers(
+            ("content-type", "cache-control", "x-request-id", "x-cache-hit")),
+        background=BackgroundTask(finish)
+    )
+
+
 @router.get("/{request_id}")
 async def get_speech_info(
     request_id: str,
@@ -101,19 +168,13 @@ async def get_speech_info(
     try:
         headers = get_auth_header(credentials)
 
-        response = await speech_client.request(
+        response = await speech_client.stream(
             method="GET",
             endpoint=f"/tts/{request_id}",
             headers=headers
         )
 
-        if response.status_code == 200:
-            return response.json()
-        else:
-            raise HTTPException(
-                status_code=response.status_code,
-                detail=response.json().get("detail", "Speech not found")
-            )
+        return await response.relay("Speech not found")
 
     except HTTPException:
         raise
@@ -138,19 +199,13 @@ async def get_speech_download(
     try:
         headers = get_auth_header(credentials)
 
-        response = await speech_client.request(
+        response = await speech_client.stream(
             method="GET",
             endpoint=f"/tts/{request_id}/download",
             headers=headers
         )
 
-        if response.status_code == 200:
-            return response.json()
-        else:
-            raise HTTPException(
-                status_code=response.status_code,
-                detail=response.json().get("detail", "Speech not found")
-            )
+        return await response.relay("Speech not found")
 
     except HTTPException:
         raise
@@ -160,3 +215,38 @@ async def get_speech_download(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="Text-to-Speech service unavailable"
         )
+
+
+@router.get("/{request_id}/content")
+async def get_speech_content(
+    request_id: str,
+    request: Request,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security)
+):
+    """
+    Stream the generated audio in a single round trip
+
+    Relays Range / If-None-Match to the backend and streams the body
+    back (200, 206 or 304) without buffering it in the gateway
+    """
+    headers = get_auth_header(credentials)
+    for name in ("range", "if-none-match"):
+        if name in request.headers:
+            headers[name] = request.headers[name]
+
+    try:
+        response = await speech_client.stream(
+            method="GET",
+            endpoint=f"/tts/{request_id}/content",
+            headers=headers
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Get speech content error: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Text-to-Speech service unavailable"
+        )
+
+    return await response.relay("Speech not found", MEDIA_RESPONSE_HEADERS)
@@ -1,18 +1,230 @@
 import httpx
-from typing import Optional, Dict, Any
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from typing import Optional, Dict, Any, AsyncIterator, Iterable, List
 from config import settings
+from resilience import BackendGuard, CircuitBreaker
+import json
 import logging
+import random
+import time
 
 logger = logging.getLogger(__name__)
 
+# Upstream headers forwarded when relaying media bodies
+MEDIA_RESPONSE_HEADERS = (
+    "content-type",
+    "content-length",
+    "content-range",
+    "accept-ranges",
+    "etag",
+    "last-modified",
+    "cache-control"
+)
+
+# Upstream headers forwarded when relaying JSON bodies. Bodies are relayed
+# as received (aiter_raw), so a content-encoding must go along with them.
+JSON_RESPONSE_HEADERS = (
+    "content-type",
+    "content-length",
+    "content-encoding",
+    "cache-control",
+    "etag",
+    "last-modified"
+)
+
+
+class StreamedResponse:
+    """
+    Upstream response whose body has not been read yet
+
+    The body is consumed incrementally with aiter_raw()/aread();
+    aclose() must always be called to release the connection.
+    """
+
+    def __init__(self, client: httpx.AsyncClient, response: httpx.Response):
+        self._client = client
+        self._response = response
+
+    @property
+    def status_code(self) -> int:
+        return self._response.status_code
+
+    @property
+    def headers(self) -> httpx.Headers:
+        return self._response.headers
+
+    def aiter_raw(self) -> AsyncIterator[bytes]:
+        return self._response.aiter_raw()
+
+    async def aread(self) -> bytes:
+        return await self._response.aread()
+
+    async def aclose(self):
+        await self._response.aclose()
+        await self._client.aclose()
+
+    def passthrough_headers(
+        self,
+        names: Iterable[str] = MEDIA_RESPONSE_HEADERS
+    ) -> Dict[str, str]:
+        """Select upstream headers to relay to the client"""
+        return {
+            name: self._response.headers[name]
+            for name in names
+            if name in self._response.headers
+        }
+
+    async def error_detail(self, default: str) -> str:
+        """Read an error body, close the response and return its detail"""
+        try:
+            body = await self.aread()
+        finally:
+            await self.aclose()
+        try:
+            return json.loads(body).get("detail", default)
+        except (ValueError, AttributeError):
+            return default
+
+    async def relay(
+        self,
+        error_detail: str,
+        names: Iterable[str] = JSON_RESPONSE_HEADERS,
+        status_code: Optional[int] = None
+    ) -> StreamingResponse:
+        """
+        Pass the response through to the client without decoding it
+
+        The body bytes and the selected headers are streamed as received,
+        so FastAPI never parses, validates or re-serializes them. Error
+        responses (>= 400) raise HTTPException with the upstream detail.
+        status_code, if given, replaces the upstream status of a success,
+        for routes whose documented status differs from the backend's.
+        """
+        if self.status_code >= 400:
+            raise HTTPException(
+                status_code=self.status_code,
+                detail=await self.error_detail(error_detail)
+            )
+
+        return StreamingResponse(
+            self.aiter_raw(),
+            status_code=status_code or self.status_code,
+            headers=self.passthrough_headers(names),
+            background=BackgroundTask(self.aclose)
+        )
+
+
+class Replica:
+    """
+    One instance of a backend service, with its live load, latency and
+    circuit breaker
+    """
+
+    # Weight of the newest sample in the latency EWMA
+    EWMA_ALPHA = 0.3
+
+    def __init__(self, url: str):
+        self.url = url.rstrip("/")
+        self.healthy = True
+        self.outstanding = 0
+        self.latency_ewma: Optional[float] = None  # seconds
+        self.requests = 0
+        self.failures = 0
+        self.breaker = CircuitBreaker()
+
+    def cost(self) -> float:
+        """Expected wait for one more request: latency times queue depth"""
+        return (self.latency_ewma or 0.0) * (self.outstanding + 1)
+
+    def release(self, latency: float, failed: Optional[bool]):
+        self.outstanding -= 1
+        if failed is None:
+            return
+        self.requests += 1
+        self.failures += failed
+        if self.latency_ewma is None:
+            self.latency_ewma = latency
+        else:
+            self.latency_ewma += self.EWMA_ALPHA * (latency - self.latency_ewma)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "url": self.url,
+            "healthy": self.healthy,
+            "outstanding": self.outstanding,
+            "latency_ewma_ms": round(self.latency_ewma * 1000, 1) if self.latency_ewma is not None else None,
+            "requests": self.requests,
+            "failures": self.failures,
+            "circuit": self.breaker.stats()
+        }
+
 
 class ServiceClient:
-    """HTTP client for communicating with microservices"""
+    """
+    HTTP client for communicating with microservices
+
+    service_url may list several replicas separated by commas. Each call
+    goes to one of them, chosen by power of two choices: two random
+    healthy replicas are compared and the one with the lower latency EWMA
+    x (outstanding requests + 1) wins. Replicas failing the background
+    health check are left out until they pass it again (if none pass, all
+    are used).
+
+    Each replica has its own circuit breaker: replicas whose circuit is
+    open are left out of the choice, so one failing replica doesn't stop
+    calls to the others. request() and stream() also go through the
+    service's BackendGuard (adaptive concurrency limit), and raise
+    ServiceUnavailableError, a 503 HTTPException with Retry-After, when
+    the limit is reached or every replica's circuit is open. 5xx
+    responses, timeouts and connection errors count as failures.
+    """
 
     def __init__(self, service_url: str, service_name: str):
         self.service_url = service_url
         self.service_name = service_name
+        self.replicas: List[Replica] = [
+            Replica(url.strip()) for url in service_url.split(",") if url.strip()
+        ]
         self.timeout = httpx.Timeout(timeout=60.0, connect=10.0)
+        self.guard = BackendGuard(service_name)
+
+    def _pick_replica(self) -> Replica:
+        """
+        Choose the replica for an admitted call, among the healthy ones
+        whose circuit admits it (else any whose circuit admits it)
+        """
+        admitting = [r for r in self.replicas if r.breaker.retry_after() is None]
+        candidates = [r for r in admitting if r.healthy] or admitting
+        if not candidates:
+            self.guard.reject_open(
+                min(r.breaker.retry_after() for r in self.replicas))
+
+        if len(candidates) == 1:
+            chosen = candidates[0]
+        else:
+            first, second = random.sample(candidates, 2)
+            if first.latency_ewma is None or second.latency_ewma is None:
+                # No latency yet (new or readmitted replica): least outstanding
+                chosen = first if first.outstanding <= second.outstanding else second
+            else:
+                chosen = first if first.cost() <= second.cost() else second
+
+        chosen.breaker.allow()
+        return chosen
+
+    def set_replica_health(self, replica: Replica, healthy: bool):
+        """Eject or readmit a replica after a health check"""
+        if replica.healthy == healthy:
+            return
+        replica.healthy = healthy
+        if healthy:
+            # Start from a clean latency estimate
+            replica.latency_ewma = None
+            logger.info(f"[{self.service_name}] Replica {replica.url} readmitted")
+        else:
+            logger.warning(f"[{self.service_name}] Replica {replica.url} ejected")
 
     async def request(
         self,
@@ -37,7 +249,12 @@ class ServiceClient:
         Returns:
             httpx.Response
         """
-        url = f"{self.service_url}{endpoint}"
+        self.guard.admit()
+        replica = self._pick_replica()
+        replica.outstanding += 1
+        url = f"{replica.url}{endpoint}"
+        started = time.monotonic()
+        failed = None
 
         try:
             logger.info(f"[{self.service_name}] {method} {url}")
@@ -52,19 +269,105 @@ class ServiceClient:
                     data=data
                 )
 
+                failed = response.status_code >= 500
                 logger.info(
                     f"[{self.service_name}] Response: {response.status_code}")
                 return response
 
         except httpx.TimeoutException as e:
+            failed = True
+            logger.error(f"[{self.service_name}] Timeout: {str(e)}")
+            raise Exception(f"{self.service_name} service timeout")
+        except httpx.ConnectError as e:
+            failed = True
+            logger.error(f"[{self.service_name}] Connection error: {str(e)}")
+            raise Exception(f"{self.service_name} service unavailable")
+        except Exception as e:
+            failed = True
+            logger.error(f"[{self.service_name}] Error: {str(e)}")
+            raise
+        finally:
+            latency = time.monotonic() - started
+            replica.release(latency, failed)
+            self.guard.release(replica.breaker, latency, failed, replica.url)
+
+    async def stream(
+        self,
+        method: str,
+        endpoint: str,
+        headers: Optional[Dict[str, str]] = None,
+        json: Optional[Dict[str, Any]] = None,
+        params: Optional[Dict[str, Any]] = None
+    ) -> StreamedResponse:
+        """
+        Make a request to the service without buffering the response body
+
+        Returns as soon as the upstream status line and headers arrive.
+        The caller owns the returned StreamedResponse and must aclose() it.
+        The guard records the call when the headers arrive; the time spent
+        relaying the body is not counted.
+        """
+        self.guard.admit()
+        replica = self._pick_replica()
+        replica.outstanding += 1
+        url = f"{replica.url}{endpoint}"
+        started = time.monotonic()
+        failed = None
+        client = httpx.AsyncClient(timeout=self.timeout)
+
+        try:
+            logger.info(f"[{self.service_name}] {method} {url} (stream)")
+
+            upstream_request = client.build_request(
+                method=method,
+                url=url,
+                # Raw bodies are relayed as is, so don't let the upstream
+                # pick an encoding the client never asked for
+                headers={"Accept-Encoding": "identity", **(headers or {})},
+                json=json,
+                params=params
+            )
+            response = await client.send(upstream_request, stream=True)
+
+            failed = response.status_code >= 500
+            logger.info(
+                f"[{self.service_name}] Response: {response.status_code}")
+            return StreamedResponse(client, response)
+
+        except httpx.TimeoutException as e:
+            failed = True
+            await client.aclose()
             logger.error(f"[{self.service_name}] Timeout: {str(e)}")
             raise Exception(f"{self.service_name} service timeout")
         except httpx.ConnectError as e:
+            failed = True
+            await client.aclose()
             logger.error(f"[{self.service_name}] Connection error: {str(e)}")
             raise Exception(f"{self.service_name} service unavailable")
         except Exception as e:
+            failed = True
+            await client.aclose()
             logger.error(f"[{self.service_name}] Error: {str(e)}")
             raise
+        finally:
+            latency = time.monotonic() - started
+            replica.release(latency, failed)
+            self.guard.release(replica.breaker, latency, failed, replica.url)
+
+    async def probe(self, replica: Replica, endpoint: str, timeout: float) -> httpx.Response:
+        """
+        GET a health endpoint of one replica, bypassing the guard
+
+        Health checks must see the backend itself, not the breaker state.
+        """
+        async with httpx.AsyncClient(timeout=timeout) as client:
+            return await client.get(f"{replica.url}{endpoint}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "replicas": [replica.stats() for replica in self.replicas],
+            **self.guard.stats()
+        }
 
 
 # Service clients instances
@@ -10,6 +10,8 @@ class Settings(BaseSettings):
     GITHUB_API_BASE: str = "https://models.inference.ai.azure.com"
     GITHUB_DEFAULT_MODEL: str = "gpt-4o-mini"
     JWT_ACCESS_SECRET: str = "dev-super-secret-access-key-2024"
+    JWT_CACHE_SIZE: int = 10000
+    JWT_CACHE_MAX_TTL: int = 900
     USERS_SERVICE_URL: str = "http://users-service:3000"
     LOG_LEVEL: str = "INFO"
 
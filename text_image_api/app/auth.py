@@ -5,9 +5,11 @@ from typing import Optional, Dict, Any
 import httpx
 import logging
 from app.config import settings
+from app.token_cache import TokenCache
 
 security = HTTPBearer()
 logger = logging.getLogger(__name__)
+token_cache = TokenCache(settings.jwt_cache_size, settings.jwt_cache_max_ttl)
 
 
 class AuthService:
@@ -25,13 +27,16 @@ class AuthService:
         """
         try:
             # Verificar token con HS256 (clave simétrica)
-            payload = jwt.decode(
-                token,
-                self.jwt_secret,
-                algorithms=["HS256"]
-            )
-            logger.info(
-                f"Token verified locally for user: {payload.get('sub')}")
+            payload = token_cache.get(token)
+            if payload is None:
+                payload = jwt.decode(
+                    token,
+                    self.jwt_secret,
+                    algorithms=["HS256"]
+                )
+                token_cache.put(token, payload)
+                logger.info(
+                    f"Token verified locally for user: {payload.get('sub')}")
 
             return {
                 "user_id": payload.get("sub"),
@@ -12,9 +12,35 @@ class Settings(BaseSettings):
     s3_secret_key: str = "minio123"
     s3_region: str = "us-east-1"
     s3_bucket: str = "llmhist-image-dev"
+    # Tamaño de parte para multipart uploads (mínimo S3: 5 MiB)
+    s3_multipart_part_size: int = 5 * 1024 * 1024
+
+    # URLs firmadas y descargas
+    signed_url_cache_size: int = 10000
+    signed_url_refresh_margin: int = 60
+    download_chunk_size: int = 64 * 1024
 
     # Pollinations API
     pollinations_base_url: str = "https://image.pollinations.ai/prompt"
+    # Pipe provider response straight into S3 instead of buffering it
+    image_streaming_upload: bool = True
+    image_stream_chunk_size: int = 64 * 1024
+
+    # Async image jobs (?async=true)
+    image_job_workers: int = 4
+    image_job_queue_size: int = 100
+    image_job_ttl_seconds: int = 3600
+    # Un trabajo queued/running persistido sin cambios durante este tiempo
+    # se da por perdido (su proceso se reinició)
+    image_job_lost_after_seconds: int = 900
+
+    # Batch generation (/image/generate/batch)
+    image_batch_concurrency: int = 4
+    image_batch_max_concurrency: int = 16
+    image_batch_max_items: int = 500
+
+    # Listado de imágenes (/admin/images)
+    image_list_prefetch_concurrency: int = 8
 
     # Analytics
     analytics_url: Optional[str] = None
@@ -25,6 +51,9 @@ class Settings(BaseSettings):
     # JWT Authentication
     # Debe coincidir con users service
     jwt_access_secret: str = "dev-super-secret-access-key-2024"
+    # Caché de tokens verificados (las entradas caducan también en su exp)
+    jwt_cache_size: int = 10000
+    jwt_cache_max_ttl: int = 900
 
     class Config:
         env_file = ".env"
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import Optional, List
 from datetime import datetime
 
 
@@ -43,3 +43,14 @@ class ImageRecord(BaseModel):
     createdAt: str
     artifacts: dict
     meta: dict
+
+
+class ImageJobResponse(BaseModel):
+    id: str
+    status: str = "queued"
+    statusUrl: str
+
+
+class ImageBatchRequest(BaseModel):
+    items: List[ImageGenerationRequest] = Field(..., min_length=1)
+    concurrency: Optional[int] = Field(None, ge=1)
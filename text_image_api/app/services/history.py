@@ -1,32 +1,30 @@
+import asyncio
+import base64
 import json
+import time
 import uuid
 import hashlib
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, AsyncIterator, List, Tuple
+from app.config import settings
 from app.services.s3 import S3Client
 from app.services.pollinations import PollinationsClient
 from app.models.image import ImageRecord
 
+# Las keys del índice llevan 10^13 - epoch en ms (13 dígitos hasta 2286)
+INDEX_MS_CEILING = 10 ** 13
+
 
 class ImageHistoryService:
     def __init__(self):
         self.s3_client = S3Client()
         self.pollinations_client = PollinationsClient()
+        # Usuarios cuyo índice jsonl previo ya se migró (ver _migrate_legacy_index)
+        self._migrated_users: set = set()
 
-    async def save_image_history(
-        self,
-        user_id: str,
-        username: str,
-        prompt: str,
-        image_bytes: bytes,
-        metadata: Dict[str, Any],
-        latency_ms: int
-    ) -> Dict[str, Any]:
-        """
-        Guarda el historial de generación de imagen en S3
-        siguiendo la estructura definida en la especificación
-        """
-        req_id = str(uuid.uuid4())
+    def _new_request(self, req_id: Optional[str] = None) -> Dict[str, Any]:
+        """Genera id, fecha y carpeta base de una nueva petición"""
+        req_id = req_id or str(uuid.uuid4())
         dt = datetime.utcnow()
         yyyy, mm, dd = dt.strftime("%Y"), dt.strftime("%m"), dt.strftime("%d")
 
@@ -34,7 +32,15 @@ class ImageHistoryService:
         base_path = f"requests/{yyyy}/{mm}/{dd}/{req_id}/"
         print(f"🗂️ Guardando historial en: {base_path}")
 
-        # 1. Guardar input.json
+        return {
+            "id": req_id,
+            "dt": dt,
+            "base_path": base_path,
+            "image_key": base_path + "image/original.png"
+        }
+
+    def _save_input(self, base_path: str, prompt: str, metadata: Dict[str, Any]):
+        """Guarda input.json"""
         input_data = {
             "prompt": prompt,
             "size": metadata.get("size", "1024x1024"),
@@ -44,18 +50,24 @@ class ImageHistoryService:
         input_key = base_path + "input.json"
         self.s3_client.put_json(input_key, input_data)
 
-        # 2. Guardar imagen original
-        image_key = base_path + "image/original.png"
-        self.s3_client.put_bytes(
-            image_key,
-            image_bytes,
-            metadata.get("content_type", "image/png")
-        )
+    async def _save_record(
+        self,
+        req: Dict[str, Any],
+        user_id: str,
+        username: str,
+        prompt: str,
+        output_bytes: int,
+        metadata: Dict[str, Any],
+        latency_ms: int,
+        sha256: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Crea record.json, actualiza el índice del usuario y arma la respuesta"""
+        req_id, dt, base_path = req["id"], req["dt"], req["base_path"]
+        image_key = req["image_key"]
 
-        # 3. Crear hash del prompt para privacidad
+        # Crear hash del prompt para privacidad
         prompt_hash = f"sha256:{hashlib.sha256(prompt.encode()).hexdigest()}"
 
-        # 4. Crear record.json
         record_data = {
             "id": req_id,
             "userId": user_id,
@@ -70,7 +82,7 @@ class ImageHistoryService:
             "tokens": {"in": 0, "out": 0},  # No aplica para imágenes
             "size": {
                 "inputBytes": len(prompt.encode()),
-                "outputBytes": len(image_bytes)
+                "outputBytes": output_bytes
             },
             "cost": {"usd": 0.0},  # Pollinations es gratuito
             "createdAt": dt.isoformat() + "Z",
@@ -85,14 +97,16 @@ class ImageHistoryService:
                 }
             }
         }
+        if sha256:
+            record_data["checksum"] = {"sha256": sha256}
 
         record_key = base_path + "record.json"
-        self.s3_client.put_json(record_key, record_data)
+        await asyncio.to_thread(self.s3_client.put_json, record_key, record_data)
 
-        # 5. Actualizar índice por usuario (opcional para listados rápidos)
-        await self._update_user_index(user_id, req_id, record_key, yyyy, mm, dd)
+        # Actualizar índice por usuario (opcional para listados rápidos)
+        await self._update_user_index(user_id, req_id, record_key, dt)
 
-        # 6. Retornar respuesta según especificación
+        # Retornar respuesta según especificación
         return {
             "id": req_id,
             "s3": {
@@ -101,39 +115,284 @@ class ImageHistoryService:
             }
         }
 
+    async def save_image_history(
+        self,
+        user_id: str,
+        username: str,
+        prompt: str,
+        image_bytes: bytes,
+        metadata: Dict[str, Any],
+        latency_ms: int,
+        req_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Guarda el historial de generación de imagen en S3
+        siguiendo la estructura definida en la especificación
+        """
+        req = self._new_request(req_id)
+
+        # 1. Guardar input.json
+        await asyncio.to_thread(
+            self._save_input, req["base_path"], prompt, metadata)
+
+        # 2. Guardar imagen original
+        await asyncio.to_thread(
+            self.s3_client.put_bytes,
+            req["image_key"],
+            image_bytes,
+            metadata.get("content_type", "image/png")
+        )
+
+        # 3. Crear record.json y actualizar índice
+        return await self._save_record(
+            req, user_id, username, prompt, len(image_bytes), metadata, latency_ms
+        )
+
+    async def save_image_history_stream(
+        self,
+        user_id: str,
+        username: str,
+        prompt: str,
+        chunks: AsyncIterator[bytes],
+        metadata: Dict[str, Any],
+        started_at: float,
+        req_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Igual que save_image_history pero la imagen llega como stream del
+        proveedor y se sube a S3 mientras llega (ver S3Client.put_stream).
+        La latencia se mide al terminar de recibir la imagen.
+        """
+        req = self._new_request(req_id)
+
+        # 1. Guardar input.json
+        await asyncio.to_thread(
+            self._save_input, req["base_path"], prompt, metadata)
+
+        # 2. Subir imagen mientras se recibe
+        upload = await self.s3_client.put_stream(
+            req["image_key"],
+            chunks,
+            metadata.get("content_type", "image/png"),
+            content_length=metadata.get("content_length")
+        )
+        latency_ms = int((time.time() - started_at) * 1000)
+
+        # 3. Crear record.json y actualizar índice
+        result = await self._save_record(
+            req, user_id, username, prompt, upload["size"], metadata,
+            latency_ms, sha256=upload["sha256"]
+        )
+        result["latencyMs"] = latency_ms
+        result["outputBytes"] = upload["size"]
+        return result
+
     async def _update_user_index(
         self,
         user_id: str,
         req_id: str,
         record_key: str,
-        yyyy: str,
-        mm: str,
-        dd: str
+        dt: datetime
     ):
-        """Actualiza el índice jsonl por usuario para listados rápidos"""
-        index_key = f"users/{user_id}/image/history/{yyyy}/{mm}/{dd}.jsonl"
+        """
+        Agrega la imagen al índice del usuario: un objeto por imagen, sin
+        leer ni reescribir nada, así peticiones concurrentes no se pisan
+        """
+        created_ms = self._epoch_ms(dt)
+        await asyncio.to_thread(
+            self.s3_client.put_json,
+            self._index_key(user_id, created_ms, req_id),
+            {"id": req_id, "record": record_key, "createdAt": dt.isoformat() + "Z"}
+        )
 
-        # Leer índice existente
-        existing_data = self.s3_client.try_get_object(index_key)
-        existing_content = existing_data.decode() if existing_data else ""
+    @staticmethod
+    def _epoch_ms(dt: datetime) -> int:
+        return int((dt - datetime(1970, 1, 1)).total_seconds() * 1000)
 
-        # Agregar nueva línea
-        new_line = json.dumps({
-            "id": req_id,
-            "record": record_key,
-            "timestamp": f"{yyyy}-{mm}-{dd}"
-        }) + "\n"
-
-        # Guardar índice actualizado
-        updated_content = existing_content + new_line
-        self.s3_client.put_bytes(
-            index_key,
-            updated_content.encode(),
-            "application/jsonl"
+    def _user_index_prefix(self, user_id: str) -> str:
+        return f"users/{user_id}/image/history/index/"
+
+    def _index_key(self, user_id: str, created_ms: int, req_id: str) -> str:
+        """
+        users/{user-id}/image/history/index/{ms invertidos}_{id}.json: en orden
+        lexicográfico (el de list_objects_v2) las más recientes van primero
+        """
+        inverted = INDEX_MS_CEILING - created_ms
+        return f"{self._user_index_prefix(user_id)}{inverted:013d}_{req_id}.json"
+
+    def _index_entry(self, user_id: str, index_key: str) -> Dict[str, str]:
+        """id y record.json de una entrada del índice, a partir de su key"""
+        name = index_key[len(self._user_index_prefix(user_id)):-len(".json")]
+        inverted, req_id = name.split("_", 1)
+        dt = datetime.utcfromtimestamp((INDEX_MS_CEILING - int(inverted)) / 1000)
+        return {"id": req_id, "record": f"requests/{dt:%Y/%m/%d}/{req_id}/record.json"}
+
+    async def _migrate_legacy_index(self, user_id: str):
+        """
+        Copia una vez los índices diarios jsonl previos
+        (users/{user-id}/image/history/{yyyy}/{mm}/{dd}.jsonl) al índice por
+        objeto. Solo conocen el día, así que se ordenan por día y posición.
+        Reintentar es inofensivo: cada entrada va siempre a la misma key.
+        """
+        if user_id in self._migrated_users:
+            return
+
+        legacy_prefix = f"users/{user_id}/image/history/"
+        marker_key = legacy_prefix + "legacy-index-migrated.json"
+        if await asyncio.to_thread(self.s3_client.try_get_object, marker_key) is None:
+            # Solo los prefijos {yyyy}/ del formato previo, no index/
+            year_prefixes = [
+                prefix for prefix in await asyncio.to_thread(
+                    self.s3_client.list_prefixes, legacy_prefix)
+                if prefix[len(legacy_prefix):-1].isdigit()
+            ]
+            keys = []
+            for year_prefix in year_prefixes:
+                keys.extend(await asyncio.to_thread(self.s3_client.list_keys, year_prefix))
+            for key in keys:
+                if not key.endswith(".jsonl"):
+                    continue
+                day = datetime.strptime(key[len(legacy_prefix):-len(".jsonl")], "%Y/%m/%d")
+                data = await asyncio.to_thread(self.s3_client.get_object, key)
+                lines = [line for line in data.decode().splitlines() if line]
+                for position, line in enumerate(lines):
+                    entry = json.loads(line)
+                    created_ms = self._epoch_ms(day) + position
+                    await asyncio.to_thread(
+                        self.s3_client.put_json,
+                        self._index_key(user_id, created_ms, entry["id"]),
+                        {"id": entry["id"], "record": entry["record"],
+                         "createdAt": day.isoformat() + "Z"}
+                    )
+            await asyncio.to_thread(
+                self.s3_client.put_json, marker_key, {"migratedAt": time.time()})
+
+        self._migrated_users.add(user_id)
+
+    @staticmethod
+    def _encode_cursor(last_key: str) -> str:
+        return base64.urlsafe_b64encode(last_key.encode()).decode().rstrip("=")
+
+    def _decode_cursor(self, user_id: str, cursor: str) -> str:
+        """Key de la última entrada de la página anterior"""
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            name = base64.urlsafe_b64decode(padded).decode()
+        except Exception:
+            raise ValueError("Invalid cursor")
+        if "/" in name or not name.endswith(".json"):
+            raise ValueError("Invalid cursor")
+        return self._user_index_prefix(user_id) + name
+
+    async def list_user_images(
+        self,
+        user_id: str,
+        limit: int = 20,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Lista las imágenes del usuario, más recientes primero, con paginación
+        por cursor sobre el índice por objeto.
+
+        Cada página es un solo list_objects_v2 con MaxKeys=limit que arranca
+        (StartAfter) en la última key de la página anterior, así el costo no
+        depende de cuántas imágenes haya antes ni en el mismo día, y nuevas
+        imágenes no desplazan páginas posteriores.
+
+        Retorna: (records, next_cursor)
+        """
+        start_after = None
+        if cursor:
+            start_after = self._decode_cursor(user_id, cursor)
+        else:
+            await self._migrate_legacy_index(user_id)
+
+        keys, truncated = await asyncio.to_thread(
+            self.s3_client.list_keys_page,
+            self._user_index_prefix(user_id),
+            limit,
+            start_after
         )
+        entries = [self._index_entry(user_id, key) for key in keys]
+
+        next_cursor = None
+        if truncated and keys:
+            next_cursor = self._encode_cursor(
+                keys[-1][len(self._user_index_prefix(user_id)):])
+
+        records = await self._prefetch_records(
+            [entry["record"] for entry in entries])
+        return [record for record in records if record], next_cursor
+
+    async def _prefetch_records(self, record_keys: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """Descarga los record.json en paralelo con fan-out acotado"""
+        semaphore = asyncio.Semaphore(settings.image_list_prefetch_concurrency)
+
+        async def fetch(key: str) -> Optional[Dict[str, Any]]:
+            async with semaphore:
+                try:
+                    return await asyncio.to_thread(self.s3_client.get_json, key)
+                except Exception as e:
+                    print(f"⚠️ Record no disponible {key}: {e}")
+                    return None
+
+        return await asyncio.gather(*(fetch(key) for key in record_keys))
+
+    @staticmethod
+    def _job_status_key(job_id: str) -> str:
+        # Sin fecha: el estado se consulta con un único GET
+        return f"requests/jobs/{job_id}.json"
+
+    async def save_job_status(self, job: Dict[str, Any]):
+        """
+        Guarda el estado de un trabajo asíncrono en requests/jobs/{id}.json
+        para que cualquier worker o réplica pueda consultarlo. Al completarse
+        incluye la key de su record.json.
+        """
+        status = {
+            "id": job["id"],
+            "status": job["status"],
+            "createdAt": job["createdAt"],
+            "updatedAt": job["updatedAt"],
+            "error": job["error"]
+        }
+        if job["status"] == "completed" and job.get("result"):
+            status["record"] = job["result"]["s3"]["record"]
+        await asyncio.to_thread(
+            self.s3_client.put_json, self._job_status_key(job["id"]), status)
+
+    async def get_job_status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Estado persistido de un trabajo, None si no existe.
+        Un trabajo queued/running sin cambios durante
+        `image_job_lost_after_seconds` se reporta como failed: el proceso
+        que lo tenía en su cola se reinició.
+        """
+        data = await asyncio.to_thread(
+            self.s3_client.try_get_object, self._job_status_key(job_id))
+        if not data:
+            return None
+
+        status = json.loads(data.decode())
+        if status["status"] in ("queued", "running") and \
+                time.time() - status["updatedAt"] > settings.image_job_lost_after_seconds:
+            status["status"] = "failed"
+            status["error"] = "Job lost: the service restarted before it finished"
+        return status
+
+    async def get_image_record(
+        self,
+        image_id: str,
+        record_key: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Obtiene el record de una imagen por su ID. Con `record_key` (p. ej.
+        el del estado de su trabajo) se lee directamente.
+        """
+        if record_key:
+            data = await asyncio.to_thread(self.s3_client.try_get_object, record_key)
+            return json.loads(data.decode()) if data else None
 
-    async def get_image_record(self, image_id: str) -> Optional[Dict[str, Any]]:
-        """Obtiene el record de una imagen por su ID"""
         # Búsqueda simple: intentar encontrar en estructura de fechas recientes
         dt = datetime.utcnow()
 
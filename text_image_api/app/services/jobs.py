@@ -0,0 +1,146 @@
+import asyncio
+import time
+import uuid
+from typing import Optional, Dict, Any, Callable, Awaitable, List
+from app.config import settings
+
+
+JobHandler = Callable[[str], Awaitable[Dict[str, Any]]]
+JobPersister = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+class ImageJobQueueFull(Exception):
+    """La cola de trabajos alcanzó su capacidad máxima"""
+
+
+class ImageJobManager:
+    """
+    Pool acotado de workers para la generación asíncrona de imágenes.
+
+    Los trabajos se encolan y como máximo `workers` generaciones se
+    ejecutan a la vez contra el proveedor. El estado de cada trabajo
+    (queued, running, completed, failed) se mantiene en memoria durante
+    `ttl_seconds` tras finalizar y, si se indica `persist`, también se
+    guarda en cada transición (p. ej. en S3), de modo que otros workers o
+    réplicas puedan consultarlo y sobreviva a un reinicio.
+
+    La cola en sí vive en memoria: los trabajos encolados o en curso de un
+    proceso que se reinicia se pierden (ver ImageHistoryService.get_job_status).
+    """
+
+    def __init__(
+        self,
+        workers: int = settings.image_job_workers,
+        queue_size: int = settings.image_job_queue_size,
+        ttl_seconds: int = settings.image_job_ttl_seconds,
+        persist: Optional[JobPersister] = None
+    ):
+        self.workers = workers
+        self.ttl_seconds = ttl_seconds
+        self.persist = persist
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.jobs: Dict[str, Dict[str, Any]] = {}
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self):
+        """Arranca los workers del pool"""
+        if self._tasks:
+            return
+        self._tasks = [
+            asyncio.create_task(self._worker(n)) for n in range(self.workers)
+        ]
+        print(f"✅ Image job pool started with {self.workers} workers")
+
+    async def stop(self):
+        """Detiene los workers (los trabajos pendientes se descartan)"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def submit(self, handler: JobHandler, job_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Encola un trabajo y retorna su estado inicial.
+        Lanza ImageJobQueueFull si la cola está llena.
+        """
+        self._purge_expired()
+
+        job_id = job_id or str(uuid.uuid4())
+        now = time.time()
+        job = {
+            "id": job_id,
+            "status": "queued",
+            "createdAt": now,
+            "updatedAt": now,
+            "result": None,
+            "error": None
+        }
+
+        try:
+            self.queue.put_nowait((job_id, handler))
+        except asyncio.QueueFull:
+            raise ImageJobQueueFull(
+                f"Image job queue is full ({self.queue.maxsize} pending jobs)")
+
+        self.jobs[job_id] = job
+        await self._persist(job)
+        return job
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Obtiene el estado de un trabajo, None si no existe o expiró"""
+        return self.jobs.get(job_id)
+
+    def stats(self) -> Dict[str, int]:
+        """Resumen del estado del pool"""
+        running = sum(1 for job in self.jobs.values()
+                      if job["status"] == "running")
+        return {
+            "workers": self.workers,
+            "queued": self.queue.qsize(),
+            "running": running
+        }
+
+    async def _worker(self, n: int):
+        while True:
+            job_id, handler = await self.queue.get()
+            job = self.jobs.get(job_id)
+            try:
+                if job is None:
+                    continue
+                job["status"] = "running"
+                job["updatedAt"] = time.time()
+                await self._persist(job)
+                job["result"] = await handler(job_id)
+                job["status"] = "completed"
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"❌ Image job {job_id} failed: {str(e)}")
+                job["status"] = "failed"
+                job["error"] = str(e)
+            finally:
+                if job is not None:
+                    job["updatedAt"] = time.time()
+                    # Un trabajo cancelado (apagado) queda como running
+                    if job["status"] in ("completed", "failed"):
+                        await self._persist(job)
+                self.queue.task_done()
+
+    async def _persist(self, job: Dict[str, Any]):
+        """Guarda el estado del trabajo; un fallo no afecta al trabajo"""
+        if self.persist is None:
+            return
+        try:
+            await self.persist(job)
+        except Exception as e:
+            print(f"⚠️ No se pudo persistir el estado del trabajo {job['id']}: {str(e)}")
+
+    def _purge_expired(self):
+        """Elimina trabajos finalizados cuyo TTL ya venció"""
+        cutoff = time.time() - self.ttl_seconds
+        expired = [
+            job_id for job_id, job in self.jobs.items()
+            if job["status"] in ("completed", "failed") and job["updatedAt"] < cutoff
+        ]
+        for job_id in expired:
+            del self.jobs[job_id]
@@ -1,6 +1,7 @@
 import httpx
 import hashlib
-from typing import Optional
+from contextlib import asynccontextmanager
+from typing import Optional, AsyncIterator, Tuple
 from datetime import datetime
 from app.config import settings
 
@@ -9,18 +10,14 @@ class PollinationsClient:
     def __init__(self):
         self.base_url = settings.pollinations_base_url
 
-    async def generate_image(
+    def _build_request(
         self,
         prompt: str,
-        size: str = "1024x1024",
-        seed: Optional[int] = None,
-        model: str = "flux"
-    ) -> tuple[bytes, dict]:
-        """
-        Genera una imagen usando Pollinations.ai
-        Retorna: (image_bytes, metadata)
-        """
-        # Construir URL con parámetros
+        size: str,
+        seed: Optional[int],
+        model: str
+    ) -> tuple[str, dict]:
+        """Construye URL y parámetros de la petición a Pollinations"""
         url = f"{self.base_url}/{prompt}"
 
         params = {
@@ -32,23 +29,82 @@ class PollinationsClient:
         if seed:
             params["seed"] = seed
 
+        return url, params
+
+    def _build_metadata(
+        self,
+        response: httpx.Response,
+        size: str,
+        seed: Optional[int],
+        model: str,
+        content_length: Optional[int]
+    ) -> dict:
+        return {
+            "provider": "pollinations",
+            "model": model,
+            "size": size,
+            "seed": seed,
+            "content_type": response.headers.get("content-type", "image/png"),
+            "content_length": content_length
+        }
+
+    async def generate_image(
+        self,
+        prompt: str,
+        size: str = "1024x1024",
+        seed: Optional[int] = None,
+        model: str = "flux"
+    ) -> tuple[bytes, dict]:
+        """
+        Genera una imagen usando Pollinations.ai
+        Retorna: (image_bytes, metadata)
+        """
+        url, params = self._build_request(prompt, size, seed, model)
+
         async with httpx.AsyncClient(timeout=60.0) as client:
             response = await client.get(url, params=params)
             response.raise_for_status()
 
             image_bytes = response.content
 
-            metadata = {
-                "provider": "pollinations",
-                "model": model,
-                "size": size,
-                "seed": seed,
-                "content_type": response.headers.get("content-type", "image/png"),
-                "content_length": len(image_bytes)
-            }
+            metadata = self._build_metadata(
+                response, size, seed, model, len(image_bytes))
 
             return image_bytes, metadata
 
+    @asynccontextmanager
+    async def stream_image(
+        self,
+        prompt: str,
+        size: str = "1024x1024",
+        seed: Optional[int] = None,
+        model: str = "flux"
+    ) -> AsyncIterator[Tuple[AsyncIterator[bytes], dict]]:
+        """
+        Genera una imagen sin leer la respuesta completa en memoria
+        Uso:
+            async with client.stream_image(prompt) as (chunks, metadata):
+                async for chunk in chunks: ...
+
+        content_length en metadata es el header del proveedor (puede ser None)
+        """
+        url, params = self._build_request(prompt, size, seed, model)
+
+        async with httpx.AsyncClient(timeout=60.0) as client:
+            async with client.stream("GET", url, params=params) as response:
+                response.raise_for_status()
+
+                # Con Content-Encoding, aiter_bytes entrega más bytes que
+                # el Content-Length del proveedor
+                content_length = response.headers.get("content-length")
+                if response.headers.get("content-encoding", "identity") != "identity":
+                    content_length = None
+                metadata = self._build_metadata(
+                    response, size, seed, model,
+                    int(content_length) if content_length else None)
+
+                yield response.aiter_bytes(settings.image_stream_chunk_size), metadata
+
     def create_prompt_hash(self, prompt: str) -> str:
         """Crea un hash SHA256 del prompt para privacidad"""
         return hashlib.sha256(prompt.encode()).hexdigest()
@@ -1,12 +1,115 @@
+import asyncio
 import boto3
+import concurrent.futures
+import hashlib
 import json
+import time
 import uuid
+from collections import OrderedDict
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, AsyncIterator, List, Tuple
+from botocore.config import Config
 from botocore.exceptions import ClientError
 from app.config import settings
 
 
+class SignedUrlCache:
+    """
+    Cache LRU de URLs firmadas. Una URL se reutiliza hasta `refresh_margin`
+    segundos antes de su expiración.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = settings.signed_url_cache_size,
+        refresh_margin: int = settings.signed_url_refresh_margin
+    ):
+        self.max_entries = max_entries
+        self.refresh_margin = refresh_margin
+        self._entries: "OrderedDict[Tuple[str, int], Tuple[str, float]]" = OrderedDict()
+
+    def get(self, key: str, expiration: int) -> Optional[Tuple[str, int]]:
+        """Retorna (url, segundos restantes) o None si no hay URL reutilizable"""
+        entry = self._entries.get((key, expiration))
+        if entry is None:
+            return None
+
+        url, expires_at = entry
+        remaining = int(expires_at - time.time())
+        if remaining <= self.refresh_margin:
+            del self._entries[(key, expiration)]
+            return None
+
+        self._entries.move_to_end((key, expiration))
+        return url, remaining
+
+    def put(self, key: str, expiration: int, url: str, signed_at: float):
+        self._entries[(key, expiration)] = (url, signed_at + expiration)
+        self._entries.move_to_end((key, expiration))
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+class AsyncIteratorReader:
+    """
+    Objeto tipo archivo (solo read) sobre un async iterator, para pasarlo
+    como Body a boto3 desde un hilo. Cada read pide el siguiente chunk al
+    event loop, así en memoria solo está el chunk en curso.
+
+    No expone seek/tell a propósito: boto3 no intenta rebobinarlo. abort()
+    libera el hilo si la petición se cancela mientras espera un chunk. Si el
+    stream termina con otro tamaño que `length` el read falla, en lugar de
+    dejar a S3 esperando los bytes que faltan.
+    """
+
+    def __init__(
+        self,
+        chunks: AsyncIterator[bytes],
+        loop: asyncio.AbstractEventLoop,
+        length: int
+    ):
+        self._chunks = chunks.__aiter__()
+        self._loop = loop
+        self._length = length
+        self._received = 0
+        self._pending = memoryview(b"")
+        self._done = False
+        self._aborted = False
+        self._next: Optional[concurrent.futures.Future] = None
+
+    def abort(self):
+        """Hace fallar el read en curso y los siguientes"""
+        self._aborted = True
+        if self._next is not None:
+            self._next.cancel()
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            return b"".join(iter(lambda: self.read(64 * 1024), b""))
+
+        while not self._pending and not self._done:
+            if self._aborted:
+                raise IOError("Stream aborted")
+            self._next = asyncio.run_coroutine_threadsafe(
+                self._chunks.__anext__(), self._loop)
+            try:
+                self._pending = memoryview(self._next.result())
+            except StopAsyncIteration:
+                self._done = True
+            except concurrent.futures.CancelledError:
+                raise IOError("Stream aborted")
+
+            self._received += len(self._pending)
+            if self._received > self._length or \
+                    (self._done and self._received != self._length):
+                raise IOError(
+                    f"Stream size {self._received} does not match Content-Length {self._length}")
+
+        data = bytes(self._pending[:size])
+        self._pending = self._pending[size:]
+        return data
+
+
 class S3Client:
     def __init__(self):
         self.client = boto3.client(
@@ -16,7 +119,23 @@ class S3Client:
             aws_secret_access_key=settings.s3_secret_key,
             region_name=settings.s3_region
         )
+        # Para PUTs en streaming: firmar el payload o calcularle un checksum
+        # exigiría leerlo entero antes de enviarlo (UNSIGNED-PAYLOAD y
+        # checksum solo donde la API lo exige, no en PutObject; el tamaño se
+        # verifica y el sha256 queda en record.json)
+        self.stream_client = boto3.client(
+            's3',
+            endpoint_url=settings.s3_endpoint,
+            aws_access_key_id=settings.s3_access_key,
+            aws_secret_access_key=settings.s3_secret_key,
+            region_name=settings.s3_region,
+            config=Config(
+                s3={"payload_signing_enabled": False},
+                request_checksum_calculation="when_required"
+            )
+        )
         self.bucket = settings.s3_bucket
+        self.signed_urls = SignedUrlCache()
 
     async def ensure_bucket_exists(self):
         """Asegura que el bucket existe, lo crea si no existe"""
@@ -58,6 +177,126 @@ class S3Client:
             print(f"❌ Error guardando bytes {key}: {e}")
             raise
 
+    async def put_stream(
+        self,
+        key: str,
+        chunks: AsyncIterator[bytes],
+        content_type: str = 'application/octet-stream',
+        content_length: Optional[int] = None,
+        part_size: int = settings.s3_multipart_part_size
+    ) -> Dict[str, Any]:
+        """
+        Sube un stream a S3 sin mantenerlo completo en memoria. El tamaño y
+        el SHA256 se calculan al vuelo.
+
+        - Con `content_length` conocido: un único put_object en streaming;
+          en memoria solo está el chunk en curso.
+        - Sin él: multipart upload con partes de `part_size` (mínimo S3:
+          5 MiB); objetos menores que una parte se suben con un único
+          put_object.
+
+        Retorna: {"key", "size", "sha256"}
+        """
+        sha256 = hashlib.sha256()
+        size = 0
+
+        async def hashed_chunks():
+            nonlocal size
+            async for chunk in chunks:
+                sha256.update(chunk)
+                size += len(chunk)
+                yield chunk
+
+        if content_length is not None:
+            body = AsyncIteratorReader(
+                hashed_chunks(), asyncio.get_running_loop(), content_length)
+            try:
+                await asyncio.to_thread(
+                    self.stream_client.put_object,
+                    Bucket=self.bucket,
+                    Key=key,
+                    Body=body,
+                    ContentLength=content_length,
+                    ContentType=content_type
+                )
+            except BaseException as e:
+                # Cancelada (cliente desconectado): el hilo sigue en put_object
+                body.abort()
+                print(f"❌ Error guardando stream {key}: {e}")
+                raise
+            if size != content_length:
+                raise ValueError(
+                    f"Stream size {size} does not match Content-Length {content_length}")
+
+            print(f"✅ Guardado stream en S3: {key} ({size} bytes)")
+            return {"key": key, "size": size, "sha256": sha256.hexdigest()}
+
+        buffer = bytearray()
+        upload_id = None
+        parts = []
+
+        async def upload_part():
+            part_number = len(parts) + 1
+            response = await asyncio.to_thread(
+                self.client.upload_part,
+                Bucket=self.bucket,
+                Key=key,
+                UploadId=upload_id,
+                PartNumber=part_number,
+                Body=bytes(buffer)
+            )
+            parts.append({"ETag": response["ETag"], "PartNumber": part_number})
+            buffer.clear()
+
+        try:
+            async for chunk in hashed_chunks():
+                buffer.extend(chunk)
+
+                if len(buffer) >= part_size:
+                    if upload_id is None:
+                        response = await asyncio.to_thread(
+                            self.client.create_multipart_upload,
+                            Bucket=self.bucket,
+                            Key=key,
+                            ContentType=content_type
+                        )
+                        upload_id = response["UploadId"]
+                    await upload_part()
+
+            if upload_id is None:
+                # Objeto pequeño: un solo PUT
+                await asyncio.to_thread(
+                    self.client.put_object,
+                    Bucket=self.bucket,
+                    Key=key,
+                    Body=bytes(buffer),
+                    ContentType=content_type
+                )
+            else:
+                if buffer:
+                    await upload_part()
+                await asyncio.to_thread(
+                    self.client.complete_multipart_upload,
+                    Bucket=self.bucket,
+                    Key=key,
+                    UploadId=upload_id,
+                    MultipartUpload={"Parts": parts}
+                )
+
+            print(f"✅ Guardado stream en S3: {key} ({size} bytes)")
+            return {"key": key, "size": size, "sha256": sha256.hexdigest()}
+
+        except BaseException as e:
+            print(f"❌ Error guardando stream {key}: {e}")
+            if upload_id is not None:
+                await asyncio.to_thread(
+                    self.client.abort_multipart_upload,
+                    Bucket=self.bucket,
+                    Key=key,
+                    UploadId=upload_id
+                )
+            raise
+
     def get_object(self, key: str) -> bytes:
         """Obtiene un objeto de S3"""
         response = self.client.get_object(Bucket=self.bucket, Key=key)
@@ -77,6 +316,39 @@ class S3Client:
                 return None
             raise
 
+    def list_keys(self, prefix: str) -> List[str]:
+        """Lista las keys bajo un prefijo (paginando)"""
+        keys = []
+        paginator = self.client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix):
+            keys.extend(obj['Key'] for obj in page.get('Contents', []))
+        return keys
+
+    def list_prefixes(self, prefix: str) -> List[str]:
+        """Lista los "subdirectorios" directos de un prefijo (Delimiter="/")"""
+        prefixes = []
+        paginator = self.client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix, Delimiter='/'):
+            prefixes.extend(p['Prefix'] for p in page.get('CommonPrefixes', []))
+        return prefixes
+
+    def list_keys_page(
+        self,
+        prefix: str,
+        max_keys: int,
+        start_after: Optional[str] = None
+    ) -> Tuple[List[str], bool]:
+        """
+        Una página de keys bajo un prefijo en orden lexicográfico, después de
+        start_after. Retorna (keys, hay_más)
+        """
+        params = {'Bucket': self.bucket, 'Prefix': prefix, 'MaxKeys': max_keys}
+        if start_after:
+            params['StartAfter'] = start_after
+        response = self.client.list_objects_v2(**params)
+        keys = [obj['Key'] for obj in response.get('Contents', [])]
+        return keys, response.get('IsTruncated', False)
+
     def generate_signed_url(self, key: str, expiration: int = 300) -> str:
         """Genera una URL firmada para acceso temporal"""
         return self.client.generate_presigned_url(
@@ -84,3 +356,34 @@ class S3Client:
             Params={'Bucket': self.bucket, 'Key': key},
             ExpiresIn=expiration
         )
+
+    def get_signed_url_cached(self, key: str, expiration: int = 300) -> Tuple[str, int]:
+        """
+        Igual que generate_signed_url pero reutiliza URLs aún vigentes.
+        Retorna (url, segundos hasta que expira)
+        """
+        cached = self.signed_urls.get(key, expiration)
+        if cached:
+            return cached
+
+        signed_at = time.time()
+        url = self.generate_signed_url(key, expiration=expiration)
+        self.signed_urls.put(key, expiration, url, signed_at)
+        return url, expiration
+
+    def open_object(
+        self,
+        key: str,
+        range_header: Optional[str] = None,
+        if_none_match: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Abre un objeto para lectura en streaming (Body sin leer).
+        Soporta Range e If-None-Match; S3 responde 304/416 como ClientError.
+        """
+        params = {"Bucket": self.bucket, "Key": key}
+        if range_header:
+            params["Range"] = range_header
+        if if_none_match:
+            params["IfNoneMatch"] = if_none_match
+        return self.client.get_object(**params)
@@ -0,0 +1,85 @@
+"""
+Cache of verified JWT claims
+
+Source of the token_cache.py in every service. Docker builds each service
+from its own directory, so each one keeps a byte-identical copy: edit this
+file and run `make sync-shared` (`make check-shared` fails on drift). It
+reads no settings; each service creates its instance in its auth module.
+"""
+from collections import OrderedDict
+import hashlib
+import time
+from typing import Any, Dict, Optional, Tuple
+
+
+class TokenCache:
+    """
+    Claims of access tokens that already passed verification
+
+    Entries are keyed by the SHA-256 digest of the token, so raw tokens are
+    not kept in memory. An entry expires at the token's `exp` claim, and
+    never later than max_ttl seconds after it was cached (so a rotated
+    secret takes effect); past max_size the least recently used entry is
+    evicted. Only valid tokens are stored: a hit skips the signature check
+    and the base64/JSON decoding, a miss costs one extra hash.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        max_ttl: int
+    ):
+        self.max_size = max_size
+        self.max_ttl = max_ttl
+        self._entries: "OrderedDict[bytes, Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    @staticmethod
+    def _digest(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        """Claims of a previously verified token, or None"""
+        key = self._digest(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            self._misses += 1
+            return None
+
+        claims, expires_at = entry
+        if time.time() >= expires_at:
+            del self._entries[key]
+            self._misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self._hits += 1
+        return claims
+
+    def put(self, token: str, claims: Dict[str, Any]):
+        """Remember the claims of a token that was just verified"""
+        if self.max_size <= 0:
+            return
+
+        expires_at = time.time() + self.max_ttl
+        exp = claims.get("exp")
+        if isinstance(exp, (int, float)):
+            expires_at = min(expires_at, exp)
+
+        key = self._digest(token)
+        self._entries[key] = (claims, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self._hits + self._misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": round(self._hits / lookups, 3) if lookups else 0.0
+        }
+
@@ -1,15 +1,26 @@
-from fastapi import FastAPI, HTTPException, Header, Depends
+from fastapi import FastAPI, HTTPException, Header, Depends, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse, Response
+from starlette.background import BackgroundTask
+from botocore.exceptions import ClientError
+import asyncio
+import json
 import time
 import uuid
 import sys
 import logging
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 from app.config import settings
-from app.models.image import ImageGenerationRequest, ImageGenerationResponse
+from app.models.image import (
+    ImageGenerationRequest,
+    ImageGenerationResponse,
+    ImageJobResponse,
+    ImageBatchRequest
+)
 from app.services.pollinations import PollinationsClient
 from app.services.s3 import S3Client
 from app.services.history import ImageHistoryService
+from app.services.jobs import ImageJobManager, ImageJobQueueFull
 from app.auth import get_current_user_optional, get_current_user
 
 # Configure logging
@@ -39,16 +50,24 @@ app.add_middleware(
 pollinations_client = PollinationsClient()
 s3_client = S3Client()
 history_service = ImageHistoryService()
+image_jobs = ImageJobManager(persist=history_service.save_job_status)
 
 
 @app.on_event("startup")
 async def startup_event():
     """Inicialización del servicio"""
     await s3_client.ensure_bucket_exists()
+    await image_jobs.start()
     print(f"✅ Text-to-Image service started on port {settings.port}")
     print(f"✅ S3 bucket '{settings.s3_bucket}' ready")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Detiene el pool de trabajos asíncronos"""
+    await image_jobs.stop()
+
+
 @app.get("/")
 async def root():
     return {
@@ -65,27 +84,8 @@ async def health_check():
     return {"status": "healthy", "timestamp": time.time()}
 
 
-@app.post("/image/generate", response_model=ImageGenerationResponse)
-async def generate_image(
-    request: ImageGenerationRequest,
-    current_user: Optional[Dict[str, Any]] = Depends(
-        get_current_user_optional),
-    x_request_id: Optional[str] = Header(None, alias="x-request-id"),
-):
-    """
-    Genera una imagen usando Pollinations.ai
-
-    Siguiendo la especificación:
-    - POST /image/generate { prompt, size?, seed?, style? } 
-    - → { id, s3:{record,image,preview?}, meta }
-
-    Acepta usuarios autenticados y anónimos.
-    """
-
-    # Generar IDs si no se proporcionan
-    request_id = x_request_id or str(uuid.uuid4())
-
-    # Obtener información del usuario (autenticado o anónimo)
+def resolve_user(current_user: Optional[Dict[str, Any]]) -> Tuple[str, str]:
+    """Retorna (user_id, username) del usuario autenticado o anónimo"""
     logger.info(f"Current user received: {current_user}")
     if current_user:
         user_id = current_user["user_id"]
@@ -95,12 +95,45 @@ async def generate_image(
         user_id = "anonymous"
         username = "anonymous"
         logger.info("Anonymous user request")
+    return user_id, username
 
+
+async def run_image_generation(
+    request: ImageGenerationRequest,
+    user_id: str,
+    username: str,
+    image_id: Optional[str] = None
+) -> ImageGenerationResponse:
+    """
+    Genera la imagen con Pollinations y persiste el historial en S3.
+    Compartido por el modo síncrono y por los workers del modo asíncrono.
+    """
     start_time = time.time()
 
-    try:
-        print(f"🚀 Iniciando generación para prompt: '{request.prompt}'")
+    print(f"🚀 Iniciando generación para prompt: '{request.prompt}'")
 
+    if settings.image_streaming_upload:
+        # 1-2. Generar con Pollinations y subir a S3 a medida que llega
+        async with pollinations_client.stream_image(
+            prompt=request.prompt,
+            size=request.size,
+            seed=request.seed,
+            model=request.model or "flux"
+        ) as (chunks, metadata):
+            print(f"💾 Guardando historial (stream) para usuario: {user_id}")
+            result = await history_service.save_image_history_stream(
+                user_id=user_id,
+                username=username,
+                prompt=request.prompt,
+                chunks=chunks,
+                metadata=metadata,
+                started_at=start_time,
+                req_id=image_id
+            )
+        latency_ms = result["latencyMs"]
+        print(
+            f"🖼️ Imagen generada, latencia: {latency_ms}ms, tamaño: {result['outputBytes']} bytes")
+    else:
         # 1. Generar imagen con Pollinations
         image_bytes, metadata = await pollinations_client.generate_image(
             prompt=request.prompt,
@@ -121,30 +154,92 @@ async def generate_image(
             prompt=request.prompt,
             image_bytes=image_bytes,
             metadata=metadata,
-            latency_ms=latency_ms
+            latency_ms=latency_ms,
+            req_id=image_id
         )
-        print(f"✅ Historial guardado: {result['id']}")
+    print(f"✅ Historial guardado: {result['id']}")
+
+    # 3. TODO: Enviar evento a Analytics (cuando esté implementado)
+    # await send_analytics_event(...)
+
+    # 4. Preparar respuesta
+    return ImageGenerationResponse(
+        id=result["id"],
+        status="completed",
+        prompt=request.prompt,
+        user_id=user_id if user_id != "anonymous" else None,
+        s3=result["s3"],
+        meta={
+            "provider": metadata["provider"],
+            "model": metadata["model"],
+            "size": metadata["size"],
+            "latencyMs": latency_ms,
+            "contentType": metadata["content_type"]
+        }
+    )
 
-        # 3. TODO: Enviar evento a Analytics (cuando esté implementado)
-        # await send_analytics_event(...)
 
-        # 4. Preparar respuesta
-        response = ImageGenerationResponse(
-            id=result["id"],
-            status="completed",
-            prompt=request.prompt,
-            user_id=user_id if user_id != "anonymous" else None,
-            s3=result["s3"],
-            meta={
-                "provider": metadata["provider"],
-                "model": metadata["model"],
-                "size": metadata["size"],
-                "latencyMs": latency_ms,
-                "contentType": metadata["content_type"]
-            }
+@app.post(
+    "/image/generate",
+    response_model=ImageGenerationResponse,
+    responses={202: {"model": ImageJobResponse,
+                     "description": "Job queued (async mode)"}}
+)
+async def generate_image(
+    request: ImageGenerationRequest,
+    current_user: Optional[Dict[str, Any]] = Depends(
+        get_current_user_optional),
+    x_request_id: Optional[str] = Header(None, alias="x-request-id"),
+    async_mode: bool = Query(False, alias="async"),
+):
+    """
+    Genera una imagen usando Pollinations.ai
+
+    Siguiendo la especificación:
+    - POST /image/generate { prompt, size?, seed?, style? } 
+    - → { id, s3:{record,image,preview?}, meta }
+
+    Con `?async=true` retorna 202 con el id del trabajo inmediatamente;
+    el estado se consulta con GET /image/{id}.
+
+    Acepta usuarios autenticados y anónimos.
+    """
+
+    # Generar IDs si no se proporcionan
+    request_id = x_request_id or str(uuid.uuid4())
+
+    # Obtener información del usuario (autenticado o anónimo)
+    user_id, username = resolve_user(current_user)
+
+    if async_mode:
+        async def handler(job_id: str) -> Dict[str, Any]:
+            response = await run_image_generation(
+                request, user_id, username, image_id=job_id)
+            return response.model_dump()
+
+        try:
+            job = await image_jobs.submit(handler)
+        except ImageJobQueueFull as e:
+            print(f"⚠️ {str(e)}")
+            raise HTTPException(
+                status_code=503,
+                detail="Image generation queue is full, retry later",
+                headers={"Retry-After": "5"}
+            )
+
+        print(f"📥 Trabajo encolado: {job['id']}")
+        return JSONResponse(
+            status_code=202,
+            content=ImageJobResponse(
+                id=job["id"],
+                status=job["status"],
+                statusUrl=f"/image/{job['id']}"
+            ).model_dump(),
+            headers={"Location": f"/image/{job['id']}"}
         )
 
-        return response
+    try:
+        return await run_image_generation(request, user_id, username)
 
     except Exception as e:
         print(f"❌ Error generating image: {str(e)}")
@@ -154,6 +249,75 @@ async def generate_image(
         )
 
 
+@app.post("/image/generate/batch")
+async def generate_image_batch(
+    batch: ImageBatchRequest,
+    current_user: Optional[Dict[str, Any]] = Depends(
+        get_current_user_optional),
+):
+    """
+    Genera varias imágenes con concurrencia acotada
+
+    - POST /image/generate/batch { items: [...], concurrency? }
+    - → application/x-ndjson, una línea por item en orden de finalización:
+      { index, id, status: completed, result } | { index, status: failed, error }
+    """
+    if len(batch.items) > settings.image_batch_max_items:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Batch too large: max {settings.image_batch_max_items} items"
+        )
+
+    user_id, username = resolve_user(current_user)
+
+    concurrency = min(
+        batch.concurrency or settings.image_batch_concurrency,
+        settings.image_batch_max_concurrency
+    )
+    semaphore = asyncio.Semaphore(concurrency)
+    print(
+        f"📦 Batch de {len(batch.items)} imágenes, concurrencia: {concurrency}")
+
+    async def run_item(index: int, item: ImageGenerationRequest) -> Dict[str, Any]:
+        async with semaphore:
+            try:
+                response = await run_image_generation(item, user_id, username)
+                return {
+                    "index": index,
+                    "id": response.id,
+                    "status": "completed",
+                    "result": response.model_dump()
+                }
+            except Exception as e:
+                print(f"❌ Error en item {index} del batch: {str(e)}")
+                return {"index": index, "status": "failed", "error": str(e)}
+
+    async def stream_results():
+        tasks = [
+            asyncio.create_task(run_item(index, item))
+            for index, item in enumerate(batch.items)
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield json.dumps(await next_done) + "\n"
+        finally:
+            # Si el cliente se desconecta, cancelar lo pendiente
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+
+def job_status_response(job: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": job["id"],
+        "status": job["status"],
+        "s3Keys": {},
+        "meta": {},
+        "error": job["error"]
+    }
+
+
 @app.get("/image/{image_id}")
 async def get_image(image_id: str):
     """
@@ -161,13 +325,26 @@ async def get_image(image_id: str):
 
     Siguiendo la especificación:
     - GET /image/:id → { status, s3Keys, meta }
+
+    status puede ser queued, running, failed o completed
     """
 
+    # Trabajos asíncronos aún en curso o fallidos de este proceso
+    job = image_jobs.get(image_id)
+    if job and job["status"] != "completed":
+        return job_status_response(job)
+
     try:
         print(f"🔍 Buscando imagen con ID: {image_id}", flush=True)
 
-        # Obtener record de la imagen
-        record = await history_service.get_image_record(image_id)
+        # Trabajo de otro worker/réplica, o de antes de un reinicio (un GET)
+        job = await history_service.get_job_status(image_id)
+        if job and job["status"] != "completed":
+            return job_status_response(job)
+
+        # Obtener record de la imagen (directo si el trabajo indica su key)
+        record = await history_service.get_image_record(
+            image_id, record_key=job.get("record") if job else None)
 
         print(f"📄 Record encontrado: {record is not None}", flush=True)
 
@@ -221,12 +398,13 @@ async def download_image(
                 detail="Image file not found in storage"
             )
 
-        # Generar URL firmada válida por 5 minutos
-        signed_url = s3_client.generate_signed_url(image_key, expiration=300)
+        # URL firmada válida por 5 minutos (reutilizada mientras siga vigente)
+        signed_url, expires_in = s3_client.get_signed_url_cached(
+            image_key, expiration=300)
 
         return {
             "downloadUrl": signed_url,
-            "expiresIn": 300,
+            "expiresIn": expires_in,
             "user": current_user["email"] if current_user else "anonymous"
         }
 
@@ -240,24 +418,102 @@ async def download_image(
         )
 
 
+@app.get("/image/{image_id}/content")
+async def stream_image_content(
+    image_id: str,
+    range_header: Optional[str] = Header(None, alias="range"),
+    if_none_match: Optional[str] = Header(None, alias="if-none-match"),
+):
+    """
+    Sirve la imagen directamente desde S3 en streaming, sin URL firmada
+
+    Soporta Range (206), If-None-Match (304) y ETag; el objeto no se
+    carga completo en memoria.
+    """
+    record = await history_service.get_image_record(image_id)
+    image_key = record.get("artifacts", {}).get("image") if record else None
+    if not image_key:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Image with ID {image_id} not found"
+        )
+
+    try:
+        obj = await asyncio.to_thread(
+            s3_client.open_object, image_key, range_header, if_none_match)
+    except ClientError as e:
+        code = e.response["Error"]["Code"]
+        if code in ("304", "NotModified"):
+            return Response(status_code=304, headers={"ETag": if_none_match})
+        if code in ("416", "InvalidRange"):
+            raise HTTPException(status_code=416, detail="Invalid range")
+        if code in ("404", "NoSuchKey"):
+            raise HTTPException(
+                status_code=404, detail="Image file not found in storage")
+        raise HTTPException(
+            status_code=500, detail=f"Error reading image: {str(e)}")
+
+    headers = {
+        "Accept-Ranges": "bytes",
+        "ETag": obj["ETag"],
+        "Content-Length": str(obj["ContentLength"]),
+        "Cache-Control": "private, max-age=31536000, immutable"
+    }
+    if obj.get("ContentRange"):
+        headers["Content-Range"] = obj["ContentRange"]
+
+    body = obj["Body"]
+    return StreamingResponse(
+        body.iter_chunks(settings.download_chunk_size),
+        status_code=206 if obj.get("ContentRange") else 200,
+        media_type=obj.get("ContentType", "image/png"),
+        headers=headers,
+        background=BackgroundTask(body.close)
+    )
+
+
 @app.get("/admin/images")
-async def list_images_admin(current_user: Dict[str, Any] = Depends(get_current_user)):
+async def list_images_admin(
+    current_user: Dict[str, Any] = Depends(get_current_user),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None),
+):
     """
     Endpoint protegido solo para usuarios autenticados
-    Lista las imágenes del usuario actual
+    Lista las imágenes del usuario actual, más recientes primero
+
+    Paginación por cursor: pasar `nextCursor` de la respuesta como `cursor`
     """
     user_id = current_user["user_id"]
     username = current_user["email"]
 
-    # En una implementación real, esto buscaría en S3 o una base de datos
-    # Por ahora, retornamos información básica
+    try:
+        records, next_cursor = await history_service.list_user_images(
+            user_id, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    images = [
+        {
+            "id": record["id"],
+            "status": "completed",
+            "prompt": record.get("prompt"),
+            "model": record.get("model"),
+            "createdAt": record.get("createdAt"),
+            "s3Keys": record.get("artifacts", {}),
+            "meta": record.get("meta", {})
+        }
+        for record in records
+    ]
+
     return {
-        "message": "Protected endpoint accessed successfully",
         "user": {
             "id": user_id,
             "email": username
         },
-        "images": []  # Aquí iría la lista real de imágenes
+        "images": images,
+        "limit": limit,
+        "nextCursor": next_cursor
     }
 
 
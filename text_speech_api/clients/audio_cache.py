@@ -0,0 +1,134 @@
+"""Content-addressed cache for synthesized audio"""
+import asyncio
+import hashlib
+import logging
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Optional, Dict, Any
+
+from config import settings
+from clients.s3 import s3_client
+from clients.transcoder import AUDIO_FORMATS
+
+logger = logging.getLogger(__name__)
+
+
+class AudioCache:
+    """
+    Two-tier cache of synthesized audio keyed by
+    sha256(normalized text, language, slow flag)
+
+    - Memory tier: LRU of recent clips; bytes are kept only for clips up to
+      `max_clip_bytes`, bounded by `max_memory_bytes` in total
+    - S3 tier: content-addressed objects at cache/{hash}.{ext}, referenced
+      by every record that produced the same audio
+
+    The MP3 synthesized by gTTS is cached under its format "mp3"; other
+    output formats are cached as separate variants of the same hash.
+    """
+
+    def __init__(
+        self,
+        max_memory_bytes: int = settings.tts_cache_memory_max_bytes,
+        max_clip_bytes: int = settings.tts_cache_memory_max_clip_bytes,
+        max_entries: int = settings.tts_cache_memory_max_entries
+    ):
+        self.max_memory_bytes = max_memory_bytes
+        self.max_clip_bytes = max_clip_bytes
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = {"memory": 0, "s3": 0}
+        self.misses = 0
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Unicode NFC, trimmed, with whitespace runs collapsed"""
+        return " ".join(unicodedata.normalize("NFC", text).split())
+
+    def cache_key(self, prompt: str, voice: str, slow: bool) -> str:
+        material = "\x1f".join(
+            [self.normalize(prompt), voice.strip().lower(), "slow" if slow else "normal"])
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def object_key(digest: str, audio_format: str = "mp3") -> str:
+        profile = AUDIO_FORMATS[audio_format]
+        return f"cache/{digest}.{profile.get('cache_extension', profile['extension'])}"
+
+    async def get(self, digest: str, audio_format: str = "mp3") -> Optional[Dict[str, Any]]:
+        """
+        Look up cached audio
+
+        Returns:
+            {"key", "size", "audio", "tier"} (audio is None unless held in
+            memory) or None on a miss
+        """
+        key = self.object_key(digest, audio_format)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits["memory"] += 1
+                return {**entry, "tier": "memory"}
+
+        size = await asyncio.to_thread(s3_client.head_object_size, key)
+        if size is None:
+            self.misses += 1
+            return None
+
+        self.hits["s3"] += 1
+        self._remember(key, size, None)
+        return {"key": key, "size": size, "audio": None, "tier": "s3"}
+
+    async def read(self, entry: Dict[str, Any]) -> bytes:
+        """Audio bytes of a cache entry, downloading S3-tier entries"""
+        if entry["audio"] is not None:
+            return entry["audio"]
+        obj = await asyncio.to_thread(s3_client.open_object, entry["key"])
+        return await asyncio.to_thread(obj["Body"].read)
+
+    async def put(self, digest: str, audio_bytes: bytes, audio_format: str = "mp3") -> Dict[str, Any]:
+        """Store audio under its content address and return its reference"""
+        key = self.object_key(digest, audio_format)
+        await asyncio.to_thread(
+            s3_client.put_audio, key, audio_bytes, AUDIO_FORMATS[audio_format]["content_type"])
+        self._remember(key, len(audio_bytes), audio_bytes)
+        return {"key": key, "size": len(audio_bytes), "audio": audio_bytes}
+
+    def _remember(self, key: str, size: int, audio: Optional[bytes]):
+        if audio is not None and len(audio) > self.max_clip_bytes:
+            audio = None
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous and previous["audio"] is not None:
+                self._memory_bytes -= len(previous["audio"])
+
+            self._entries[key] = {"key": key, "size": size, "audio": audio}
+            if audio is not None:
+                self._memory_bytes += len(audio)
+
+            while self._entries and (
+                self._memory_bytes > self.max_memory_bytes
+                or len(self._entries) > self.max_entries
+            ):
+                _, evicted = self._entries.popitem(last=False)
+                if evicted["audio"] is not None:
+                    self._memory_bytes -= len(evicted["audio"])
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "memory_bytes": self._memory_bytes,
+                "hits_memory": self.hits["memory"],
+                "hits_s3": self.hits["s3"],
+                "misses": self.misses
+            }
+
+
+# Global instance
+audio_cache = AudioCache()
@@ -0,0 +1,71 @@
+"""Text chunking and MP3 concatenation for parallel synthesis"""
+import re
+from typing import List, Pattern
+
+# Split points, from most to least natural. Western punctuation needs a
+# following space; CJK punctuation is not followed by whitespace. Splits
+# happen after the punctuation, so it stays with the preceding piece (a
+# dash only counts when spaced, not inside a hyphenated word).
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?…])\s+|(?<=[。！？])")
+CLAUSE_BOUNDARY = re.compile(r"(?<=[,;:])\s+|(?<=[，；：、])|(?<=\s[—–-])\s+")
+WORD_BOUNDARY = re.compile(r"\s+")
+
+
+def split_for_synthesis(text: str, max_chars: int) -> List[str]:
+    """
+    Split text into chunks of at most max_chars characters
+
+    Prefers sentence boundaries, then clause boundaries, then spaces; only
+    a single word longer than max_chars is cut mid-word. Adjacent pieces
+    are packed back together so chunks stay close to max_chars.
+    """
+    text = text.strip()
+    if len(text) <= max_chars:
+        return [text]
+
+    pieces = _split_long(
+        text, max_chars, [SENTENCE_BOUNDARY, CLAUSE_BOUNDARY, WORD_BOUNDARY])
+
+    chunks: List[str] = []
+    current = ""
+    for piece in pieces:
+        if current and len(current) + 1 + len(piece) > max_chars:
+            chunks.append(current)
+            current = piece
+        else:
+            current = f"{current} {piece}" if current else piece
+    if current:
+        chunks.append(current)
+
+    return chunks
+
+
+def _split_long(segment: str, max_chars: int, boundaries: List[Pattern]) -> List[str]:
+    if len(segment) <= max_chars:
+        return [segment]
+
+    if not boundaries:
+        return [segment[i:i + max_chars] for i in range(0, len(segment), max_chars)]
+
+    parts = [part.strip()
+             for part in boundaries[0].split(segment) if part.strip()]
+    if len(parts) == 1:
+        return _split_long(segment, max_chars, boundaries[1:])
+
+    result: List[str] = []
+    for part in parts:
+        result.extend(_split_long(part, max_chars, boundaries[1:]))
+    return result
+
+
+def strip_id3(audio: bytes) -> bytes:
+    """Drop a leading ID3v2 tag so MP3 chunks can be concatenated as frames"""
+    if len(audio) < 10 or audio[:3] != b"ID3":
+        return audio
+
+    # Tag size is a 28-bit synchsafe integer (7 bits per byte)
+    size = 0
+    for byte in audio[6:10]:
+        size = (size << 7) | (byte & 0x7F)
+    footer = 10 if audio[5] & 0x10 else 0
+    return audio[10 + size + footer:]
@@ -0,0 +1,201 @@
+"""Persistence of tts_conversions rows, optionally write-behind and batched"""
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import insert, inspect
+
+from config import settings
+from db import SessionLocal, engine
+from models.db_models import TTSConversion
+
+logger = logging.getLogger(__name__)
+
+
+# Columns filled by the database (id) are left out of batched inserts;
+# so are columns left unset, as in direct mode, so that column defaults
+# (created_at = now() on the database clock) apply to both modes alike
+_BATCH_COLUMNS = [
+    (attr.key, attr.columns[0].name)
+    for attr in inspect(TTSConversion).column_attrs
+    if attr.key != "id"
+]
+
+# Rows per INSERT: PostgreSQL takes at most 32767 bind parameters, and
+# column defaults may add any column to a row
+_ROWS_PER_INSERT = 32767 // len(_BATCH_COLUMNS)
+
+
+class ConversionWriter:
+    """
+    Writes TTSConversion rows to PostgreSQL
+
+    - Direct mode (default): one INSERT + COMMIT per conversion
+    - Write-behind mode (TTS_DB_WRITE_BEHIND=true): rows are queued and a
+      single worker flushes them in one transaction per batch, when
+      `batch_size` rows are waiting or `flush_interval_ms` has passed
+      since the first one; rows go in as multi-row INSERT ... VALUES
+      statements, one per set of columns the rows have
+
+    In write-behind mode `wait_for_commit` picks the durability:
+    - True: write() returns once the row's batch has committed (group
+      commit; same guarantee as direct mode, fewer transactions)
+    - False: write() returns once the row is queued; rows still queued
+      are lost if the process dies before the next flush
+    Queued rows are always flushed on shutdown.
+    """
+
+    def __init__(
+        self,
+        write_behind: bool = settings.tts_db_write_behind,
+        wait_for_commit: bool = settings.tts_db_wait_for_commit,
+        batch_size: int = settings.tts_db_batch_size,
+        flush_interval_ms: int = settings.tts_db_flush_interval_ms,
+        max_queue: int = settings.tts_db_queue_size
+    ):
+        self.write_behind = write_behind
+        self.wait_for_commit = wait_for_commit
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_queue = max_queue
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+        self._rows_written = 0
+        self._rows_failed = 0
+        self._batches = 0
+        self._flush_ms_total = 0.0
+        self._flush_ms_max = 0.0
+
+    def start(self):
+        if self.write_behind and self._worker is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+            self._worker = asyncio.create_task(self._run())
+            logger.info(
+                f"Conversion write-behind enabled: batch={self.batch_size}, "
+                f"interval={self.flush_interval * 1000:.0f}ms, "
+                f"wait_for_commit={self.wait_for_commit}")
+
+    async def stop(self):
+        """Flush queued rows and stop the worker"""
+        if self._worker is None:
+            return
+        await self._queue.put(None)
+        await self._worker
+        self._worker = None
+
+    async def write(self, conversion: TTSConversion):
+        """
+        Persist a conversion
+
+        Raises the database error when the row was not written and the
+        caller is waiting for it (direct mode, or wait_for_commit).
+        """
+        if self._worker is None:
+            async with SessionLocal() as db:
+                try:
+                    db.add(conversion)
+                    await db.commit()  # id comes back via INSERT ... RETURNING
+                except Exception:
+                    await db.rollback()
+                    raise
+            return
+
+        values = {}
+        for key, column in _BATCH_COLUMNS:
+            value = getattr(conversion, key)
+            if value is not None:
+                values[column] = value
+
+        # A full queue applies backpressure to requests
+        if self.wait_for_commit:
+            done = asyncio.get_running_loop().create_future()
+            await self._queue.put((values, done))
+            await done
+        else:
+            await self._queue.put((values, None))
+
+    async def _run(self):
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is None:
+                break
+
+            batch: List[Tuple[Dict[str, Any], Optional[asyncio.Future]]] = [item]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            await self._flush(batch)
+
+        # Drain anything queued behind the stop marker
+        remaining = []
+        while not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is not None:
+                remaining.append(item)
+        for start in range(0, len(remaining), self.batch_size):
+            await self._flush(remaining[start:start + self.batch_size])
+
+    async def _flush(self, batch: List[Tuple[Dict[str, Any], Optional[asyncio.Future]]]):
+        started = time.monotonic()
+        try:
+            # One INSERT ... VALUES (...), (...) per set of columns, since
+            # every row of it must name the same columns. Passing the rows
+            # as execute() parameters instead would be an executemany,
+            # which asyncpg runs as one statement per row.
+            groups: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+            for values, _ in batch:
+                groups.setdefault(tuple(sorted(values)), []).append(values)
+            async with engine.begin() as conn:
+                for rows in groups.values():
+                    for start in range(0, len(rows), _ROWS_PER_INSERT):
+                        await conn.execute(
+                            insert(TTSConversion.__table__)
+                            .values(rows[start:start + _ROWS_PER_INSERT]))
+        except Exception as e:
+            self._rows_failed += len(batch)
+            logger.error(
+                f"Failed to write batch of {len(batch)} conversions: {e}", exc_info=True)
+            for _, done in batch:
+                if done is not None and not done.done():
+                    done.set_exception(e)
+            return
+
+        elapsed_ms = (time.monotonic() - started) * 1000
+        self._rows_written += len(batch)
+        self._batches += 1
+        self._flush_ms_total += elapsed_ms
+        self._flush_ms_max = max(self._flush_ms_max, elapsed_ms)
+        for _, done in batch:
+            if done is not None and not done.done():
+                done.set_result(None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "write_behind": self._worker is not None,
+            "wait_for_commit": self.wait_for_commit,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "rows_written": self._rows_written,
+            "rows_failed": self._rows_failed,
+            "batches": self._batches,
+            "avg_batch_size": round(self._rows_written / self._batches, 2) if self._batches else 0.0,
+            "flush_ms_avg": round(self._flush_ms_total / self._batches, 2) if self._batches else 0.0,
+            "flush_ms_max": round(self._flush_ms_max, 2)
+        }
+
+
+# Global instance
+conversion_writer = ConversionWriter()
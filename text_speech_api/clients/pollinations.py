@@ -1,10 +1,15 @@
 """HTTP client for gTTS (Google Text-to-Speech) - Free Alternative"""
+import asyncio
 import httpx
 import logging
-from typing import Optional
+from typing import Optional, AsyncIterator
 from gtts import gTTS
 import io
 
+from config import settings
+from clients.synthesis_pool import synthesis_pool
+from clients.chunking import split_for_synthesis, strip_id3
+
 logger = logging.getLogger(__name__)
 
 
@@ -25,7 +30,10 @@ class PollinationsTTSClient:
         """
         Generate speech from text using gTTS (Google Text-to-Speech)
 
-        Free alternative to paid TTS services.
+        Free alternative to paid TTS services. gTTS is blocking, so the
+        synthesis runs on the bounded synthesis pool, off the event loop.
+        Long prompts are split and synthesized in parallel (see
+        iter_speech_chunks).
 
         Args:
             prompt: Text to synthesize
@@ -36,24 +44,18 @@ class PollinationsTTSClient:
             Audio bytes (MP3 format)
 
         Raises:
+            SynthesisPoolFull: If the synthesis queue is full
+            SynthesisTimeout: If synthesis misses its deadline
             Exception: If TTS generation fails
         """
         try:
             logger.info(
                 f"Generating TTS with gTTS: prompt_length={len(prompt)}, lang={voice}")
 
-            # Determine if slow speech is requested
-            slow = model == "gtts-slow"
-
-            # Generate speech using gTTS
-            tts = gTTS(text=prompt, lang=voice, slow=slow)
-
-            # Save to BytesIO buffer
-            audio_buffer = io.BytesIO()
-            tts.write_to_fp(audio_buffer)
-            audio_buffer.seek(0)
-
-            audio_bytes = audio_buffer.read()
+            chunks = [
+                chunk async for chunk in self.iter_speech_chunks(prompt, model, voice)
+            ]
+            audio_bytes = b"".join(chunks)
             logger.info(
                 f"TTS generated successfully: size={len(audio_bytes)} bytes")
 
@@ -63,6 +65,55 @@ class PollinationsTTSClient:
             logger.error(f"gTTS generation failed: {e}")
             raise
 
+    async def iter_speech_chunks(
+        self,
+        prompt: str,
+        model: str = "gtts",
+        voice: str = "en"
+    ) -> AsyncIterator[bytes]:
+        """
+        Synthesize a prompt as a sequence of MP3 chunks, in text order
+
+        The prompt is split at sentence/clause boundaries into chunks of at
+        most TTS_CHUNK_CHARS characters, which are synthesized concurrently
+        (at most TTS_CHUNK_CONCURRENCY at a time). Each chunk is yielded as
+        soon as it and all chunks before it are ready, so the concatenated
+        output is valid MP3 and total latency approaches the slowest chunk.
+        """
+        # Determine if slow speech is requested
+        slow = model == "gtts-slow"
+
+        parts = split_for_synthesis(prompt, settings.tts_chunk_chars)
+        if len(parts) > 1:
+            logger.info(f"Synthesizing {len(parts)} chunks in parallel")
+
+        semaphore = asyncio.Semaphore(settings.tts_chunk_concurrency)
+
+        async def synthesize_part(part: str) -> bytes:
+            async with semaphore:
+                return await synthesis_pool.run(self._synthesize, part, voice, slow)
+
+        tasks = [asyncio.create_task(synthesize_part(part)) for part in parts]
+        try:
+            for index, task in enumerate(tasks):
+                audio = await task
+                yield audio if index == 0 else strip_id3(audio)
+        finally:
+            # On failure or early close, drop chunks still pending
+            for task in tasks:
+                task.cancel()
+
+    @staticmethod
+    def _synthesize(prompt: str, voice: str, slow: bool) -> bytes:
+        """Blocking gTTS synthesis (runs on a synthesis pool thread)"""
+        tts = gTTS(text=prompt, lang=voice, slow=slow,
+                   timeout=settings.tts_synthesis_timeout)
+
+        # Save to BytesIO buffer
+        audio_buffer = io.BytesIO()
+        tts.write_to_fp(audio_buffer)
+        return audio_buffer.getvalue()
+
 
 async def test_pollinations_tts():
     """Test function for gTTS client"""
@@ -81,5 +132,4 @@ async def test_pollinations_tts():
 
 
 if __name__ == "__main__":
-    import asyncio
     asyncio.run(test_pollinations_tts())
@@ -1,15 +1,56 @@
 """S3 client for Text-to-Speech history storage"""
 import json
+import time
 import boto3
 import logging
+from collections import OrderedDict
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 from botocore.exceptions import ClientError
 from config import settings
+from clients.transcoder import AUDIO_FORMATS
 
 logger = logging.getLogger(__name__)
 
 
+class SignedUrlCache:
+    """
+    LRU cache of presigned URLs
+
+    A URL is reused until `refresh_margin` seconds before it expires.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = settings.signed_url_cache_size,
+        refresh_margin: int = settings.signed_url_refresh_margin
+    ):
+        self.max_entries = max_entries
+        self.refresh_margin = refresh_margin
+        self._entries: "OrderedDict[Tuple[str, int], Tuple[str, float]]" = OrderedDict()
+
+    def get(self, key: str, expires_in: int) -> Optional[Tuple[str, int]]:
+        """Return (url, seconds left) or None if no reusable URL is cached"""
+        entry = self._entries.get((key, expires_in))
+        if entry is None:
+            return None
+
+        url, expires_at = entry
+        remaining = int(expires_at - time.time())
+        if remaining <= self.refresh_margin:
+            del self._entries[(key, expires_in)]
+            return None
+
+        self._entries.move_to_end((key, expires_in))
+        return url, remaining
+
+    def put(self, key: str, expires_in: int, url: str, signed_at: float):
+        self._entries[(key, expires_in)] = (url, signed_at + expires_in)
+        self._entries.move_to_end((key, expires_in))
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
 class S3Client:
     """S3 client for TTS history management"""
 
@@ -22,6 +63,7 @@ class S3Client:
             region_name=settings.s3_region
         )
         self.bucket = settings.s3_bucket
+        self.signed_urls = SignedUrlCache()
         self._ensure_bucket_exists()
 
     def _ensure_bucket_exists(self):
@@ -44,14 +86,16 @@ class S3Client:
         user_id: Optional[str],
         username: Optional[str],
         prompt: str,
-        audio_bytes: bytes,
+        audio_bytes: Optional[bytes],
         model: str,
         voice: str,
         provider: str,
         latency_ms: int,
         status_code: int = 200,
         cost_usd: float = 0.0,
-        meta: Optional[Dict[str, Any]] = None
+        meta: Optional[Dict[str, Any]] = None,
+        audio_key: Optional[str] = None,
+        audio_format: str = "mp3"
     ) -> Dict[str, str]:
         """
         Save TTS generation history to S3
@@ -60,7 +104,10 @@ class S3Client:
         requests/{yyyy}/{mm}/{dd}/{id}/
           ├─ input.json       # Request parameters
           ├─ record.json      # Complete metadata
-          └─ audio/output.mp3 # Generated audio
+          └─ audio/output.{mp3,opus,ogg} # Generated audio
+
+        When audio_key is given (content-addressed cache object), the
+        record references it and no per-request audio file is written.
 
         Returns:
             Dictionary with S3 keys
@@ -75,13 +122,13 @@ class S3Client:
         # Prepare paths
         input_key = f"{base_path}/input.json"
         record_key = f"{base_path}/record.json"
-        audio_key = f"{base_path}/audio/output.mp3"
 
         # 1. Save input.json
         input_data = {
             "prompt": prompt,
             "model": model,
-            "voice": voice
+            "voice": voice,
+            "format": audio_format
         }
         self.s3.put_object(
             Bucket=self.bucket,
@@ -91,14 +138,11 @@ class S3Client:
         )
         logger.info(f"Saved input: {input_key}")
 
-        # 2. Save audio file
-        self.s3.put_object(
-            Bucket=self.bucket,
-            Key=audio_key,
-            Body=audio_bytes,
-            ContentType="audio/mpeg"
-        )
-        logger.info(f"Saved audio: {audio_key} ({len(audio_bytes)} bytes)")
+        # 2. Save audio file (unless reusing a cached object)
+        if audio_key is None:
+            profile = AUDIO_FORMATS[audio_format]
+            audio_key = f"{base_path}/audio/output.{profile['extension']}"
+            self.put_audio(audio_key, audio_bytes, profile["content_type"])
 
         # 3. Save record.json
         record_data = {
@@ -109,6 +153,7 @@ class S3Client:
             "provider": provider,
             "model": model,
             "voice": voice,
+            "format": audio_format,
             "prompt": prompt,
             "status": status_code,
             "latencyMs": latency_ms,
@@ -173,6 +218,26 @@ class S3Client:
         except Exception as e:
             logger.warning(f"Failed to update user history: {e}")
 
+    def put_audio(self, key: str, audio_bytes: bytes, content_type: str = "audio/mpeg"):
+        """Upload an audio object"""
+        self.s3.put_object(
+            Bucket=self.bucket,
+            Key=key,
+            Body=audio_bytes,
+            ContentType=content_type
+        )
+        logger.info(f"Saved audio: {key} ({len(audio_bytes)} bytes)")
+
+    def head_object_size(self, key: str) -> Optional[int]:
+        """Return the object size in bytes, or None if it does not exist"""
+        try:
+            response = self.s3.head_object(Bucket=self.bucket, Key=key)
+            return response["ContentLength"]
+        except ClientError as e:
+            if e.response['Error']['Code'] in ('404', 'NoSuchKey', 'NotFound'):
+                return None
+            raise
+
     def get_record(self, request_id: str, date: datetime) -> Optional[Dict[str, Any]]:
         """Retrieve record.json for a request"""
         yyyy = date.strftime("%Y")
@@ -203,29 +268,39 @@ class S3Client:
             logger.error(f"Failed to generate signed URL: {e}")
             raise
 
-    def list_user_audios(
-        self,
-        user_id: str,
-        limit: int = 10,
-        prefix: Optional[str] = None
-    ) -> list:
-        """List user's TTS generations (from history index)"""
-        # This would typically scan the user's history JSONL files
-        # For now, simplified implementation
-        prefix = prefix or f"users/{user_id}/tts/history/"
+    def get_signed_url_cached(self, key: str, expires_in: int = 300) -> Tuple[str, int]:
+        """
+        Like get_signed_url, but reuses a still-valid URL
 
-        try:
-            response = self.s3.list_objects_v2(
-                Bucket=self.bucket,
-                Prefix=prefix,
-                MaxKeys=limit
-            )
+        Returns:
+            (url, seconds until it expires)
+        """
+        cached = self.signed_urls.get(key, expires_in)
+        if cached:
+            return cached
 
-            objects = response.get('Contents', [])
-            return [obj['Key'] for obj in objects]
-        except ClientError as e:
-            logger.error(f"Failed to list user audios: {e}")
-            return []
+        signed_at = time.time()
+        url = self.get_signed_url(key, expires_in=expires_in)
+        self.signed_urls.put(key, expires_in, url, signed_at)
+        return url, expires_in
+
+    def open_object(
+        self,
+        key: str,
+        range_header: Optional[str] = None,
+        if_none_match: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Open an object for streaming reads (Body is not read)
+
+        Supports Range and If-None-Match; S3 reports 304/416 as ClientError.
+        """
+        params = {"Bucket": self.bucket, "Key": key}
+        if range_header:
+            params["Range"] = range_header
+        if if_none_match:
+            params["IfNoneMatch"] = if_none_match
+        return self.s3.get_object(**params)
 
 
 # Global instance
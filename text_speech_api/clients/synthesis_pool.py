@@ -0,0 +1,157 @@
+"""Bounded worker pool for blocking speech synthesis"""
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Callable, Dict, Any, Optional, TypeVar
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class SynthesisPoolFull(Exception):
+    """Raised when the synthesis queue is at capacity"""
+
+
+class SynthesisTimeout(Exception):
+    """Raised when a synthesis job misses its deadline"""
+
+
+class SynthesisPool:
+    """
+    Runs blocking synthesis calls (gTTS network I/O + MP3 writing) on a
+    dedicated thread pool so they never block the event loop.
+
+    - At most `workers` jobs run at once
+    - At most `max_queue` jobs wait for a worker; beyond that, submissions
+      are rejected with SynthesisPoolFull
+    - Each job has a deadline; when it expires (or the request is
+      cancelled) a job that has not started yet is dropped from the queue
+    """
+
+    def __init__(
+        self,
+        workers: int = settings.tts_pool_workers,
+        max_queue: int = settings.tts_pool_max_queue,
+        timeout: float = settings.tts_synthesis_timeout
+    ):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="tts-synthesis")
+
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._active = 0
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._timed_out = 0
+        self._cancelled = 0
+        self._wait_ms_total = 0.0
+        self._wait_ms_max = 0.0
+        self._waits = 0
+
+    async def run(
+        self,
+        fn: Callable[..., T],
+        *args: Any,
+        timeout: Optional[float] = None
+    ) -> T:
+        """
+        Run fn(*args) on the pool and await its result
+
+        Raises:
+            SynthesisPoolFull: queue depth limit reached
+            SynthesisTimeout: deadline expired before the job finished
+        """
+        with self._lock:
+            if self._queued >= self.max_queue:
+                self._rejected += 1
+                raise SynthesisPoolFull(
+                    f"Synthesis queue is full ({self.max_queue} waiting jobs)")
+            self._queued += 1
+            self._submitted += 1
+
+        submitted_at = time.monotonic()
+
+        def job() -> T:
+            wait_ms = (time.monotonic() - submitted_at) * 1000
+            with self._lock:
+                self._queued -= 1
+                self._active += 1
+                self._waits += 1
+                self._wait_ms_total += wait_ms
+                self._wait_ms_max = max(self._wait_ms_max, wait_ms)
+            try:
+                return fn(*args)
+            finally:
+                with self._lock:
+                    self._active -= 1
+
+        def on_done(future: Future):
+            # Jobs cancelled before starting never ran job()
+            if future.cancelled():
+                with self._lock:
+                    self._queued -= 1
+
+        concurrent_future = self.executor.submit(job)
+        concurrent_future.add_done_callback(on_done)
+
+        try:
+            result = await asyncio.wait_for(
+                asyncio.wrap_future(concurrent_future),
+                timeout or self.timeout
+            )
+        except asyncio.TimeoutError:
+            concurrent_future.cancel()
+            with self._lock:
+                self._timed_out += 1
+            raise SynthesisTimeout(
+                f"Synthesis exceeded {timeout or self.timeout}s deadline")
+        except asyncio.CancelledError:
+            concurrent_future.cancel()
+            with self._lock:
+                self._cancelled += 1
+            raise
+        except Exception:
+            with self._lock:
+                self._failed += 1
+            raise
+
+        with self._lock:
+            self._completed += 1
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool utilisation and queue wait-time metrics"""
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "active": self._active,
+                "queued": self._queued,
+                "max_queue": self.max_queue,
+                "utilisation": round(self._active / self.workers, 3),
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "failed": self._failed,
+                "rejected": self._rejected,
+                "timed_out": self._timed_out,
+                "cancelled": self._cancelled,
+                "wait_ms_avg": round(self._wait_ms_total / self._waits, 2) if self._waits else 0.0,
+                "wait_ms_max": round(self._wait_ms_max, 2)
+            }
+
+    def shutdown(self):
+        """Stop accepting work and drop jobs that have not started"""
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Global instance
+synthesis_pool = SynthesisPool()
@@ -0,0 +1,137 @@
+"""Output format profiles and MP3 transcoding on a process pool"""
+import asyncio
+import io
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Optional
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# gTTS produces MP3; other formats are transcoded from it
+AUDIO_FORMATS: Dict[str, Dict[str, Any]] = {
+    "mp3": {
+        "extension": "mp3",
+        "content_type": "audio/mpeg",
+        "codec": None  # stored as synthesized
+    },
+    "opus": {
+        "extension": "opus",
+        "content_type": "audio/ogg; codecs=opus",
+        "container": "ogg",
+        "codec": "libopus",
+        "application": "voip",
+        "sample_rate": 48000,
+        "bit_rate": settings.tts_opus_bitrate
+    },
+    # Ogg Vorbis, for clients that expect .ogg to mean Vorbis
+    "ogg": {
+        "extension": "ogg",
+        # Cached .ogg variants from before held Opus; keep them apart
+        "cache_extension": "vorbis.ogg",
+        "content_type": "audio/ogg; codecs=vorbis",
+        "container": "ogg",
+        "codec": "libvorbis",
+        "sample_rate": 44100,
+        "bit_rate": settings.tts_ogg_bitrate
+    }
+}
+
+
+def transcode_mp3(audio: bytes, audio_format: str) -> bytes:
+    """
+    Decode MP3 and re-encode it as mono `audio_format`
+
+    Runs in a worker process; PyAV is imported here so the API process
+    does not load FFmpeg.
+    """
+    import av
+
+    profile = AUDIO_FORMATS[audio_format]
+    output = io.BytesIO()
+
+    with av.open(io.BytesIO(audio), format="mp3") as source, \
+            av.open(output, mode="w", format=profile["container"]) as target:
+        stream = target.add_stream(profile["codec"], rate=profile["sample_rate"])
+        stream.layout = "mono"
+        stream.bit_rate = profile["bit_rate"]
+        if "application" in profile:
+            stream.codec_context.options = {"application": profile["application"]}
+
+        resampler = av.AudioResampler(
+            format=stream.codec_context.format,
+            layout="mono",
+            rate=profile["sample_rate"],
+            frame_size=stream.codec_context.frame_size or None
+        )
+
+        def encode(frame):
+            for resampled in resampler.resample(frame):
+                for packet in stream.encode(resampled):
+                    target.mux(packet)
+
+        for frame in source.decode(audio=0):
+            encode(frame)
+        encode(None)
+        for packet in stream.encode(None):
+            target.mux(packet)
+
+    return output.getvalue()
+
+
+class Transcoder:
+    """
+    Transcodes synthesized MP3 to other output formats
+
+    Encoding is CPU-bound, so it runs on a process pool instead of the
+    event loop or the synthesis thread pool.
+    """
+
+    def __init__(self, workers: int = settings.tts_transcode_workers):
+        self.workers = workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._completed = 0
+        self._failed = 0
+        self._bytes_in = 0
+        self._bytes_out = 0
+
+    async def transcode(self, audio: bytes, audio_format: str) -> bytes:
+        """Return audio in `audio_format` (MP3 is returned unchanged)"""
+        if AUDIO_FORMATS[audio_format]["codec"] is None:
+            return audio
+
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+
+        loop = asyncio.get_running_loop()
+        try:
+            result = await loop.run_in_executor(
+                self._executor, transcode_mp3, audio, audio_format)
+        except Exception:
+            self._failed += 1
+            raise
+
+        self._completed += 1
+        self._bytes_in += len(audio)
+        self._bytes_out += len(result)
+        logger.info(
+            f"Transcoded {len(audio)} bytes of MP3 to {len(result)} bytes of {audio_format}")
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "completed": self._completed,
+            "failed": self._failed,
+            "compression_ratio": round(self._bytes_out / self._bytes_in, 3) if self._bytes_in else None
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Global instance
+transcoder = Transcoder()
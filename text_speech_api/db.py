@@ -1,43 +1,64 @@
 """
 Database configuration and session management for PostgreSQL.
 """
-from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
 from config import settings
 
-# Create SQLAlchemy engine
-engine = create_engine(
-    settings.DATABASE_URL,
+# Create async SQLAlchemy engine (asyncpg)
+engine = create_async_engine(
+    settings.ASYNC_DATABASE_URL,
+    echo=settings.db_echo,
     pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_timeout=settings.db_pool_timeout,
+    pool_recycle=settings.db_pool_recycle
 )
 
 # Create SessionLocal class
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# expire_on_commit=False keeps attributes loaded after commit, so returning
+# a committed row never triggers a lazy reload
+SessionLocal = async_sessionmaker(
+    bind=engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
 
 # Create Base class for models
 Base = declarative_base()
 
 
-def get_db():
+async def get_db():
     """
     Dependency for getting database session.
-    Yields a database session and ensures it's closed after use.
+    Yields an async database session and ensures it's closed after use.
     """
-    db = SessionLocal()
-    try:
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 
-def init_db():
+async def init_db():
     """
     Initialize database tables.
-    Creates all tables defined in models.
+    Creates all tables defined in models, applies pending migrations and
+    creates the monthly partitions of tts_conversions.
     """
     from models.db_models import TTSConversion  # Import models
-    Base.metadata.create_all(bind=engine)
+    from migrations import run_migrations
+    from partitions import maintain_partitions
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    await run_migrations(engine)
+    if engine.dialect.name == "postgresql":
+        # Partitions for the current and upcoming months must exist
+        # before the first insert
+        async with engine.connect() as conn:
+            await maintain_partitions(conn)
     print("✅ Database tables created successfully")
+
+
+async def close_db():
+    """Dispose of pooled connections on shutdown"""
+    await engine.dispose()
@@ -7,6 +7,13 @@ from contextlib import asynccontextmanager
 
 from config import settings
 from routes.tts import router as tts_router
+from clients.synthesis_pool import synthesis_pool
+from clients.audio_cache import audio_cache
+from clients.conversion_writer import conversion_writer
+from clients.transcoder import transcoder
+from db import close_db, engine
+from partitions import partition_maintainer
+from middleware.auth import token_cache
 
 # Configure logging
 logging.basicConfig(
@@ -27,14 +34,23 @@ async def lifespan(app: FastAPI):
     # Initialize database
     try:
         from db import init_db
-        init_db()
+        await init_db()
         logger.info("✅ PostgreSQL database initialized")
     except Exception as e:
         logger.error(f"❌ Failed to initialize database: {e}")
         # Don't fail startup if DB is not available
 
+    conversion_writer.start()
+    partition_maintainer.start(engine)
+
     yield
     logger.info("🛑 Text-to-Speech API shutting down...")
+    synthesis_pool.shutdown()
+    transcoder.shutdown()
+    await partition_maintainer.stop()
+    # Flush queued conversion rows before the engine is disposed
+    await conversion_writer.stop()
+    await close_db()
 
 
 # Create FastAPI app
@@ -67,6 +83,18 @@ async def health_check():
     }
 
 
+@app.get("/metrics")
+async def metrics():
+    """Synthesis pool, transcoder, caches and conversion writer metrics"""
+    return {
+        "synthesis_pool": synthesis_pool.stats(),
+        "transcoder": transcoder.stats(),
+        "audio_cache": audio_cache.stats(),
+        "conversion_writer": conversion_writer.stats(),
+        "token_cache": token_cache.stats()
+    }
+
+
 @app.get("/")
 async def root():
     """Root endpoint"""
@@ -75,9 +103,12 @@ async def root():
         "version": "1.0.0",
         "endpoints": {
             "health": "/healthz",
+            "metrics": "/metrics",
             "generate": "POST /tts/generate",
+            "stream": "POST /tts/stream",
             "info": "GET /tts/{id}",
             "download": "GET /tts/{id}/download",
+            "content": "GET /tts/{id}/content",
             "list": "GET /tts/admin/audios (auth required)"
         }
     }
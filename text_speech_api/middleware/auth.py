@@ -5,8 +5,10 @@ import logging
 from fastapi import Request, HTTPException, status
 from typing import Optional, Dict, Any
 from config import settings
+from middleware.token_cache import TokenCache
 
 logger = logging.getLogger(__name__)
+token_cache = TokenCache(settings.jwt_cache_size, settings.jwt_cache_max_ttl)
 
 
 class AuthMiddleware:
@@ -45,13 +47,16 @@ class AuthMiddleware:
 
         # Verify token with HS256 (symmetric key)
         try:
-            payload = jwt.decode(
-                token,
-                self.jwt_secret,
-                algorithms=["HS256"]
-            )
-            logger.info(
-                f"Token verified locally for user: {payload.get('sub')}")
+            payload = token_cache.get(token)
+            if payload is None:
+                payload = jwt.decode(
+                    token,
+                    self.jwt_secret,
+                    algorithms=["HS256"]
+                )
+                token_cache.put(token, payload)
+                logger.info(
+                    f"Token verified locally for user: {payload.get('sub')}")
             return {
                 "user_id": payload.get("sub"),
                 "email": payload.get("email"),
@@ -0,0 +1,184 @@
+"""
+Schema migrations for PostgreSQL.
+
+init_db() only creates missing tables, so changes to existing tables are
+applied here. Each migration runs once, in order, and is recorded in the
+schema_migrations table. Run standalone with: python migrations.py
+"""
+import asyncio
+import logging
+from datetime import datetime
+from typing import Awaitable, Callable, List, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from config import settings
+from partitions import create_partition, month_start
+
+logger = logging.getLogger(__name__)
+
+# Arbitrary key so concurrent replicas don't migrate at the same time
+MIGRATION_LOCK_ID = 7_357_001
+
+BACKFILL_BATCH_SIZE = 5000
+
+
+async def _add_request_id_column(conn: AsyncConnection):
+    """Promote metadata->>'request_id' to an indexed request_id column"""
+    await conn.execute(text(
+        "ALTER TABLE tts_conversions "
+        "ADD COLUMN IF NOT EXISTS request_id VARCHAR(36)"
+    ))
+    await conn.commit()
+
+    # Backfill in batches so each transaction stays short
+    total = 0
+    while True:
+        result = await conn.execute(text(
+            "UPDATE tts_conversions SET request_id = metadata->>'request_id' "
+            "WHERE id IN ("
+            "  SELECT id FROM tts_conversions"
+            "  WHERE request_id IS NULL AND metadata->>'request_id' IS NOT NULL"
+            "  LIMIT :batch"
+            ")"
+        ), {"batch": BACKFILL_BATCH_SIZE})
+        await conn.commit()
+        total += result.rowcount
+        if result.rowcount < BACKFILL_BATCH_SIZE:
+            break
+    logger.info(f"Backfilled request_id on {total} rows")
+
+    await conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_tts_conversions_request_id "
+        "ON tts_conversions (request_id)"
+    ))
+    await conn.commit()
+
+
+async def _add_user_history_index(conn: AsyncConnection):
+    """Composite index for keyset pagination of a user's conversions"""
+    await conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_tts_conversions_user_created_id "
+        "ON tts_conversions (user_id, created_at DESC, id DESC) "
+        "INCLUDE (request_id, model, voice, s3_key)"
+    ))
+    await conn.commit()
+
+
+async def _partition_by_month(conn: AsyncConnection):
+    """
+    Rebuild tts_conversions as a table partitioned by month of created_at
+
+    Rows are copied in one transaction, so writes to the table block
+    until the migration commits.
+    """
+    from models.db_models import TTSConversion
+
+    partitioned = (await conn.execute(text(
+        "SELECT EXISTS ("
+        "  SELECT 1 FROM pg_partitioned_table pt"
+        "  JOIN pg_class c ON c.oid = pt.partrelid"
+        "  WHERE c.relname = 'tts_conversions'"
+        ")"
+    ))).scalar()
+    if partitioned:
+        # Created partitioned by init_db()
+        return
+
+    sequence = (await conn.execute(text(
+        "SELECT pg_get_serial_sequence('tts_conversions', 'id')"))).scalar()
+
+    await conn.execute(text(
+        "ALTER TABLE tts_conversions RENAME TO tts_conversions_legacy"))
+    await conn.execute(text(
+        "CREATE TABLE tts_conversions "
+        "(LIKE tts_conversions_legacy INCLUDING DEFAULTS) "
+        "PARTITION BY RANGE (created_at)"
+    ))
+
+    oldest, newest = (await conn.execute(text(
+        "SELECT min(created_at), max(created_at) FROM tts_conversions_legacy"
+    ))).one()
+    today = datetime.utcnow().date()
+    month = month_start(oldest.date() if oldest else today)
+    last = month_start(max(newest.date() if newest else today, today),
+                       settings.tts_partition_months_ahead)
+    while month <= last:
+        await create_partition(conn, month)
+        month = month_start(month, 1)
+
+    result = await conn.execute(text(
+        "INSERT INTO tts_conversions SELECT * FROM tts_conversions_legacy"))
+    logger.info(f"Copied {result.rowcount} rows into monthly partitions")
+
+    if sequence:
+        # Keep the id sequence alive when the legacy table is dropped
+        await conn.execute(text(
+            f"ALTER SEQUENCE {sequence} OWNED BY tts_conversions.id"))
+    await conn.execute(text("DROP TABLE tts_conversions_legacy"))
+
+    # Constraints and indexes are built once, after the bulk copy
+    await conn.execute(text(
+        "ALTER TABLE tts_conversions ADD PRIMARY KEY (id, created_at)"))
+
+    def create_indexes(sync_conn):
+        for index in TTSConversion.__table__.indexes:
+            index.create(sync_conn)
+
+    await conn.run_sync(create_indexes)
+    await conn.commit()
+
+
+MIGRATIONS: List[Tuple[str, Callable[[AsyncConnection], Awaitable[None]]]] = [
+    ("0001_request_id_column", _add_request_id_column),
+    ("0002_user_history_index", _add_user_history_index),
+    ("0003_monthly_partitions", _partition_by_month),
+]
+
+
+async def run_migrations(engine):
+    """Apply pending migrations (PostgreSQL only)"""
+    if engine.dialect.name != "postgresql":
+        logger.info(
+            f"Skipping migrations for dialect {engine.dialect.name}")
+        return
+
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT pg_advisory_lock(:id)"),
+                           {"id": MIGRATION_LOCK_ID})
+        try:
+            await conn.execute(text(
+                "CREATE TABLE IF NOT EXISTS schema_migrations ("
+                "  name VARCHAR(255) PRIMARY KEY,"
+                "  applied_at TIMESTAMP NOT NULL DEFAULT now()"
+                ")"
+            ))
+            applied = set((await conn.execute(
+                text("SELECT name FROM schema_migrations"))).scalars())
+            await conn.commit()
+
+            for name, migrate in MIGRATIONS:
+                if name in applied:
+                    continue
+                logger.info(f"Applying migration {name}")
+                await migrate(conn)
+                await conn.execute(
+                    text("INSERT INTO schema_migrations (name) VALUES (:name)"),
+                    {"name": name})
+                await conn.commit()
+        finally:
+            await conn.execute(text("SELECT pg_advisory_unlock(:id)"),
+                               {"id": MIGRATION_LOCK_ID})
+            await conn.commit()
+
+
+async def _main():
+    from db import engine, init_db
+    await init_db()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_main())
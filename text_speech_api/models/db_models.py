@@ -1,7 +1,7 @@
 """
 Database models for Text-to-Speech API.
 """
-from sqlalchemy import Column, String, Integer, Text, DECIMAL, BigInteger, TIMESTAMP, JSON
+from sqlalchemy import Column, String, Integer, Text, DECIMAL, BigInteger, TIMESTAMP, JSON, Index
 from sqlalchemy.sql import func
 from db import Base
 
@@ -12,8 +12,12 @@ class TTSConversion(Base):
     Tracks all text-to-speech conversions with metadata.
     """
     __tablename__ = "tts_conversions"
+    # Fetch id/created_at with INSERT ... RETURNING instead of a refresh query
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    # Public request id (UUID) used by GET /tts/{request_id}
+    request_id = Column(String(36), nullable=True, index=True)
     user_id = Column(String(255), nullable=False, index=True)
     text = Column(Text, nullable=False)
     audio_url = Column(String(500), nullable=False)
@@ -24,15 +28,30 @@ class TTSConversion(Base):
     file_size_bytes = Column(BigInteger, nullable=True)
     s3_key = Column(String(500), nullable=False)
     s3_bucket = Column(String(255), nullable=True)
+    # Partition key: part of the primary key, as PostgreSQL requires for
+    # unique constraints on partitioned tables
     created_at = Column(TIMESTAMP, server_default=func.now(),
-                        nullable=False, index=True)
+                        nullable=False, index=True, primary_key=True)
     # Use column name 'metadata' but attribute 'extra_metadata'
     extra_metadata = Column("metadata", JSON, nullable=True)
 
+    __table_args__ = (
+        # Keyset pagination of a user's history (newest first); listing
+        # columns are included so only the prompt needs a heap fetch
+        Index(
+            "ix_tts_conversions_user_created_id",
+            "user_id", created_at.desc(), id.desc(),
+            postgresql_include=["request_id", "model", "voice", "s3_key"]
+        ),
+        # One partition per month, managed by partitions.py
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
     def to_dict(self):
         """Convert model to dictionary."""
         return {
             "id": self.id,
+            "request_id": self.request_id,
             "user_id": self.user_id,
             "text": self.text,
             "audio_url": self.audio_url,
@@ -12,13 +12,16 @@ class TTSGenerateRequest(BaseModel):
         default="gtts", description="TTS model to use (gtts, gtts-slow)")
     voice: str = Field(
         default="en", description="Language code (en, es, fr, de, it, pt, ja, zh-CN, etc.)")
+    format: Literal["mp3", "opus", "ogg"] = Field(
+        default="mp3", description="Output format (mp3, opus for voice at low bitrate, ogg for Vorbis)")
 
     class Config:
         json_schema_extra = {
             "example": {
                 "prompt": "Hello, this is a test of text to speech synthesis",
                 "model": "gtts",
-                "voice": "en"
+                "voice": "en",
+                "format": "mp3"
             }
         }
 
@@ -40,6 +43,11 @@ class TTSMetadata(BaseModel):
         None, description="Audio duration in seconds")
     processing_time_ms: Optional[int] = Field(
         None, description="Processing time in milliseconds")
+    cache_hit: bool = Field(
+        default=False, description="Audio reused from the TTS cache")
+    format: str = Field(default="mp3", description="Output format")
+    size_bytes: Optional[int] = Field(
+        None, description="Size of the stored audio file in bytes")
 
 
 class TTSGenerateResponse(BaseModel):
@@ -90,11 +98,11 @@ class TTSDownloadResponse(BaseModel):
 
 
 class TTSListResponse(BaseModel):
-    """Response for listing TTS generations"""
+    """Response for listing TTS generations (newest first)"""
     audios: list[TTSInfoResponse]
-    total: int
-    page: int
-    per_page: int
+    limit: int
+    next_cursor: Optional[str] = Field(
+        None, description="Pass as `cursor` to fetch the next page")
 
 
 class ErrorResponse(BaseModel):
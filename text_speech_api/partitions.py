@@ -0,0 +1,147 @@
+"""
+Monthly range partitions of tts_conversions.
+
+tts_conversions is partitioned by RANGE (created_at), one partition per
+calendar month, named tts_conversions_yYYYYmMM. Maintenance creates the
+partitions for the coming months ahead of time and, when retention is
+enabled, drops whole partitions that are older than the retention window.
+"""
+import asyncio
+import logging
+import re
+from datetime import date, datetime
+from typing import List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = "tts_conversions"
+PARTITION_NAME = re.compile(rf"^{PARENT_TABLE}_y(\d{{4}})m(\d{{2}})$")
+
+# Arbitrary key so replicas don't run maintenance at the same time
+MAINTENANCE_LOCK_ID = 7_357_002
+
+
+def month_start(value: date, offset: int = 0) -> date:
+    """First day of the month `offset` months after value's month"""
+    index = value.year * 12 + value.month - 1 + offset
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARENT_TABLE}_y{month.year:04d}m{month.month:02d}"
+
+
+async def create_partition(conn: AsyncConnection, month: date):
+    """Create the partition holding `month` if it does not exist"""
+    await conn.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {partition_name(month)} "
+        f"PARTITION OF {PARENT_TABLE} "
+        f"FOR VALUES FROM ('{month.isoformat()}') "
+        f"TO ('{month_start(month, 1).isoformat()}')"
+    ))
+
+
+async def list_partitions(conn: AsyncConnection) -> List[date]:
+    """Months that currently have a partition, oldest first"""
+    names = (await conn.execute(text(
+        "SELECT child.relname FROM pg_inherits "
+        "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "WHERE parent.relname = :parent"
+    ), {"parent": PARENT_TABLE})).scalars()
+
+    months = []
+    for name in names:
+        match = PARTITION_NAME.match(name)
+        if match:
+            months.append(date(int(match.group(1)), int(match.group(2)), 1))
+    return sorted(months)
+
+
+async def maintain_partitions(
+    conn: AsyncConnection,
+    months_ahead: int = settings.tts_partition_months_ahead,
+    retention_months: int = settings.tts_retention_months,
+    today: Optional[date] = None
+) -> dict:
+    """
+    Create upcoming partitions and drop expired ones (one transaction)
+
+    retention_months <= 0 keeps every partition. Otherwise the current
+    month plus the previous retention_months - 1 months are kept.
+    """
+    today = today or datetime.utcnow().date()
+    current = month_start(today)
+
+    acquired = (await conn.execute(
+        text("SELECT pg_try_advisory_xact_lock(:id)"),
+        {"id": MAINTENANCE_LOCK_ID})).scalar()
+    if not acquired:
+        await conn.rollback()
+        return {"created": [], "dropped": []}
+
+    existing = set(await list_partitions(conn))
+
+    created = []
+    for offset in range(months_ahead + 1):
+        month = month_start(current, offset)
+        if month not in existing:
+            await create_partition(conn, month)
+            created.append(partition_name(month))
+
+    dropped = []
+    if retention_months > 0:
+        oldest_kept = month_start(current, -(retention_months - 1))
+        for month in sorted(existing):
+            if month < oldest_kept:
+                # Dropping a partition is O(1), unlike DELETE of its rows
+                await conn.execute(text(f"DROP TABLE {partition_name(month)}"))
+                dropped.append(partition_name(month))
+
+    await conn.commit()
+
+    if created or dropped:
+        logger.info(
+            f"Partition maintenance: created={created}, dropped={dropped}")
+    return {"created": created, "dropped": dropped}
+
+
+class PartitionMaintainer:
+    """Runs partition maintenance periodically in the background"""
+
+    def __init__(self, interval: int = settings.tts_partition_maintenance_interval):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self, engine):
+        if engine.dialect.name == "postgresql" and self._task is None:
+            self._task = asyncio.create_task(self._run(engine))
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self, engine):
+        # init_db() already ran maintenance at startup
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                async with engine.connect() as conn:
+                    await maintain_partitions(conn)
+            except Exception as e:
+                logger.error(f"Partition maintenance failed: {e}")
+
+
+# Global instance
+partition_maintainer = PartitionMaintainer()
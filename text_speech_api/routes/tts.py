@@ -1,11 +1,19 @@
 """TTS API routes"""
+import asyncio
+import base64
+import json
 import time
+from collections import OrderedDict
 import uuid
 import logging
-from datetime import datetime, timedelta
-from fastapi import APIRouter, HTTPException, status, Depends, Request
-from typing import Optional, Dict, Any
-from sqlalchemy.orm import Session
+from datetime import datetime
+from fastapi import APIRouter, HTTPException, status, Depends, Request, Header, Query
+from fastapi.responses import Response, StreamingResponse
+from starlette.background import BackgroundTask
+from botocore.exceptions import ClientError
+from typing import Optional, Dict, Any, List, AsyncIterator, Tuple
+from sqlalchemy import select, func, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from models.tts import (
     TTSGenerateRequest,
@@ -19,9 +27,14 @@ from models.tts import (
 )
 from models.db_models import TTSConversion
 from clients.pollinations import PollinationsTTSClient
+from clients.synthesis_pool import SynthesisPoolFull, SynthesisTimeout
+from clients.audio_cache import audio_cache
+from clients.conversion_writer import conversion_writer
+from clients.transcoder import transcoder
 from clients.s3 import s3_client
 from middleware.auth import optional_auth, require_auth
 from db import get_db
+from config import settings
 
 logger = logging.getLogger(__name__)
 
@@ -31,19 +44,201 @@ router = APIRouter(prefix="/tts", tags=["Text-to-Speech"])
 tts_client = PollinationsTTSClient()
 
 
+# request_id -> conversion fields; rows never change once written
+_lookup_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+
+async def _find_conversion(db: AsyncSession, request_id: str) -> Optional[Dict[str, Any]]:
+    """Resolve a request id to its conversion (LRU, then one indexed query)"""
+    conversion = _lookup_cache.get(request_id)
+    if conversion is not None:
+        _lookup_cache.move_to_end(request_id)
+        return conversion
+
+    row = (await db.execute(
+        select(
+            TTSConversion.request_id,
+            TTSConversion.text,
+            TTSConversion.model,
+            TTSConversion.voice,
+            TTSConversion.user_id,
+            TTSConversion.s3_key,
+            TTSConversion.created_at
+        )
+        .where(TTSConversion.request_id == request_id)
+        .limit(1)
+    )).first()
+    if row is None:
+        # Not cached: a streamed generation may still be persisting
+        return None
+
+    conversion = dict(row._mapping)
+    _lookup_cache[request_id] = conversion
+    if len(_lookup_cache) > settings.tts_lookup_cache_size:
+        _lookup_cache.popitem(last=False)
+    return conversion
+
+
+def _generation_error(e: Exception) -> HTTPException:
+    """Map a synthesis failure to the HTTP error returned to the client"""
+    if isinstance(e, SynthesisPoolFull):
+        logger.warning(f"TTS generation rejected: {e}")
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "2"}
+        )
+    if isinstance(e, SynthesisTimeout):
+        logger.error(f"TTS generation timed out: {e}")
+        return HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=str(e)
+        )
+    logger.error(f"TTS generation failed: {e}", exc_info=True)
+    return HTTPException(
+        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        detail=f"TTS generation failed: {str(e)}"
+    )
+
+
+def _save_to_s3(
+    request_id: str,
+    user_id: str,
+    username: Optional[str],
+    request: TTSGenerateRequest,
+    audio_bytes: Optional[bytes],
+    audio_key: Optional[str],
+    audio_size: int,
+    latency_ms: int,
+    cache_hit: bool
+) -> Dict[str, str]:
+    """Write input/record (and audio unless audio_key is given) to S3"""
+    return s3_client.save_tts_history(
+        request_id=request_id,
+        user_id=user_id,
+        username=username,
+        prompt=request.prompt,
+        audio_bytes=audio_bytes,
+        model=request.model,
+        voice=request.voice,
+        provider="gtts",
+        latency_ms=latency_ms,
+        status_code=200,
+        cost_usd=0.0,  # gTTS is free
+        meta={
+            "audio_size_bytes": audio_size,
+            "voice": request.voice,
+            "cache_hit": cache_hit
+        },
+        audio_key=audio_key,
+        audio_format=request.format
+    )
+
+
+def _new_conversion(
+    request_id: str,
+    user_id: str,
+    request: TTSGenerateRequest,
+    s3_keys: Dict[str, str],
+    audio_size: int,
+    latency_ms: int,
+    cache_hit: bool
+) -> TTSConversion:
+    """Build the tts_conversions row for a generation"""
+    return TTSConversion(
+        request_id=request_id,
+        user_id=str(user_id),
+        text=request.prompt,
+        audio_url=s3_keys["audio"],
+        model=request.model or "gtts",
+        voice=request.voice or "default",
+        language=request.voice or "en",  # gTTS uses voice param as language
+        file_size_bytes=audio_size,
+        s3_key=s3_keys["audio"],
+        s3_bucket=settings.s3_bucket,
+        extra_metadata={
+            "request_id": request_id,
+            "provider": "gtts",
+            "latency_ms": latency_ms,
+            "status_code": 200,
+            "cost_usd": 0.0,
+            "record_key": s3_keys["record"],
+            "input_key": s3_keys.get("input"),
+            "cache_hit": cache_hit,
+            "format": request.format
+        }
+    )
+
+
+async def _synthesize_mp3(
+    request: TTSGenerateRequest,
+    digest: Optional[str],
+    lookup: bool
+) -> bytes:
+    """MP3 for the request: the cached master when `lookup` finds it, else synthesized (and cached)"""
+    if digest and lookup:
+        master = await audio_cache.get(digest)
+        if master:
+            return await audio_cache.read(master)
+
+    audio_bytes = await tts_client.generate_speech(
+        prompt=request.prompt,
+        model=request.model,
+        voice=request.voice
+    )
+    if digest:
+        await audio_cache.put(digest, audio_bytes)
+    return audio_bytes
+
+
+async def _render_audio(request: TTSGenerateRequest, request_id: str) -> Dict[str, Any]:
+    """
+    Audio in the requested output format
+
+    Returns:
+        {"key", "size", "audio", "cache_hit"}: key is the cache object
+        holding the audio (None with the cache disabled) and audio is
+        None on a cache hit
+    """
+    digest = None
+    if settings.tts_cache_enabled:
+        digest = audio_cache.cache_key(
+            request.prompt, request.voice, request.model == "gtts-slow")
+        cached = await audio_cache.get(digest, request.format)
+        if cached:
+            # Cache hit: reuse the stored audio object by reference
+            logger.info(
+                f"TTS cache hit: id={request_id}, format={request.format}, tier={cached['tier']}")
+            return {"key": cached["key"], "size": cached["size"], "audio": None, "cache_hit": True}
+
+    # Other formats are transcoded from the MP3 master, which may be cached
+    mp3 = await _synthesize_mp3(request, digest, lookup=request.format != "mp3")
+    audio_bytes = await transcoder.transcode(mp3, request.format)
+
+    audio_key = None
+    if digest:
+        if request.format == "mp3":
+            audio_key = audio_cache.object_key(digest)
+        else:
+            audio_key = (await audio_cache.put(digest, audio_bytes, request.format))["key"]
+
+    return {"key": audio_key, "size": len(audio_bytes), "audio": audio_bytes, "cache_hit": False}
+
+
 @router.post(
     "/generate",
     response_model=TTSGenerateResponse,
     status_code=status.HTTP_201_CREATED,
     responses={
         400: {"model": ErrorResponse, "description": "Invalid request"},
-        500: {"model": ErrorResponse, "description": "Generation failed"}
+        500: {"model": ErrorResponse, "description": "Generation failed"},
+        503: {"model": ErrorResponse, "description": "Synthesis queue full"},
+        504: {"model": ErrorResponse, "description": "Synthesis deadline exceeded"}
     }
 )
 async def generate_speech(
     request: TTSGenerateRequest,
-    user: Optional[Dict[str, Any]] = Depends(optional_auth),
-    db: Session = Depends(get_db)
+    user: Optional[Dict[str, Any]] = Depends(optional_auth)
 ):
     """
     Generate speech from text
@@ -51,7 +246,11 @@ async def generate_speech(
     - Supports both authenticated and anonymous users
     - Authenticated requests are linked to user account
     - Stores audio and metadata in S3 and PostgreSQL
-    - Returns S3 paths and metadata
+    - Repeated (text, language, speed) requests reuse cached audio
+      instead of synthesizing again (meta.cache_hit)
+    - `format` selects mp3 (as synthesized), opus or ogg; other formats
+      are transcoded off the event loop and stored per format
+    - Returns S3 paths and metadata, including the stored size in bytes
     """
     request_id = str(uuid.uuid4())
     start_time = time.time()
@@ -67,67 +266,29 @@ async def generate_speech(
         # Common gTTS languages: en, es, fr, de, it, pt, ja, zh-CN, ko, ar, hi, ru, etc.
         # No strict validation - gTTS will handle invalid languages
 
-        # Generate audio via gTTS
-        audio_bytes = await tts_client.generate_speech(
-            prompt=request.prompt,
-            model=request.model,
-            voice=request.voice
-        )
+        audio = await _render_audio(request, request_id)
+        audio_size = audio["size"]
 
         latency_ms = int((time.time() - start_time) * 1000)
 
         # Save to S3
-        s3_keys = s3_client.save_tts_history(
-            request_id=request_id,
-            user_id=user_id,
-            username=username,
-            prompt=request.prompt,
-            audio_bytes=audio_bytes,
-            model=request.model,
-            voice=request.voice,
-            provider="gtts",
-            latency_ms=latency_ms,
-            status_code=200,
-            cost_usd=0.0,  # gTTS is free
-            meta={
-                "audio_size_bytes": len(audio_bytes),
-                "voice": request.voice
-            }
+        s3_keys = _save_to_s3(
+            request_id, user_id, username, request,
+            None if audio["key"] else audio["audio"], audio["key"], audio_size,
+            latency_ms, cache_hit=audio["cache_hit"]
         )
 
         # Save to PostgreSQL database
         try:
-            from config import settings
-            db_conversion = TTSConversion(
-                user_id=str(user_id),
-                text=request.prompt,
-                audio_url=s3_keys["audio"],
-                model=request.model or "gtts",
-                voice=request.voice or "default",
-                language=request.voice or "en",  # gTTS uses voice param as language
-                file_size_bytes=len(audio_bytes),
-                s3_key=s3_keys["audio"],
-                s3_bucket=settings.s3_bucket,
-                extra_metadata={
-                    "request_id": request_id,
-                    "provider": "gtts",
-                    "latency_ms": latency_ms,
-                    "status_code": 200,
-                    "cost_usd": 0.0,
-                    "record_key": s3_keys["record"],
-                    "input_key": s3_keys.get("input")
-                }
-            )
-            db.add(db_conversion)
-            db.commit()
-            db.refresh(db_conversion)
-            logger.info(
-                f"TTS conversion saved to database: db_id={db_conversion.id}")
+            await conversion_writer.write(_new_conversion(
+                request_id, user_id, request, s3_keys, audio_size,
+                latency_ms, cache_hit=audio["cache_hit"]
+            ))
+            logger.info(f"TTS conversion saved to database: id={request_id}")
         except Exception as db_error:
+            # Don't fail the request if DB save fails
             logger.error(
                 f"Failed to save to database: {db_error}", exc_info=True)
-            # Don't fail the request if DB save fails
-            db.rollback()
 
         logger.info(
             f"TTS generation completed: id={request_id}, latency={latency_ms}ms")
@@ -143,7 +304,10 @@ async def generate_speech(
                 provider="gtts",
                 model=request.model,
                 voice=request.voice,
-                processing_time_ms=latency_ms
+                processing_time_ms=latency_ms,
+                cache_hit=audio["cache_hit"],
+                format=request.format,
+                size_bytes=audio_size
             ),
             created_at=datetime.utcnow(),
             user_id=user_id,
@@ -153,12 +317,183 @@ async def generate_speech(
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"TTS generation failed: {e}", exc_info=True)
+        raise _generation_error(e)
+
+
+async def _iter_cached_audio(cached: Dict[str, Any]) -> AsyncIterator[bytes]:
+    """Yield cached audio from memory, or stream it from its S3 object"""
+    if cached["audio"] is not None:
+        yield cached["audio"]
+        return
+
+    obj = await asyncio.to_thread(s3_client.open_object, cached["key"])
+    body = obj["Body"]
+    try:
+        while True:
+            chunk = await asyncio.to_thread(body.read, settings.download_chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        body.close()
+
+
+async def _persist_streamed_speech(
+    request_id: str,
+    user_id: str,
+    username: Optional[str],
+    request: TTSGenerateRequest,
+    digest: Optional[str],
+    cached: Optional[Dict[str, Any]],
+    chunks: List[bytes],
+    outcome: Dict[str, Any],
+    start_time: float
+):
+    """
+    Save a streamed generation to S3 and PostgreSQL once the stream ends
+
+    Runs as a background task, after the response has been sent. Streams
+    that failed or were abandoned by the client are not persisted.
+    """
+    if not outcome["completed"]:
+        logger.warning(
+            f"TTS stream not completed, skipping persistence: id={request_id}")
+        return
+
+    try:
+        latency_ms = outcome["latency_ms"]
+        cache_hit = cached is not None
+        if cache_hit:
+            audio_bytes, audio_key, audio_size = None, cached["key"], cached["size"]
+        else:
+            audio_bytes = b"".join(chunks)
+            audio_key, audio_size = None, len(audio_bytes)
+            if digest:
+                audio_key = (await audio_cache.put(digest, audio_bytes))["key"]
+                audio_bytes = None
+
+        s3_keys = await asyncio.to_thread(
+            _save_to_s3,
+            request_id, user_id, username, request,
+            audio_bytes, audio_key, audio_size, latency_ms, cache_hit
+        )
+    except Exception as e:
+        logger.error(
+            f"Failed to persist streamed TTS {request_id}: {e}", exc_info=True)
+        return
+
+    try:
+        await conversion_writer.write(_new_conversion(
+            request_id, user_id, request, s3_keys, audio_size, latency_ms, cache_hit))
+    except Exception as db_error:
+        logger.error(
+            f"Failed to save to database: {db_error}", exc_info=True)
+
+    logger.info(
+        f"TTS stream persisted: id={request_id}, "
+        f"total={int((time.time() - start_time) * 1000)}ms")
+
+
+@router.post(
+    "/stream",
+    responses={
+        200: {"content": {"audio/mpeg": {}}, "description": "Audio stream"},
+        400: {"model": ErrorResponse, "description": "Format cannot be streamed"},
+        500: {"model": ErrorResponse, "description": "Generation failed"},
+        503: {"model": ErrorResponse, "description": "Synthesis queue full"},
+        504: {"model": ErrorResponse, "description": "Synthesis deadline exceeded"}
+    }
+)
+async def stream_speech(
+    request: TTSGenerateRequest,
+    user: Optional[Dict[str, Any]] = Depends(optional_auth)
+):
+    """
+    Generate speech and stream it as audio/mpeg while it is synthesized
+
+    - The first chunk is sent as soon as it is ready; later chunks follow
+      in text order
+    - S3 and PostgreSQL persistence runs after the stream completes
+    - The request id is returned in the X-Request-Id header and can be
+      used with GET /tts/{request_id} once persistence has finished
+    - Only the mp3 format can be streamed
+    """
+    if request.format != "mp3":
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"TTS generation failed: {str(e)}"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Streaming supports the mp3 format only; use /tts/generate for other formats"
         )
 
+    request_id = str(uuid.uuid4())
+    start_time = time.time()
+
+    user_id = user.get("user_id") if user else "anonymous"
+    username = user.get("email") if user else None
+
+    logger.info(
+        f"TTS stream started: id={request_id}, user={username or 'anonymous'}")
+
+    digest = None
+    cached = None
+    try:
+        if settings.tts_cache_enabled:
+            digest = audio_cache.cache_key(
+                request.prompt, request.voice, request.model == "gtts-slow")
+            cached = await audio_cache.get(digest)
+
+        if cached:
+            source = _iter_cached_audio(cached)
+        else:
+            source = tts_client.iter_speech_chunks(
+                prompt=request.prompt,
+                model=request.model,
+                voice=request.voice
+            )
+
+        # Wait for the first chunk so synthesis errors still map to a status
+        first_chunk = await source.__anext__()
+    except Exception as e:
+        raise _generation_error(e)
+
+    chunks: List[bytes] = []
+    outcome = {"completed": False, "latency_ms": 0}
+
+    async def body() -> AsyncIterator[bytes]:
+        try:
+            chunk = first_chunk
+            while True:
+                if not cached:
+                    chunks.append(chunk)
+                yield chunk
+                try:
+                    chunk = await source.__anext__()
+                except StopAsyncIteration:
+                    break
+            outcome["completed"] = True
+            outcome["latency_ms"] = int((time.time() - start_time) * 1000)
+            logger.info(
+                f"TTS stream completed: id={request_id}, latency={outcome['latency_ms']}ms")
+        except Exception as e:
+            # Headers are already sent; the client sees a truncated stream
+            logger.error(f"TTS stream failed: id={request_id}: {e}", exc_info=True)
+        finally:
+            await source.aclose()
+
+    return StreamingResponse(
+        body(),
+        media_type="audio/mpeg",
+        headers={
+            "X-Request-Id": request_id,
+            "X-Cache-Hit": "true" if cached else "false",
+            "Cache-Control": "no-store"
+        },
+        background=BackgroundTask(
+            _persist_streamed_speech,
+            request_id, user_id, username, request,
+            digest, cached, chunks, outcome, start_time
+        )
+    )
+
 
 @router.get(
     "/{request_id}",
@@ -167,34 +502,26 @@ async def generate_speech(
         404: {"model": ErrorResponse, "description": "TTS request not found"}
     }
 )
-async def get_tts_info(request_id: str):
+async def get_tts_info(request_id: str, db: AsyncSession = Depends(get_db)):
     """
     Get information about a TTS generation
 
-    Note: Requires approximate date for efficient S3 lookup
-    For now, tries recent dates
+    Resolved from tts_conversions by the indexed request_id column
     """
-    # Try to find the record in recent dates
-    now = datetime.utcnow()
-
-    for days_ago in range(7):  # Search last 7 days
-        date = datetime(now.year, now.month, now.day) - \
-            timedelta(days=days_ago)
-        record = s3_client.get_record(request_id, date)
-
-        if record:
-            return TTSInfoResponse(
-                id=record["id"],
-                prompt=record["prompt"][:100] +
-                "..." if len(record["prompt"]) > 100 else record["prompt"],
-                model=record["model"],
-                voice=record["voice"],
-                status="completed",
-                created_at=datetime.fromisoformat(
-                    record["createdAt"].rstrip("Z")),
-                user_id=record.get("userId"),
-                s3_key=record["artifacts"]["audio"]
-            )
+    conversion = await _find_conversion(db, request_id)
+
+    if conversion:
+        prompt = conversion["text"]
+        return TTSInfoResponse(
+            id=conversion["request_id"],
+            prompt=prompt[:100] + "..." if len(prompt) > 100 else prompt,
+            model=conversion["model"],
+            voice=conversion["voice"],
+            status="completed",
+            created_at=conversion["created_at"],
+            user_id=conversion["user_id"],
+            s3_key=conversion["s3_key"]
+        )
 
     raise HTTPException(
         status_code=status.HTTP_404_NOT_FOUND,
@@ -209,29 +536,25 @@ async def get_tts_info(request_id: str):
         404: {"model": ErrorResponse, "description": "Audio not found"}
     }
 )
-async def get_download_url(request_id: str):
+async def get_download_url(request_id: str, db: AsyncSession = Depends(get_db)):
     """
     Get a signed URL for downloading the audio file
 
-    - URL expires in 5 minutes
+    - URL expires in 5 minutes; a cached URL is reused until shortly
+      before it expires (expires_in reports the remaining lifetime)
     - Works for both authenticated and anonymous users
     """
-    # Find the record
-    now = datetime.utcnow()
-
-    for days_ago in range(7):
-        date = datetime(now.year, now.month, now.day) - \
-            timedelta(days=days_ago)
-        record = s3_client.get_record(request_id, date)
+    conversion = await _find_conversion(db, request_id)
 
-        if record:
-            audio_key = record["artifacts"]["audio"]
-            signed_url = s3_client.get_signed_url(audio_key, expires_in=300)
+    if conversion:
+        audio_key = conversion["s3_key"]
+        signed_url, expires_in = s3_client.get_signed_url_cached(
+            audio_key, expires_in=300)
 
-            return TTSDownloadResponse(
-                download_url=signed_url,
-                expires_in=300
-            )
+        return TTSDownloadResponse(
+            download_url=signed_url,
+            expires_in=expires_in
+        )
 
     raise HTTPException(
         status_code=status.HTTP_404_NOT_FOUND,
@@ -239,33 +562,170 @@ async def get_download_url(request_id: str):
     )
 
 
+@router.get(
+    "/{request_id}/content",
+    responses={
+        200: {"content": {"audio/mpeg": {}}, "description": "Audio file"},
+        206: {"description": "Partial audio content"},
+        304: {"description": "Not modified"},
+        404: {"model": ErrorResponse, "description": "Audio not found"}
+    }
+)
+async def stream_audio_content(
+    request_id: str,
+    range_header: Optional[str] = Header(None, alias="range"),
+    if_none_match: Optional[str] = Header(None, alias="if-none-match"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Stream the audio file straight from S3
+
+    - Supports Range (206), If-None-Match (304) and ETag
+    - The object is never buffered in memory
+    """
+    conversion = await _find_conversion(db, request_id)
+    # Return the connection to the pool before the stream starts
+    await db.close()
+    if not conversion:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Audio for request {request_id} not found"
+        )
+
+    try:
+        obj = await asyncio.to_thread(
+            s3_client.open_object,
+            conversion["s3_key"],
+            range_header,
+            if_none_match
+        )
+    except ClientError as e:
+        code = e.response["Error"]["Code"]
+        if code in ("304", "NotModified"):
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED,
+                headers={"ETag": if_none_match}
+            )
+        if code in ("416", "InvalidRange"):
+            raise HTTPException(
+                status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+                detail="Invalid range"
+            )
+        if code in ("404", "NoSuchKey"):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Audio for request {request_id} not found"
+            )
+        raise
+
+    headers = {
+        "Accept-Ranges": "bytes",
+        "ETag": obj["ETag"],
+        "Content-Length": str(obj["ContentLength"]),
+        "Cache-Control": "private, max-age=31536000, immutable"
+    }
+    if obj.get("ContentRange"):
+        headers["Content-Range"] = obj["ContentRange"]
+
+    body = obj["Body"]
+    return StreamingResponse(
+        body.iter_chunks(settings.download_chunk_size),
+        status_code=status.HTTP_206_PARTIAL_CONTENT if obj.get(
+            "ContentRange") else status.HTTP_200_OK,
+        media_type=obj.get("ContentType", "audio/mpeg"),
+        headers=headers,
+        background=BackgroundTask(body.close)
+    )
+
+
+def _encode_cursor(created_at: datetime, row_id: int) -> str:
+    raw = json.dumps({"t": created_at.isoformat(), "i": row_id}).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Return the (created_at, id) of the last row of the previous page"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(data["t"]), int(data["i"])
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
 @router.get(
     "/admin/audios",
     response_model=TTSListResponse,
-    dependencies=[Depends(require_auth)]
+    responses={
+        400: {"model": ErrorResponse, "description": "Invalid cursor"}
+    }
 )
 async def list_user_audios(
     user: Dict[str, Any] = Depends(require_auth),
-    page: int = 1,
-    per_page: int = 10
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_db)
 ):
     """
-    List user's TTS generations (requires authentication)
+    List user's TTS generations, newest first (requires authentication)
 
-    - Returns paginated list
-    - Only accessible to authenticated users
+    - Keyset pagination: pass `next_cursor` from the response as `cursor`
+    - Each page is one index range scan on (user_id, created_at, id), so
+      deep pages cost the same as the first one
     """
-    user_id = user["user_id"]
+    user_id = str(user["user_id"])
+
+    query = (
+        select(
+            TTSConversion.id,
+            TTSConversion.request_id,
+            # Only the truncated prompt leaves the database
+            func.substr(TTSConversion.text, 1, 101).label("prompt"),
+            TTSConversion.model,
+            TTSConversion.voice,
+            TTSConversion.user_id,
+            TTSConversion.s3_key,
+            TTSConversion.created_at
+        )
+        .where(TTSConversion.user_id == user_id)
+        .order_by(TTSConversion.created_at.desc(), TTSConversion.id.desc())
+        .limit(limit + 1)
+    )
 
-    # Get user's audio history
-    audio_keys = s3_client.list_user_audios(user_id, limit=per_page)
+    if cursor:
+        try:
+            created_at, row_id = _decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+        query = query.where(
+            tuple_(TTSConversion.created_at, TTSConversion.id) < tuple_(created_at, row_id))
 
-    # For now, return simplified response
-    # In production, parse the JSONL history files
+    rows = (await db.execute(query)).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_cursor(rows[-1].created_at, rows[-1].id)
 
     return TTSListResponse(
-        audios=[],
-        total=len(audio_keys),
-        page=page,
-        per_page=per_page
+        audios=[
+            TTSInfoResponse(
+                # Rows written before request_id existed fall back to the db id
+                id=row.request_id or str(row.id),
+                prompt=row.prompt[:100] +
+                "..." if len(row.prompt) > 100 else row.prompt,
+                model=row.model or "gtts",
+                voice=row.voice or "default",
+                status="completed",
+                created_at=row.created_at,
+                user_id=row.user_id,
+                s3_key=row.s3_key
+            )
+            for row in rows
+        ],
+        limit=limit,
+        next_cursor=next_cursor
     )
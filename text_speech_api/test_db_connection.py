@@ -5,6 +5,7 @@ This script can be run locally or inside the container to validate the setup.
 """
 import sys
 import os
+import asyncio
 
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -30,6 +31,13 @@ def test_imports():
         print(f"❌ Failed to import psycopg2: {e}")
         return False
 
+    try:
+        import asyncpg
+        print(f"✅ asyncpg version: {asyncpg.__version__}")
+    except ImportError as e:
+        print(f"❌ Failed to import asyncpg: {e}")
+        return False
+
     try:
         from config import settings
         print(f"✅ Config loaded successfully")
@@ -113,14 +121,30 @@ def test_table_creation():
 
     try:
         from db import init_db, engine
-        from sqlalchemy import inspect, text
-
-        # Initialize database (create tables)
-        init_db()
-
-        # Verify tables were created
-        inspector = inspect(engine)
-        tables = inspector.get_table_names()
+        from sqlalchemy import inspect
+
+        def describe(sync_conn):
+            inspector = inspect(sync_conn)
+            tables = inspector.get_table_names()
+            if 'tts_conversions' not in tables:
+                return tables, [], []
+            return (
+                tables,
+                inspector.get_columns('tts_conversions'),
+                inspector.get_indexes('tts_conversions')
+            )
+
+        async def create_and_describe():
+            # Initialize database (create tables)
+            await init_db()
+
+            # Verify tables were created
+            async with engine.connect() as conn:
+                result = await conn.run_sync(describe)
+            await engine.dispose()
+            return result
+
+        tables, columns, indexes = asyncio.run(create_and_describe())
 
         print(f"✅ Tables created successfully")
         print(f"   Tables in database: {', '.join(tables)}")
@@ -129,13 +153,11 @@ def test_table_creation():
             print(f"\n✅ tts_conversions table exists")
 
             # Get column details
-            columns = inspector.get_columns('tts_conversions')
             print(f"   Columns:")
             for col in columns:
                 print(f"      - {col['name']}: {col['type']}")
 
             # Get indexes
-            indexes = inspector.get_indexes('tts_conversions')
             if indexes:
                 print(f"\n   Indexes:")
                 for idx in indexes:
@@ -155,19 +177,12 @@ def test_table_creation():
         return False
 
 
-def test_crud_operations():
-    """Test basic CRUD operations"""
-    print("=" * 60)
-    print("5️⃣  Testing CRUD operations...")
-    print("=" * 60)
-
-    try:
-        from db import SessionLocal
-        from models.db_models import TTSConversion
-        import uuid
-
-        db = SessionLocal()
+async def _crud_operations():
+    from sqlalchemy import select, func
+    from db import SessionLocal, engine
+    from models.db_models import TTSConversion
 
+    async with SessionLocal() as db:
         # CREATE
         test_conversion = TTSConversion(
             user_id="test_user_123",
@@ -179,19 +194,19 @@ def test_crud_operations():
             file_size_bytes=12345,
             s3_key="test/test.mp3",
             s3_bucket="test-bucket",
-            metadata={"test": True, "purpose": "validation"}
+            extra_metadata={"test": True, "purpose": "validation"}
         )
 
         db.add(test_conversion)
-        db.commit()
-        db.refresh(test_conversion)
+        await db.commit()
 
         print(f"✅ CREATE: Inserted test record with ID: {test_conversion.id}")
 
         # READ
-        retrieved = db.query(TTSConversion).filter(
-            TTSConversion.id == test_conversion.id
-        ).first()
+        retrieved = (await db.execute(
+            select(TTSConversion).where(
+                TTSConversion.id == test_conversion.id)
+        )).scalar_one_or_none()
 
         if retrieved:
             print(f"✅ READ: Retrieved record successfully")
@@ -201,19 +216,31 @@ def test_crud_operations():
 
         # UPDATE
         retrieved.model = "gtts-updated"
-        db.commit()
+        await db.commit()
         print(f"✅ UPDATE: Updated model field")
 
         # COUNT
-        count = db.query(TTSConversion).count()
+        count = (await db.execute(
+            select(func.count()).select_from(TTSConversion)
+        )).scalar()
         print(f"✅ COUNT: Total records in database: {count}")
 
         # DELETE (cleanup)
-        db.delete(retrieved)
-        db.commit()
+        await db.delete(retrieved)
+        await db.commit()
         print(f"✅ DELETE: Cleaned up test record")
 
-        db.close()
+    await engine.dispose()
+
+
+def test_crud_operations():
+    """Test basic CRUD operations"""
+    print("=" * 60)
+    print("5️⃣  Testing CRUD operations...")
+    print("=" * 60)
+
+    try:
+        asyncio.run(_crud_operations())
         print()
         return True
 